@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""In-process stand-in for the Neptune service, selected with `pytest --backend=local`."""
+__all__ = [
+    'BackendCalls',
+    'LocalManagementClient',
+    'LocalNeptuneBackend',
+    'LocalNeptuneServer',
+    'count_backend_calls',
+    'local_backend',
+]
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Optional
+
+from _pytest.monkeypatch import MonkeyPatch
+
+import neptune.management.internal.api as management_api
+import neptune.new.sync as neptune_sync
+from neptune.new.internal import init_project, init_run
+from neptune.new.internal.backends import factory
+from neptune.new.types.mode import Mode
+
+from tests.backend.backend import LocalManagementClient, LocalNeptuneBackend
+from tests.backend.calls import BackendCalls, count_backend_calls
+from tests.backend.server import LocalNeptuneServer
+
+
+@contextmanager
+def local_backend(server: Optional[LocalNeptuneServer] = None):
+    """Routes every neptune client entry point (init, sync, management) to a `LocalNeptuneServer`.
+
+    Offline and debug modes keep their own backends, exactly as with the hosted service."""
+    owned = server is None
+    server = server or LocalNeptuneServer()
+
+    def get_backend(mode: Mode, api_token: Optional[str] = None, proxies: Optional[dict] = None):
+        if mode in (Mode.OFFLINE, Mode.DEBUG):
+            return factory.get_backend(mode, api_token=api_token, proxies=proxies)
+        return LocalNeptuneBackend(server)
+
+    with MonkeyPatch.context() as patch:
+        patch.setattr(init_run, 'get_backend', get_backend)
+        patch.setattr(init_project, 'get_backend', get_backend)
+        patch.setattr(neptune_sync, 'HostedNeptuneBackend', lambda *args, **kwargs: LocalNeptuneBackend(server))
+        patch.setattr(neptune_sync, 'Credentials', SimpleNamespace(from_token=lambda api_token=None: None))
+        patch.setattr(
+            management_api, '_get_backend_client',
+            lambda api_token=None: LocalManagementClient(server, api_token)
+        )
+
+        project = server.get_default_project()
+        patch.setenv('NEPTUNE_PROJECT', project)
+        patch.setenv('WORKSPACE_NAME', project.split('/')[0])
+        patch.setenv('ADMIN_USERNAME', LocalNeptuneServer.ADMIN)
+        patch.setenv('USER_USERNAME', LocalNeptuneServer.USER)
+        # the stand-in authenticates a token as the user of the same name
+        patch.setenv('NEPTUNE_API_TOKEN', LocalNeptuneServer.USER)
+        patch.setenv('ADMIN_NEPTUNE_API_TOKEN', LocalNeptuneServer.ADMIN)
+        try:
+            yield server
+        finally:
+            if owned:
+                server.close()
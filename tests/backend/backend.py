@@ -0,0 +1,577 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'LocalManagementClient',
+    'LocalNeptuneBackend',
+]
+
+import os
+import shutil
+from types import SimpleNamespace
+from typing import Any, Iterable, List, Optional, Tuple
+
+from bravado.exception import HTTPNotFound
+
+from neptune.new.exceptions import (
+    ArtifactNotFoundException,
+    FetchAttributeNotFoundException,
+    InternalClientError,
+    MetadataInconsistency,
+    NeptuneException,
+    ProjectNotFound,
+    RunNotFound,
+    raise_container_not_found,
+)
+from neptune.new.internal.artifacts.types import ArtifactFileData
+from neptune.new.internal.backends.api_model import (
+    ApiRun,
+    ArtifactAttribute,
+    Attribute,
+    AttributeType,
+    BoolAttribute,
+    DatetimeAttribute,
+    FileAttribute,
+    FloatAttribute,
+    FloatPointValue,
+    FloatSeriesAttribute,
+    FloatSeriesValues,
+    ImageSeriesValues,
+    IntAttribute,
+    LeaderboardEntry,
+    Project,
+    StringAttribute,
+    StringPointValue,
+    StringSeriesAttribute,
+    StringSeriesValues,
+    StringSetAttribute,
+    Workspace,
+)
+from neptune.new.internal.backends.hosted_artifact_operations import (
+    _compute_artifact_hash,
+    _compute_artifact_size,
+    _extract_file_list,
+)
+from neptune.new.internal.backends.hosted_file_operations import get_unique_upload_entries
+from neptune.new.internal.backends.neptune_backend import NeptuneBackend
+from neptune.new.internal.backends.operation_api_name_visitor import OperationApiNameVisitor
+from neptune.new.internal.backends.operation_api_object_converter import OperationApiObjectConverter
+from neptune.new.internal.backends.operations_preprocessor import OperationsPreprocessor
+from neptune.new.internal.backends.utils import ExecuteOperationsBatchingManager, with_api_exceptions_handler
+from neptune.new.internal.container_type import ContainerType
+from neptune.new.internal.operation import (
+    AssignArtifact,
+    Operation,
+    TrackFilesToArtifact,
+    UploadFile,
+    UploadFileContent,
+    UploadFileSet,
+)
+from neptune.new.internal.utils import base64_decode
+from neptune.new.internal.utils.generic_attribute_mapper import NoValue
+from neptune.new.internal.utils.paths import path_to_str
+from neptune.new.types.atoms import GitRef
+
+from tests.backend.server import LocalNeptuneServer, artifact_file_from_dto
+
+ATOM_TYPES = (
+    AttributeType.FLOAT,
+    AttributeType.INT,
+    AttributeType.BOOL,
+    AttributeType.STRING,
+    AttributeType.DATETIME,
+    AttributeType.RUN_STATE,
+)
+
+
+def _store_as_file(source: str, filename: str, destination: Optional[str] = None):
+    """Mirrors `hosted_file_operations._store_response_as_file` for a local "response"."""
+    if destination is None:
+        target_file = filename
+    elif os.path.isdir(destination):
+        target_file = os.path.join(destination, filename)
+    else:
+        target_file = destination
+    shutil.copyfile(source, target_file)
+
+
+class LocalNeptuneBackend(NeptuneBackend):
+    """Client side of the local stand-in: `HostedNeptuneBackend` with the HTTP layer swapped for
+    direct calls to a `LocalNeptuneServer`.
+
+    Operation batching, preprocessing, API object conversion and artifact hashing go through
+    the same client code the hosted backend uses, so only the network is taken out of the picture."""
+    PAGE_SIZE = 100
+
+    def __init__(self, server: LocalNeptuneServer):
+        self._server = server
+
+    def get_display_address(self) -> str:
+        return 'http://localhost'
+
+    @with_api_exceptions_handler
+    def get_project(self, project_id: str) -> Project:
+        if '/' not in project_id:
+            matching = [p for p in self.get_available_projects(search_term=project_id) if p.name == project_id]
+            if len(matching) != 1:
+                raise ProjectNotFound(project_id=project_id)
+            project_id = f'{matching[0].workspace}/{matching[0].name}'
+        try:
+            project = self._server.get_project(project_id)
+        except HTTPNotFound as error:
+            raise ProjectNotFound(project_id=project_id) from error
+        return Project(project.id, project.name, project.organizationName)
+
+    @with_api_exceptions_handler
+    def get_available_projects(
+            self, workspace_id: Optional[str] = None, search_term: Optional[str] = None
+    ) -> List[Project]:
+        return [
+            Project(p.id, p.name, p.organizationName)
+            for p in self._server.list_projects(organization_identifier=workspace_id, search_term=search_term)
+        ]
+
+    @with_api_exceptions_handler
+    def get_available_workspaces(self) -> List[Workspace]:
+        return [Workspace(_id=w.id, name=w.name) for w in self._server.list_organizations()]
+
+    @staticmethod
+    def _to_api_run(run) -> ApiRun:
+        return ApiRun(run.id, run.shortId, run.organizationName, run.projectName, run.trashed)
+
+    @with_api_exceptions_handler
+    def get_run(self, run_id: str) -> ApiRun:
+        try:
+            return self._to_api_run(self._server.get_experiment(run_id))
+        except HTTPNotFound as error:
+            raise RunNotFound(run_id) from error
+
+    @with_api_exceptions_handler
+    def create_run(
+            self,
+            project_id: str,
+            git_ref: Optional[GitRef] = None,
+            custom_run_id: Optional[str] = None,
+            notebook_id: Optional[str] = None,
+            checkpoint_id: Optional[str] = None,
+    ) -> ApiRun:
+        git_info = {
+            'commit': {
+                'commitId': git_ref.commit_id,
+                'message': git_ref.message,
+                'authorName': git_ref.author_name,
+                'authorEmail': git_ref.author_email,
+                'commitDate': git_ref.commit_date,
+            },
+            'repositoryDirty': git_ref.dirty,
+            'currentBranch': git_ref.branch,
+            'remotes': git_ref.remotes,
+        } if git_ref else None
+        try:
+            return self._to_api_run(
+                self._server.create_experiment(project_id, git_info=git_info, custom_id=custom_run_id)
+            )
+        except HTTPNotFound as error:
+            raise ProjectNotFound(project_id=project_id) from error
+
+    def create_checkpoint(self, notebook_id: str, jupyter_path: str) -> Optional[str]:
+        return None
+
+    @with_api_exceptions_handler
+    def ping(self, container_id: str, container_type: ContainerType):
+        try:
+            self._server.ping(container_id)
+        except HTTPNotFound as error:
+            raise_container_not_found(container_id, container_type, from_exception=error)
+
+    def execute_operations(
+            self,
+            container_id: str,
+            container_type: ContainerType,
+            operations: List[Operation],
+    ) -> Tuple[int, List[NeptuneException]]:
+        errors = []
+
+        batching_mgr = ExecuteOperationsBatchingManager(self)
+        operations_batch = batching_mgr.get_batch(operations, errors)
+        dropped_operations = len(errors)
+        self._server.count_operations(container_id, len(operations_batch) + dropped_operations)
+
+        operations_preprocessor = OperationsPreprocessor()
+        operations_preprocessor.process(operations_batch)
+        errors.extend(operations_preprocessor.get_errors())
+
+        upload_operations, artifact_operations, other_operations = [], [], []
+        for operation in operations_preprocessor.get_operations():
+            if isinstance(operation, (UploadFile, UploadFileContent, UploadFileSet)):
+                upload_operations.append(operation)
+            elif isinstance(operation, TrackFilesToArtifact):
+                artifact_operations.append(operation)
+            else:
+                other_operations.append(operation)
+
+        errors.extend(self._execute_upload_operations(container_id, container_type, upload_operations))
+
+        artifact_errors, assign_artifact_operations = self._execute_artifact_operations(
+            container_id, container_type, artifact_operations
+        )
+        errors.extend(artifact_errors)
+        other_operations.extend(assign_artifact_operations)
+
+        errors.extend(self._execute_operations(container_id, container_type, other_operations))
+
+        return len(operations_batch) + dropped_operations, errors
+
+    @with_api_exceptions_handler
+    def _execute_upload_operations(
+            self,
+            container_id: str,
+            container_type: ContainerType,
+            upload_operations: List[Operation],
+    ) -> List[NeptuneException]:
+        errors = []
+        try:
+            for operation in upload_operations:
+                attribute = path_to_str(operation.path)
+                if isinstance(operation, UploadFile):
+                    error = self._server.upload_attribute(
+                        container_id, attribute, source=operation.file_path, ext=operation.ext,
+                        name=os.path.basename(operation.file_path),
+                    )
+                elif isinstance(operation, UploadFileContent):
+                    error = self._server.upload_attribute(
+                        container_id, attribute, source=base64_decode(operation.file_content),
+                        ext=operation.ext, name=operation.path[-1],
+                    )
+                elif isinstance(operation, UploadFileSet):
+                    entries = [
+                        (entry.source_path, entry.target_path)
+                        for entry in get_unique_upload_entries(operation.file_globs)
+                    ]
+                    error = self._server.upload_file_set_attribute(
+                        container_id, attribute, entries, reset=operation.reset
+                    )
+                else:
+                    raise InternalClientError('Upload operation in neither File or FileSet')
+                if error:
+                    errors.append(MetadataInconsistency(error))
+        except HTTPNotFound as error:
+            raise_container_not_found(container_id, container_type, from_exception=error)
+        return errors
+
+    @with_api_exceptions_handler
+    def _execute_artifact_operations(
+            self,
+            container_id: str,
+            container_type: ContainerType,
+            artifact_operations: List[TrackFilesToArtifact],
+    ) -> Tuple[List[NeptuneException], List[Operation]]:
+        errors, assign_operations = [], []
+
+        for operation in artifact_operations:
+            try:
+                artifact_hash = self.get_artifact_attribute(container_id, container_type, operation.path).hash
+            except FetchAttributeNotFoundException:
+                artifact_hash = None
+
+            try:
+                files: List[ArtifactFileData] = _extract_file_list(operation.path, operation.entries)
+                if artifact_hash is None:
+                    artifact_hash = _compute_artifact_hash(files)
+                    artifact = self._server.create_new_artifact(
+                        operation.project_id, artifact_hash, container_id, _compute_artifact_size(files)
+                    )
+                    if not artifact.receivedMetadata:
+                        self._server.upload_artifact_files_metadata(
+                            operation.project_id, artifact_hash, [f.to_dto() for f in files]
+                        )
+                else:
+                    artifact_hash = self._server.create_artifact_version(
+                        operation.project_id, artifact_hash, container_id, [f.to_dto() for f in files]
+                    ).artifactHash
+                assign_operations.append(AssignArtifact(path=operation.path, hash=artifact_hash))
+            except HTTPNotFound:
+                errors.append(ArtifactNotFoundException(artifact_hash))
+            except NeptuneException as error:
+                errors.append(error)
+
+        return errors, assign_operations
+
+    @with_api_exceptions_handler
+    def _execute_operations(
+            self,
+            container_id: str,
+            container_type: ContainerType,
+            operations: List[Operation],
+    ) -> List[MetadataInconsistency]:
+        api_operations = [
+            {
+                'path': path_to_str(operation.path),
+                OperationApiNameVisitor().visit(operation): OperationApiObjectConverter().convert(operation),
+            }
+            for operation in operations
+        ]
+        try:
+            return [
+                MetadataInconsistency(error)
+                for error in self._server.execute_operations(container_id, api_operations)
+            ]
+        except HTTPNotFound as error:
+            raise_container_not_found(container_id, container_type, from_exception=error)
+
+    @with_api_exceptions_handler
+    def get_attributes(self, container_id: str, container_type: ContainerType) -> List[Attribute]:
+        try:
+            return [Attribute(attr.path, attr.type) for attr in self._server.get_experiment_attributes(container_id)]
+        except HTTPNotFound as error:
+            raise_container_not_found(container_id, container_type, from_exception=error)
+
+    @with_api_exceptions_handler
+    def _get_properties(self, container_id: str, path: List[str], expected_type: AttributeType):
+        try:
+            attribute = self._server.get_attribute(container_id, path_to_str(path))
+        except HTTPNotFound as error:
+            raise FetchAttributeNotFoundException(path_to_str(path)) from error
+        if attribute.type != expected_type:
+            raise MetadataInconsistency(f'Attribute {path_to_str(path)} is not {expected_type.value}')
+        return attribute.properties
+
+    def get_float_attribute(self, container_id: str, container_type: ContainerType,
+                            path: List[str]) -> FloatAttribute:
+        return FloatAttribute(self._get_properties(container_id, path, AttributeType.FLOAT).value)
+
+    def get_int_attribute(self, container_id: str, container_type: ContainerType, path: List[str]) -> IntAttribute:
+        return IntAttribute(self._get_properties(container_id, path, AttributeType.INT).value)
+
+    def get_bool_attribute(self, container_id: str, container_type: ContainerType, path: List[str]) -> BoolAttribute:
+        return BoolAttribute(self._get_properties(container_id, path, AttributeType.BOOL).value)
+
+    def get_file_attribute(self, container_id: str, container_type: ContainerType, path: List[str]) -> FileAttribute:
+        properties = self._get_properties(container_id, path, AttributeType.FILE)
+        return FileAttribute(name=properties.name, ext=properties.ext, size=properties.size)
+
+    def get_string_attribute(self, container_id: str, container_type: ContainerType,
+                             path: List[str]) -> StringAttribute:
+        return StringAttribute(self._get_properties(container_id, path, AttributeType.STRING).value)
+
+    def get_datetime_attribute(self, container_id: str, container_type: ContainerType,
+                               path: List[str]) -> DatetimeAttribute:
+        return DatetimeAttribute(self._get_properties(container_id, path, AttributeType.DATETIME).value)
+
+    def get_artifact_attribute(self, container_id: str, container_type: ContainerType,
+                               path: List[str]) -> ArtifactAttribute:
+        return ArtifactAttribute(self._get_properties(container_id, path, AttributeType.ARTIFACT).hash)
+
+    @with_api_exceptions_handler
+    def list_artifact_files(self, project_id: str, artifact_hash: str) -> List[ArtifactFileData]:
+        try:
+            return [artifact_file_from_dto(dto) for dto in self._server.list_artifact_files(project_id, artifact_hash)]
+        except HTTPNotFound as error:
+            raise ArtifactNotFoundException(artifact_hash) from error
+
+    def get_float_series_attribute(self, container_id: str, container_type: ContainerType,
+                                   path: List[str]) -> FloatSeriesAttribute:
+        return FloatSeriesAttribute(self._get_properties(container_id, path, AttributeType.FLOAT_SERIES).last)
+
+    def get_string_series_attribute(self, container_id: str, container_type: ContainerType,
+                                    path: List[str]) -> StringSeriesAttribute:
+        return StringSeriesAttribute(self._get_properties(container_id, path, AttributeType.STRING_SERIES).last)
+
+    def get_string_set_attribute(self, container_id: str, container_type: ContainerType,
+                                 path: List[str]) -> StringSetAttribute:
+        return StringSetAttribute(set(self._get_properties(container_id, path, AttributeType.STRING_SET).values))
+
+    @with_api_exceptions_handler
+    def get_image_series_values(self, container_id: str, container_type: ContainerType, path: List[str],
+                                offset: int, limit: int) -> ImageSeriesValues:
+        try:
+            return ImageSeriesValues(
+                self._server.get_image_series_values(container_id, path_to_str(path), offset, limit)
+            )
+        except HTTPNotFound as error:
+            raise FetchAttributeNotFoundException(path_to_str(path)) from error
+
+    @with_api_exceptions_handler
+    def get_string_series_values(self, container_id: str, container_type: ContainerType, path: List[str],
+                                 offset: int, limit: int) -> StringSeriesValues:
+        try:
+            total, steps, timestamps, values = self._server.get_string_series_values(
+                container_id, path_to_str(path), offset, limit
+            )
+        except HTTPNotFound as error:
+            raise FetchAttributeNotFoundException(path_to_str(path)) from error
+        return StringSeriesValues(
+            total,
+            [StringPointValue(*point) for point in zip(timestamps.tolist(), steps.tolist(), values.tolist())],
+        )
+
+    @with_api_exceptions_handler
+    def get_float_series_values(self, container_id: str, container_type: ContainerType, path: List[str],
+                                offset: int, limit: int) -> FloatSeriesValues:
+        try:
+            total, steps, timestamps, values = self._server.get_float_series_values(
+                container_id, path_to_str(path), offset, limit
+            )
+        except HTTPNotFound as error:
+            raise FetchAttributeNotFoundException(path_to_str(path)) from error
+        return FloatSeriesValues(
+            total,
+            [FloatPointValue(*point) for point in zip(timestamps.tolist(), steps.tolist(), values.tolist())],
+        )
+
+    @with_api_exceptions_handler
+    def download_file_series_by_index(self, container_id: str, container_type: ContainerType, path: List[str],
+                                      index: int, destination: str):
+        try:
+            source, filename = self._server.get_image_series_value(container_id, path_to_str(path), index)
+        except HTTPNotFound as error:
+            raise FetchAttributeNotFoundException(path_to_str(path)) from error
+        _store_as_file(source, filename, destination)
+
+    @with_api_exceptions_handler
+    def download_file(self, container_id: str, container_type: ContainerType, path: List[str],
+                      destination: Optional[str] = None):
+        try:
+            source, filename = self._server.download_attribute(container_id, path_to_str(path))
+        except HTTPNotFound as error:
+            raise FetchAttributeNotFoundException(path_to_str(path)) from error
+        _store_as_file(source, filename, destination)
+
+    @with_api_exceptions_handler
+    def download_file_set(self, container_id: str, container_type: ContainerType, path: List[str],
+                          destination: Optional[str] = None):
+        try:
+            source, filename = self._server.download_file_set_attribute_zip(container_id, path_to_str(path))
+        except HTTPNotFound as error:
+            raise FetchAttributeNotFoundException(path_to_str(path)) from error
+        try:
+            _store_as_file(source, filename, destination)
+        finally:
+            os.remove(source)
+
+    def get_run_url(self, run_id: str, workspace: str, project_name: str, short_id: str) -> str:
+        return f'{self.get_display_address()}/{workspace}/{project_name}/e/{short_id}'
+
+    @with_api_exceptions_handler
+    def fetch_atom_attribute_values(
+            self, container_id: str, container_type: ContainerType, path: List[str]
+    ) -> List[Tuple[str, AttributeType, Any]]:
+        namespace_prefix = path_to_str(path)
+        if namespace_prefix:
+            # don't want to catch "ns/attribute/other" while looking for "ns/attr"
+            namespace_prefix += "/"
+        try:
+            attributes = self._server.get_experiment_attributes(container_id)
+        except HTTPNotFound as error:
+            raise_container_not_found(container_id, container_type, from_exception=error)
+        return [
+            (attr.path, attr.type.value, self._attribute_value(attr))
+            for attr in attributes
+            if attr.path.startswith(namespace_prefix)
+        ]
+
+    @staticmethod
+    def _attribute_value(attribute):
+        if attribute.type in ATOM_TYPES:
+            return attribute.properties.value
+        if attribute.type in (AttributeType.FLOAT_SERIES, AttributeType.STRING_SERIES):
+            return attribute.properties.last
+        if attribute.type == AttributeType.STRING_SET:
+            return attribute.properties.values
+        return NoValue
+
+    @with_api_exceptions_handler
+    def get_leaderboard(
+            self,
+            project_id: str,
+            _id: Optional[Iterable[str]] = None,
+            state: Optional[Iterable[str]] = None,
+            owner: Optional[Iterable[str]] = None,
+            tags: Optional[Iterable[str]] = None,
+    ) -> List[LeaderboardEntry]:
+        entries: List[LeaderboardEntry] = []
+        page = None
+        try:
+            while page is None or len(page) >= self.PAGE_SIZE:
+                page = self._server.get_leaderboard(
+                    project_id, short_id=_id, state=state, owner=owner, tags=tags,
+                    limit=self.PAGE_SIZE, offset=len(entries),
+                )
+                entries += page
+        except HTTPNotFound as error:
+            raise ProjectNotFound(project_id) from error
+        return entries
+
+
+class _Call:
+    def __init__(self, result=None):
+        self.result = result
+
+    def response(self):
+        return self
+
+
+class LocalManagementClient:
+    """Duck-typed swagger client for `neptune.management`; the API token is the user name."""
+    # pylint: disable=invalid-name,unused-argument
+    PROJECT_ROLES = ('viewer', 'member', 'manager')
+
+    def __init__(self, server: LocalNeptuneServer, api_token: Optional[str] = None):
+        self._server = server
+        self._user = api_token or os.getenv('NEPTUNE_API_TOKEN')
+        self.api = self
+
+    def listProjects(self, **params):
+        return _Call(SimpleNamespace(entries=self._server.list_projects(user=self._user)))
+
+    def listOrganizations(self, **params):
+        return _Call(self._server.list_organizations())
+
+    def createProject(self, projectToCreate, **params):
+        workspace = next(
+            w.name for w in self._server.list_organizations() if w.id == projectToCreate['organizationId']
+        )
+        return _Call(self._server.create_project(
+            workspace,
+            projectToCreate['name'],
+            key=projectToCreate['projectKey'],
+            visibility=projectToCreate['visibility'],
+            description=projectToCreate['description'],
+        ))
+
+    def deleteProject(self, projectIdentifier, **params):
+        self._server.delete_project(projectIdentifier)
+        return _Call()
+
+    def addProjectMember(self, projectIdentifier, member, **params):
+        self._server.add_project_member(projectIdentifier, member['userId'], member['role'])
+        return _Call()
+
+    def deleteProjectMember(self, projectIdentifier, userId, **params):
+        self._server.delete_project_member(projectIdentifier, userId)
+        return _Call()
+
+    @staticmethod
+    def _members(members):
+        return [
+            SimpleNamespace(role=role, registeredMemberInfo=SimpleNamespace(username=username))
+            for username, role in members.items()
+        ]
+
+    def listProjectMembers(self, projectIdentifier, **params):
+        return _Call(self._members(self._server.list_project_members(projectIdentifier)))
+
+    def listOrganizationMembers(self, organizationIdentifier, **params):
+        return _Call(self._members(self._server.list_organization_members(organizationIdentifier)))
@@ -0,0 +1,80 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'BackendCalls',
+    'count_backend_calls',
+]
+
+import functools
+import inspect
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from neptune.new.internal.backends.hosted_neptune_backend import HostedNeptuneBackend
+from neptune.new.internal.backends.neptune_backend import NeptuneBackend
+
+from tests.backend.backend import LocalNeptuneBackend
+
+# backend methods answered without talking to the service
+_LOCAL_METHODS = {'close', 'get_display_address', 'get_run_url', 'verify_feature_available', 'websockets_factory'}
+# every other public method of the interface is a request (a single one, apart from batched uploads)
+REQUEST_METHODS = sorted(
+    name for name, _ in inspect.getmembers(NeptuneBackend, inspect.isfunction)
+    if not name.startswith('_') and name not in _LOCAL_METHODS
+)
+
+
+class BackendCalls:
+    """Requests made through the backend, by method name."""
+
+    def __init__(self, all_threads: bool):
+        self.by_method = Counter()
+        self._thread = None if all_threads else threading.get_ident()
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_method.values())
+
+    def add(self, method: str):
+        if self._thread is None or self._thread == threading.get_ident():
+            with self._lock:
+                self.by_method[method] += 1
+
+    def wrap(self, function, method: str):
+        @functools.wraps(function)
+        def counted(*args, **kwargs):
+            self.add(method)
+            return function(*args, **kwargs)
+
+        return counted
+
+
+@contextmanager
+def count_backend_calls(all_threads: bool = False):
+    """Counts requests of the local stand-in and of the hosted backend alike.
+
+    Only the calling thread's requests are counted unless `all_threads` is set: containers' own threads
+    ping and sync in the background at times of their choosing."""
+    calls = BackendCalls(all_threads)
+    with MonkeyPatch.context() as patch:
+        for cls in (LocalNeptuneBackend, HostedNeptuneBackend):
+            for method in REQUEST_METHODS:
+                patch.setattr(cls, method, calls.wrap(getattr(cls, method), method))
+        yield calls
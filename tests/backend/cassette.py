@@ -0,0 +1,356 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'Cassette',
+    'CassetteRecorder',
+    'CassetteReplayer',
+    'Interaction',
+    'TIMINGS',
+    'body_shape',
+    'record_cassette',
+    'replay_cassette',
+    'replay_token',
+]
+
+import base64
+import functools
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from neptune.new.internal.backends import hosted_client
+
+VERSION = 1
+# 'fast' answers right away, 'original' takes as long as the recorded response did
+TIMINGS = ('fast', 'original')
+# generated by `BaseE2ETest.gen_key` and by the service; they differ from run to run
+_UUID = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+# response headers the client reads, the rest is left out of the cassette
+_KEPT_HEADERS = ('Content-Type', 'Content-Disposition')
+# response fields holding credentials; never written to a cassette
+_SECRETS = {'accessToken', 'refreshToken', 'access_token', 'refresh_token', 'id_token', 'apiToken'}
+# ...which the client decodes as JWTs, and gets an unsigned one for on replay
+_ACCESS_TOKENS = {'accessToken', 'access_token'}
+_REDACTED = 'redacted-by-cassette'
+
+
+class Interaction(NamedTuple):
+    """One request of a recorded run and the response it got."""
+
+    # test the request was made in, `None` outside of tests
+    test: Optional[str]
+    method: str
+    url: str
+    # `body_shape` of the request, its content isn't kept
+    shape: str
+    # UUIDs in the URL and the body of the request, in order
+    uuids: List[str]
+    status: int
+    reason: str
+    headers: Dict[str, str]
+    # text, or base64 of binary content
+    body: str
+    binary: bool
+    # seconds from the start of the recording to the request, and until the response was read
+    offset: float
+    elapsed: float
+
+
+class Cassette:
+    """HTTP exchanges of a run against the service, and the environment (project, workspace, users, API address)
+    it was recorded in; saved as gzipped JSON."""
+
+    def __init__(self, environment: Optional[Dict[str, str]] = None, interactions: Optional[List[Interaction]] = None):
+        self.environment = dict(environment or {})
+        self.interactions = list(interactions or [])
+
+    def save(self, path: str):
+        with gzip.open(path, 'wt', encoding='utf-8') as cassette_file:
+            json.dump({
+                'version': VERSION,
+                'environment': self.environment,
+                'interactions': [list(interaction) for interaction in self.interactions],
+            }, cassette_file, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        with gzip.open(path, 'rt', encoding='utf-8') as cassette_file:
+            content = json.load(cassette_file)
+        if content.get('version') != VERSION:
+            raise ValueError(f"Cassette {path} has version {content.get('version')}, expected {VERSION}")
+        return cls(content['environment'], [Interaction(*fields) for fields in content['interactions']])
+
+
+def _shape(value):
+    if isinstance(value, dict):
+        return {_UUID.sub('<uuid>', key): _shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        # the kinds of elements, not how many: the client batches operations as they come
+        return sorted({json.dumps(_shape(item), sort_keys=True) for item in value})
+    return type(value).__name__
+
+
+def body_shape(body) -> str:
+    """Structure of a request body: the keys and value types of JSON, the type of anything else."""
+    if body is None:
+        return ''
+    if isinstance(body, (bytes, str)):
+        try:
+            value = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            return type(body).__name__
+        return hashlib.sha1(json.dumps(_shape(value), sort_keys=True).encode()).hexdigest()[:12]
+    # streamed bodies, like multipart uploads, can only be read once
+    return type(body).__name__
+
+
+def _request_uuids(request: requests.PreparedRequest) -> List[str]:
+    body = request.body
+    if isinstance(body, bytes):
+        body = body.decode('latin-1')
+    return _UUID.findall(request.url) + (_UUID.findall(body) if isinstance(body, str) else [])
+
+
+def _request_keys(method: str, url: str, shape: str) -> Tuple[tuple, tuple, tuple]:
+    """Keys a request is matched by, from the most to the least specific; UUIDs and the host are left out."""
+    parts = urlsplit(_UUID.sub('<uuid>', url))
+    query = '&'.join(sorted(parts.query.split('&')))
+    return (method, parts.path, query, shape), (method, parts.path, query), (method, parts.path)
+
+
+def _replace_secrets(value, replacement):
+    if isinstance(value, dict):
+        return {
+            key: replacement(key) if key in _SECRETS else _replace_secrets(item, replacement)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_replace_secrets(item, replacement) for item in value]
+    return value
+
+
+def _redacted(text: str) -> str:
+    if not any(secret in text for secret in _SECRETS):
+        return text
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(_replace_secrets(value, lambda key: _REDACTED))
+
+
+def _base64url(value: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b'=').decode()
+
+
+def replay_token(api_address: str) -> str:
+    """API token naming `api_address`, as the client needs one to start; the replayed service doesn't check it."""
+    return base64.b64encode(json.dumps({
+        'api_address': api_address,
+        'api_url': api_address,
+        'api_key': _REDACTED,
+    }).encode()).decode()
+
+
+class CassetteRecorder:
+    """Records every request sent through `requests`, with its response, into `cassette`,
+    grouped by the test (`test`) it was made in. Requests that got no response aren't recorded."""
+
+    def __init__(self, environment: Optional[Dict[str, str]] = None):
+        self.cassette = Cassette(environment)
+        self.test: Optional[str] = None
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, request: requests.PreparedRequest, response: requests.Response, offset: float, elapsed: float):
+        content = response.content or b''
+        headers = {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers}
+        try:
+            body, binary = _redacted(content.decode('utf-8')), False
+        except UnicodeDecodeError:
+            body, binary = base64.b64encode(content).decode(), True
+        interaction = Interaction(
+            test=self.test,
+            method=request.method,
+            url=request.url,
+            shape=body_shape(request.body),
+            uuids=_request_uuids(request),
+            status=response.status_code,
+            reason=response.reason or '',
+            headers=headers,
+            body=body,
+            binary=binary,
+            offset=offset,
+            elapsed=elapsed,
+        )
+        with self._lock:
+            self.cassette.interactions.append(interaction)
+
+    def wrap(self, send):
+        @functools.wraps(send)
+        def recorded(adapter, request, *args, **kwargs):
+            start = time.monotonic()
+            response = send(adapter, request, *args, **kwargs)
+            # streamed downloads are read whole here, to be replayed
+            _ = response.content
+            self.add(request, response, start - self._start, time.monotonic() - start)
+            return response
+
+        return recorded
+
+
+class CassetteReplayer:
+    """Answers requests with the responses recorded for them in `cassette`, without a network.
+
+    A request is answered with the first recorded interaction not replayed yet that has the same method, path and
+    query, and a body of the same `body_shape`; the ones recorded in the current test (`test`) go first. Failing
+    that, the body, then the query are left out of the match. UUIDs don't take part in it: the ones of the recorded
+    request stand for the ones of the replayed request in the responses from then on. Once the interactions of a
+    request are all replayed, it gets the last of them again, as a service answers the same query the same way.
+    Requests with no recorded interaction at all get a 404 and are listed in `unmatched`."""
+
+    def __init__(self, cassette: Cassette, timing: str = 'fast'):
+        if timing not in TIMINGS:
+            raise ValueError(f"Unknown replay timing {timing}, expected one of {', '.join(TIMINGS)}")
+        self.cassette = cassette
+        self.test: Optional[str] = None
+        self.replayed = 0
+        self.unmatched: List[str] = []
+        self._timing = timing
+        self._lock = threading.Lock()
+        self._consumed = set()
+        self._last: Dict[tuple, int] = {}
+        # recorded UUID -> the one replayed in its place
+        self._uuids: Dict[str, str] = {}
+        self._queues: Dict[tuple, deque] = defaultdict(deque)
+        for number, interaction in enumerate(cassette.interactions):
+            for key in _request_keys(interaction.method, interaction.url, interaction.shape):
+                self._queues[(interaction.test, key)].append(number)
+                self._queues[(None, key)].append(number)
+        self._access_token = None
+
+    def _next(self, test: Optional[str], key: tuple) -> Optional[int]:
+        queue = self._queues.get((test, key))
+        while queue and queue[0] in self._consumed:
+            queue.popleft()
+        return queue.popleft() if queue else None
+
+    def _match(self, request: requests.PreparedRequest) -> Optional[Interaction]:
+        exact, query, path = _request_keys(request.method, request.url, body_shape(request.body))
+        with self._lock:
+            for test, key in ((self.test, exact), (self.test, query), (None, exact), (None, query),
+                              (self.test, path), (None, path)):
+                number = self._next(test, key)
+                if number is not None:
+                    self._consumed.add(number)
+                    break
+            else:
+                number = self._last.get(query)
+            if number is None:
+                self.unmatched.append(f'{self.test or "-"}: {request.method} {request.url}')
+                return None
+            self._last[query] = number
+            self.replayed += 1
+            interaction = self.cassette.interactions[number]
+            replayed = _request_uuids(request)
+            if len(replayed) == len(interaction.uuids):
+                self._uuids.update(
+                    (recorded, current) for recorded, current in zip(interaction.uuids, replayed) if recorded != current
+                )
+            return interaction
+
+    def _jwt(self) -> str:
+        if self._access_token is None:
+            address = self.cassette.environment.get('api_address', 'https://app.neptune.ai')
+            self._access_token = '.'.join([
+                _base64url({'alg': 'none', 'typ': 'JWT'}),
+                _base64url({'exp': int(time.time()) + 24 * 3600, 'iss': f'{address}/auth/realms/neptune',
+                            'azp': 'neptune-client'}),
+                '',
+            ])
+        return self._access_token
+
+    def _content(self, interaction: Interaction) -> bytes:
+        if interaction.binary:
+            return base64.b64decode(interaction.body)
+        with self._lock:
+            body = _UUID.sub(lambda match: self._uuids.get(match.group(0), match.group(0)), interaction.body)
+        if _REDACTED in body:
+            value = json.loads(body)
+            body = json.dumps(_replace_secrets(value, lambda key: self._jwt() if key in _ACCESS_TOKENS else _REDACTED))
+        return body.encode('utf-8')
+
+    def send(self, adapter: HTTPAdapter, request: requests.PreparedRequest) -> requests.Response:
+        interaction = self._match(request)
+        response = requests.Response()
+        if interaction is None:
+            response.status_code, response.reason = 404, 'Not Found'
+            response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+            content = json.dumps({'code': 404, 'message': 'No interaction recorded for this request'}).encode()
+        else:
+            if self._timing == 'original':
+                time.sleep(interaction.elapsed)
+            response.status_code, response.reason = interaction.status, interaction.reason
+            response.headers = CaseInsensitiveDict(interaction.headers)
+            content = self._content(interaction)
+            response.elapsed = timedelta(seconds=interaction.elapsed)
+        # pylint: disable=protected-access
+        response._content = content
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = adapter
+        return response
+
+
+@contextmanager
+def record_cassette(environment: Optional[Dict[str, str]] = None):
+    """Records the HTTP exchanges of this process; yields the `CassetteRecorder`, whose `cassette` holds them."""
+    recorder = CassetteRecorder(environment)
+    with MonkeyPatch.context() as patch:
+        patch.setattr(HTTPAdapter, 'send', recorder.wrap(HTTPAdapter.send))
+        yield recorder
+
+
+@contextmanager
+def replay_cassette(cassette: Cassette, timing: str = 'fast'):
+    """Answers the HTTP requests of this process from `cassette` instead of the network;
+    yields the `CassetteReplayer` for the requests replayed and unmatched."""
+    replayer = CassetteReplayer(cassette, timing)
+
+    def send(adapter, request, *args, **kwargs):  # pylint: disable=unused-argument
+        return replayer.send(adapter, request)
+
+    with MonkeyPatch.context() as patch:
+        patch.setattr(HTTPAdapter, 'send', send)
+        # the recorded host needn't resolve where the cassette is replayed
+        patch.setattr(hosted_client, 'verify_host_resolution', lambda url: None)
+        yield replayer
@@ -0,0 +1,128 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'NetworkConditions',
+    'NetworkProfile',
+    'PROFILES',
+    'network_conditions',
+]
+
+import functools
+import inspect
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from tests.backend.server import LocalNeptuneServer, http_error
+from tests.backend.traffic import ENDPOINTS, received_size, sent_size
+
+
+class NetworkProfile(NamedTuple):
+    """Conditions of the link between the client and the service."""
+
+    # round trip time of every request
+    latency_s: float = 0.0
+    # shared by all requests and responses in flight, `None` for no limit
+    bandwidth_bytes_per_s: Optional[float] = None
+    # share of requests held up, as a lost packet waits for its retransmission
+    stall_rate: float = 0.0
+    stall_s: float = 0.0
+    # share of requests answered with one of `error_statuses` before they reach the service
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (500, 502, 503, 429)
+    # conditions of single endpoints, instead of these ones
+    endpoints: Optional[Dict[str, 'NetworkProfile']] = None
+
+
+PROFILES = {
+    'healthy': NetworkProfile(),
+    'high_rtt': NetworkProfile(latency_s=0.15),
+    'congested': NetworkProfile(latency_s=0.05, bandwidth_bytes_per_s=2 ** 20, stall_rate=0.05, stall_s=0.5),
+    'flaky': NetworkProfile(latency_s=0.02, error_rate=0.1, error_statuses=(500, 502, 503, 504)),
+    'rate_limited': NetworkProfile(
+        latency_s=0.02,
+        endpoints={'execute_operations': NetworkProfile(latency_s=0.02, error_rate=0.3, error_statuses=(429,))},
+    ),
+}
+
+
+class NetworkConditions:
+    """Degrades the requests of a `LocalNeptuneServer` as `profile` says, with the failures and stalls drawn
+    from a generator seeded with `seed`; counts the ones injected, by endpoint."""
+
+    def __init__(self, profile: NetworkProfile, seed: int = 0):
+        self.profile = profile
+        self.errors = Counter()
+        self.stalls = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # when the link is done with the transfers started so far
+        self._busy_until = 0.0
+
+    def _profile_of(self, endpoint: str) -> NetworkProfile:
+        return (self.profile.endpoints or {}).get(endpoint, self.profile)
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def _transfer(self, size: int, profile: NetworkProfile):
+        if not profile.bandwidth_bytes_per_s or not size:
+            return
+        with self._lock:
+            start = max(time.monotonic(), self._busy_until)
+            self._busy_until = start + size / profile.bandwidth_bytes_per_s
+            done = self._busy_until
+        time.sleep(max(0.0, done - time.monotonic()))
+
+    def wrap(self, function, endpoint: str):
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def degraded(*args, **kwargs):
+            profile = self._profile_of(endpoint)
+            time.sleep(profile.latency_s / 2)
+            if profile.stall_rate and self._draw() < profile.stall_rate:
+                self.stalls[endpoint] += 1
+                time.sleep(profile.stall_s)
+            self._transfer(sent_size(endpoint, signature.bind(*args, **kwargs).arguments), profile)
+            if profile.error_rate and self._draw() < profile.error_rate:
+                self.errors[endpoint] += 1
+                status = profile.error_statuses[int(self._draw() * len(profile.error_statuses))]
+                raise http_error(status, f'{endpoint} failed by injected network conditions')
+
+            result = function(*args, **kwargs)
+            time.sleep(profile.latency_s / 2)
+            self._transfer(received_size(endpoint, result), profile)
+            return result
+
+        return degraded
+
+
+@contextmanager
+def network_conditions(server: LocalNeptuneServer, profile: NetworkProfile, seed: int = 0):
+    """Makes every endpoint of the in-process `server` answer as over a link with `profile`;
+    yields the `NetworkConditions` for the errors and stalls injected."""
+    conditions = NetworkConditions(profile, seed)
+    with MonkeyPatch.context() as patch:
+        for endpoint in ENDPOINTS:
+            patch.setattr(server, endpoint, conditions.wrap(getattr(server, endpoint), endpoint))
+        yield conditions
@@ -0,0 +1,370 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'LocalS3Server',
+]
+
+import base64
+import bisect
+import functools
+import hashlib
+import re
+import socketserver
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from _pytest.monkeypatch import MonkeyPatch
+from botocore.session import Session
+
+_NAMESPACE = 'http://s3.amazonaws.com/doc/2006-03-01/'
+DEFAULT_MAX_KEYS = 1000
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+class _Object(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+
+class _Bucket:
+    def __init__(self):
+        self.objects: Dict[str, _Object] = {}
+        # kept sorted, listings go through the keys in order
+        self.keys: List[str] = []
+
+    def put(self, key: str, body: bytes):
+        if key not in self.objects:
+            bisect.insort(self.keys, key)
+        self.objects[key] = _Object(body, hashlib.md5(body).hexdigest(), datetime.now(timezone.utc))
+
+    def delete(self, key: str):
+        if self.objects.pop(key, None) is not None:
+            del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def list(self, prefix: str, after: str, max_keys: int) -> Tuple[List[str], bool]:
+        """Keys starting with `prefix` that come after `after`, at most `max_keys` of them; and whether more follow."""
+        start = bisect.bisect_right(self.keys, after) if after else bisect.bisect_left(self.keys, prefix)
+        found = []
+        for key in self.keys[start:start + max_keys + 1]:
+            if not key.startswith(prefix):
+                break
+            found.append(key)
+        return found[:max_keys], len(found) > max_keys
+
+
+class _S3Error(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def _decode_aws_chunked(body: bytes) -> bytes:
+    """Payload of a body sent with `Content-Encoding: aws-chunked`: sized chunks, then optional trailers."""
+    decoded, position = [], 0
+    while True:
+        line_end = body.index(b'\r\n', position)
+        size = int(body[position:line_end].split(b';')[0], 16)
+        if size == 0:
+            return b''.join(decoded)
+        decoded.append(body[line_end + 2:line_end + 2 + size])
+        position = line_end + 2 + size + 2
+
+
+def _timestamp(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f'{moment.microsecond // 1000:03d}Z'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keeps connections open, and answers `Expect: 100-continue` right away
+    protocol_version = 'HTTP/1.1'
+    server: '_HTTPServer'
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _target(self) -> Tuple[str, Optional[str], Dict[str, str]]:
+        parts = urlsplit(self.path)
+        bucket, _, key = unquote(parts.path).lstrip('/').partition('/')
+        query = {name: values[0] for name, values in parse_qs(parts.query, keep_blank_values=True).items()}
+        return bucket, key or None, query
+
+    def _body(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if 'aws-chunked' in self.headers.get('Content-Encoding', '') or \
+                self.headers.get('x-amz-content-sha256', '').startswith('STREAMING-'):
+            return _decode_aws_chunked(body)
+        return body
+
+    def _send(self, status: int, body: bytes = b'', headers: Optional[Dict[str, str]] = None,
+              content_length: Optional[int] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body) if content_length is None else content_length))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_xml(self, status: int, xml: str):
+        self._send(
+            status, f'<?xml version="1.0" encoding="UTF-8"?>\n{xml}'.encode(), {'Content-Type': 'application/xml'}
+        )
+
+    def _handle(self, operation: str, action):
+        start = time.monotonic()
+        try:
+            action()
+        except _S3Error as error:
+            # the body of a failed HEAD is left out, as by S3
+            self._send_xml(error.status, f'<Error><Code>{error.code}</Code><Message>{escape(str(error))}</Message>'
+                                         f'<RequestId>local</RequestId></Error>')
+        finally:
+            self.server.storage.count(operation, time.monotonic() - start)
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        bucket, key, _ = self._target()
+        body = self._body()
+        if key is None:
+            self._handle('CreateBucket', lambda: self._create_bucket(bucket))
+        elif 'x-amz-copy-source' in self.headers:
+            self._handle('CopyObject', self._not_implemented)
+        else:
+            self._handle('PutObject', lambda: self._put_object(bucket, key, body))
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        bucket, key, query = self._target()
+        if key is not None:
+            self._handle('GetObject', lambda: self._get_object(bucket, key))
+        elif query.get('list-type') == '2':
+            self._handle('ListObjectsV2', lambda: self._list_objects(bucket, query, version=2))
+        elif not set(query).difference({'prefix', 'marker', 'max-keys', 'encoding-type'}):
+            self._handle('ListObjects', lambda: self._list_objects(bucket, query, version=1))
+        else:
+            self._handle('GetBucket', self._not_implemented)
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        bucket, key, _ = self._target()
+        if key is None:
+            self._handle('HeadBucket', lambda: self._head_bucket(bucket))
+        else:
+            self._handle('HeadObject', lambda: self._get_object(bucket, key))
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        bucket, key, query = self._target()
+        body = self._body()
+        if key is None and 'delete' in query:
+            self._handle('DeleteObjects', lambda: self._delete_objects(bucket, body))
+        else:
+            # multipart uploads among others; objects below the multipart threshold of `upload_file` (8MB) are put
+            self._handle('Post', self._not_implemented)
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        bucket, key, _ = self._target()
+        if key is None:
+            self._handle('DeleteBucket', lambda: self._delete_bucket(bucket))
+        else:
+            self._handle('DeleteObject', lambda: self._delete_object(bucket, key))
+
+    @staticmethod
+    def _not_implemented():
+        raise _S3Error(501, 'NotImplemented', 'Not supported by the local S3 stand-in')
+
+    def _create_bucket(self, name: str):
+        with self.server.storage.lock:
+            self.server.storage.buckets.setdefault(name, _Bucket())
+        self._send(200, headers={'Location': f'/{name}'})
+
+    def _head_bucket(self, name: str):
+        with self.server.storage.lock:
+            self.server.storage.bucket(name)
+        self._send(200)
+
+    def _delete_bucket(self, name: str):
+        with self.server.storage.lock:
+            if self.server.storage.bucket(name).objects:
+                raise _S3Error(409, 'BucketNotEmpty', 'The bucket you tried to delete is not empty')
+            del self.server.storage.buckets[name]
+        self._send(204)
+
+    def _put_object(self, bucket: str, key: str, body: bytes):
+        with self.server.storage.lock:
+            self.server.storage.bucket(bucket).put(key, body)
+            etag = self.server.storage.bucket(bucket).objects[key].etag
+        self._send(200, headers={'ETag': f'"{etag}"'})
+
+    def _get_object(self, bucket: str, key: str):
+        with self.server.storage.lock:
+            found = self.server.storage.bucket(bucket).objects.get(key)
+        if found is None:
+            raise _S3Error(404, 'NoSuchKey', 'The specified key does not exist.')
+        headers = {
+            'ETag': f'"{found.etag}"',
+            'Last-Modified': format_datetime(found.last_modified, usegmt=True),
+            'Content-Type': 'binary/octet-stream',
+            'Accept-Ranges': 'bytes',
+        }
+        status, body = 200, found.body
+        requested = _RANGE.fullmatch(self.headers.get('Range', ''))
+        if requested and (requested.group(1) or requested.group(2)):
+            first, last = requested.groups()
+            if first:
+                start, end = int(first), min(int(last) if last else len(body) - 1, len(body) - 1)
+            else:
+                start, end = max(0, len(body) - int(last)), len(body) - 1
+            status, body = 206, body[start:end + 1]
+            headers['Content-Range'] = f'bytes {start}-{end}/{len(found.body)}'
+        if self.command == 'GET':
+            with self.server.storage.lock:
+                self.server.storage.served_bytes += len(body)
+        self._send(status, body, headers, content_length=len(body))
+
+    def _delete_object(self, bucket: str, key: str):
+        with self.server.storage.lock:
+            self.server.storage.bucket(bucket).delete(key)
+        self._send(204)
+
+    def _delete_objects(self, bucket: str, body: bytes):
+        keys = [element.text for element in ElementTree.fromstring(body).iter() if element.tag.endswith('Key')]
+        with self.server.storage.lock:
+            for key in keys:
+                self.server.storage.bucket(bucket).delete(key)
+        deleted = ''.join(f'<Deleted><Key>{escape(key)}</Key></Deleted>' for key in keys)
+        self._send_xml(200, f'<DeleteResult xmlns="{_NAMESPACE}">{deleted}</DeleteResult>')
+
+    def _list_objects(self, name: str, query: Dict[str, str], version: int):
+        prefix = query.get('prefix', '')
+        max_keys = int(query.get('max-keys', DEFAULT_MAX_KEYS))
+        if version == 2:
+            token = query.get('continuation-token')
+            after = base64.urlsafe_b64decode(token.encode()).decode() if token else query.get('start-after', '')
+        else:
+            after = query.get('marker', '')
+        with self.server.storage.lock:
+            bucket = self.server.storage.bucket(name)
+            keys, truncated = bucket.list(prefix, after, max_keys)
+            objects = [(key, bucket.objects[key]) for key in keys]
+
+        contents = ''.join(
+            f'<Contents><Key>{escape(key)}</Key><LastModified>{_timestamp(found.last_modified)}</LastModified>'
+            f'<ETag>&quot;{found.etag}&quot;</ETag><Size>{len(found.body)}</Size>'
+            f'<StorageClass>STANDARD</StorageClass></Contents>'
+            for key, found in objects
+        )
+        fields = f'<Name>{escape(name)}</Name><Prefix>{escape(prefix)}</Prefix><MaxKeys>{max_keys}</MaxKeys>' \
+                 f'<IsTruncated>{str(truncated).lower()}</IsTruncated>'
+        if version == 2:
+            fields += f'<KeyCount>{len(keys)}</KeyCount>'
+            if query.get('continuation-token'):
+                fields += f"<ContinuationToken>{escape(query['continuation-token'])}</ContinuationToken>"
+            if truncated:
+                next_token = base64.urlsafe_b64encode(keys[-1].encode()).decode()
+                fields += f'<NextContinuationToken>{next_token}</NextContinuationToken>'
+        else:
+            fields += f"<Marker>{escape(query.get('marker', ''))}</Marker>"
+            if truncated:
+                fields += f'<NextMarker>{escape(keys[-1])}</NextMarker>'
+        self._send_xml(200, f'<ListBucketResult xmlns="{_NAMESPACE}">{fields}{contents}</ListBucketResult>')
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    # `http.server.ThreadingHTTPServer` comes with Python 3.7
+    daemon_threads = True
+    storage: 'LocalS3Server'
+
+
+class LocalS3Server:
+    """S3-compatible service on a local port, holding objects in memory: enough of the API for boto3
+    to create buckets, put, list (both versions, paginated), head, get (with ranges) and delete objects.
+    Multipart uploads aren't supported, `upload_file` only puts files below 8MB in one request.
+
+    Counts the requests it serves, and the seconds spent on them, by operation (`requests`, `seconds`), and the
+    object bytes sent by GetObject (`served_bytes`). boto3 clients reach it while `boto3_redirected()` is active."""
+
+    def __init__(self):
+        self.buckets: Dict[str, _Bucket] = {}
+        self.requests = Counter()
+        self.seconds = Counter()
+        self.served_bytes = 0
+        self.lock = threading.Lock()
+        self._server: Optional[_HTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @contextmanager
+    def boto3_redirected(self):
+        """Points S3 clients and resources of every boto3 session created in this process at this server,
+        unless given an `endpoint_url` of their own, with credentials it doesn't check.
+
+        The endpoint is passed explicitly: botocore reads `AWS_ENDPOINT_URL_S3` only from 1.31, which
+        needs Python 3.7, and older versions would send the dummy credentials to AWS."""
+        create_client, endpoint_url = Session.create_client, self.endpoint_url
+
+        @functools.wraps(create_client)
+        def redirected_create_client(session: Session, service_name: str, *args, **kwargs):
+            if service_name == 's3' and kwargs.get('endpoint_url') is None:
+                kwargs['endpoint_url'] = endpoint_url
+            return create_client(session, service_name, *args, **kwargs)
+
+        with MonkeyPatch.context() as patch:
+            patch.setenv('AWS_ACCESS_KEY_ID', 'local')
+            patch.setenv('AWS_SECRET_ACCESS_KEY', 'local')
+            patch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+            patch.setattr(Session, 'create_client', redirected_create_client)
+            yield self
+
+    def bucket(self, name: str) -> _Bucket:
+        try:
+            return self.buckets[name]
+        except KeyError:
+            raise _S3Error(404, 'NoSuchBucket', f'The specified bucket {quote(name)} does not exist') from None
+
+    def count(self, operation: str, seconds: float):
+        with self.lock:
+            self.requests[operation] += 1
+            self.seconds[operation] += seconds
+
+    def reset_counts(self):
+        with self.lock:
+            self.requests.clear()
+            self.seconds.clear()
+            self.served_bytes = 0
+
+    def __enter__(self):
+        self._server = _HTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.storage = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='local-s3', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
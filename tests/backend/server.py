@@ -0,0 +1,683 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'LocalNeptuneServer',
+    'artifact_file_from_dto',
+    'http_error',
+]
+
+import base64
+import os
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zipfile import ZipFile
+
+import numpy
+from bravado.exception import make_http_exception
+from bravado_core.response import IncomingResponse
+
+from neptune.new.internal.artifacts.file_hasher import FileHasher
+from neptune.new.internal.artifacts.types import ArtifactFileData
+from neptune.new.internal.backends.api_model import AttributeType, AttributeWithProperties, LeaderboardEntry
+from neptune.new.internal.container_type import ContainerType
+from neptune.new.internal.run_structure import ContainerStructure
+from neptune.new.internal.utils.paths import parse_path
+
+from tests.backend.storage import BlobStore, SeriesColumn
+
+
+class _Response(IncomingResponse):
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.reason = text
+        self.text = text
+        self.headers = {}
+        self.raw_bytes = text.encode()
+
+    def __str__(self):
+        return f'{self.status_code} {self.reason}'
+
+    def json(self, **_):
+        return {'message': self.text}
+
+
+def http_error(status_code: int, message: str = ''):
+    """Builds the same bravado exception the hosted client gets for a given status code."""
+    response = _Response(status_code, message)
+    error = make_http_exception(response, message=message)
+    # lets the exception be pickled, e.g. when raised by a `SharedLocalServer`
+    error.args = (response, message)
+    return error
+
+
+def artifact_file_from_dto(dto: dict) -> ArtifactFileData:
+    return ArtifactFileData.from_dto(
+        SimpleNamespace(**{**dto, 'metadata': [SimpleNamespace(**m) for m in dto['metadata']]})
+    )
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _from_millis(millis: int) -> datetime:
+    return datetime.fromtimestamp(millis / 1000, tz=timezone.utc)
+
+
+class StoredAttribute:
+    __slots__ = ('type', 'value')
+
+    def __init__(self, attribute_type: AttributeType, value: Any = None):
+        self.type = attribute_type
+        self.value = value
+
+
+class StoredContainer:
+    def __init__(self, container_id: str, container_type: ContainerType, project: 'StoredProject', short_id: str):
+        self.id = container_id  # pylint: disable=invalid-name
+        self.type = container_type
+        self.project = project
+        self.short_id = short_id
+        self.custom_run_id: Optional[str] = None
+        # client-side operations that reached the container, including failed and repeated ones
+        self.received_operations = 0
+        self.structure: ContainerStructure[StoredAttribute, dict] = ContainerStructure()
+
+    def attributes(self) -> Iterable[Tuple[str, StoredAttribute]]:
+        stack = [('', self.structure.get_structure())]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                path = f'{prefix}{key}'
+                if isinstance(value, dict):
+                    stack.append((f'{path}/', value))
+                else:
+                    yield path, value
+
+
+class StoredProject:
+    def __init__(self, project_id: str, name: str, workspace: str, key: str):
+        self.id = project_id  # pylint: disable=invalid-name
+        self.name = name
+        self.workspace = workspace
+        self.key = key
+        self.visibility = 'priv'
+        self.description = None
+        self.members: Dict[str, str] = {}
+        self.next_run = 1
+
+    @property
+    def qualified_name(self) -> str:
+        return f'{self.workspace}/{self.name}'
+
+
+class LocalNeptuneServer:
+    """In-process stand-in for the Neptune service.
+
+    Every public method is one API endpoint (named after the swagger operation the hosted
+    client would call); the client side lives in `LocalNeptuneBackend`. Series are kept in
+    numpy columns and files in a content-addressed `BlobStore`."""
+    ADMIN = 'e2e-admin'
+    USER = 'e2e-user'
+    TAGS_PATH = 'sys/tags'
+
+    def __init__(self, project: str = 'e2e/local', root: Optional[str] = None):
+        self._lock = threading.RLock()
+        self._blobs = BlobStore(root)
+        self._workspaces: Dict[str, SimpleNamespace] = {}
+        self._projects: Dict[str, StoredProject] = {}
+        self._containers: Dict[str, StoredContainer] = {}
+        self._artifacts: Dict[Tuple[str, str], List[dict]] = {}
+        # runs matching the last runs table query, reused while its pages are fetched
+        self._leaderboard: Optional[Tuple[tuple, List[StoredContainer]]] = None
+
+        workspace, name = project.split('/')
+        self._workspaces[workspace] = SimpleNamespace(
+            id=str(uuid.uuid4()),
+            name=workspace,
+            members={self.ADMIN: 'owner', self.USER: 'member'},
+        )
+        self.create_project(workspace, name, key='LOC')
+        self._default_project = project
+
+    @property
+    def blobs(self) -> BlobStore:
+        return self._blobs
+
+    def get_default_project(self) -> str:
+        return self._default_project
+
+    def close(self):
+        self._blobs.close()
+
+    # instrumentation, not part of the hosted API
+
+    def count_operations(self, experiment_id: str, count: int):
+        """Called by the client with the number of queued operations it's sending; requests carry
+        merged API operations, so the server couldn't tell on its own."""
+        with self._lock:
+            container = self._containers.get(experiment_id)
+            # an unknown container fails in `execute_operations`, with the client's usual error
+            if container is not None:
+                container.received_operations += count
+
+    def received_operations(self, experiment_id: str) -> int:
+        """Queued operations sent to the container so far; more than were queued means some were sent again."""
+        with self._lock:
+            return self._container(experiment_id).received_operations
+
+    # lookups
+
+    def _project(self, identifier: str) -> StoredProject:
+        project = self._projects.get(identifier)
+        if project is None:
+            project = next((p for p in self._projects.values() if p.id == identifier), None)
+        if project is None:
+            raise http_error(404, f'Project {identifier} not found')
+        return project
+
+    def _container(self, experiment_id: str) -> StoredContainer:
+        container = self._containers.get(experiment_id)
+        if container is None:
+            raise http_error(404, f'Experiment {experiment_id} not found')
+        return container
+
+    def _attribute(self, experiment_id: str, attribute: str) -> StoredAttribute:
+        value = self._container(experiment_id).structure.get(parse_path(attribute))
+        if not isinstance(value, StoredAttribute):
+            raise http_error(404, f'Attribute {attribute} not found')
+        return value
+
+    @staticmethod
+    def _project_dto(project: StoredProject):
+        return SimpleNamespace(
+            id=project.id,
+            name=project.name,
+            organizationName=project.workspace,
+            projectKey=project.key,
+            visibility=project.visibility,
+            version=2,
+        )
+
+    @staticmethod
+    def _experiment_dto(container: StoredContainer):
+        return SimpleNamespace(
+            id=container.id,
+            shortId=container.short_id,
+            organizationName=container.project.workspace,
+            projectName=container.project.name,
+            trashed=False,
+        )
+
+    # projects & workspaces
+
+    def create_project(self, workspace: str, name: str, key: str, visibility: str = 'priv',
+                       description: Optional[str] = None):
+        with self._lock:
+            if workspace not in self._workspaces:
+                raise http_error(404, f'Workspace {workspace} not found')
+            qualified_name = f'{workspace}/{name}'
+            if qualified_name in self._projects:
+                raise http_error(400, 'ERR_NOT_UNIQUE')
+            project = StoredProject(str(uuid.uuid4()), name, workspace, key)
+            project.visibility = visibility
+            project.description = description
+            project.members = {
+                user: 'manager' for user, role in self._workspaces[workspace].members.items() if role == 'owner'
+            }
+            self._projects[qualified_name] = project
+            self._create_container(project.id, ContainerType.PROJECT, project, key)
+            return self._project_dto(project)
+
+    def delete_project(self, project_identifier: str):
+        with self._lock:
+            project = self._project(project_identifier)
+            del self._projects[project.qualified_name]
+            for container_id in [c.id for c in self._containers.values() if c.project is project]:
+                del self._containers[container_id]
+            self._leaderboard = None
+
+    def get_project(self, project_identifier: str):
+        with self._lock:
+            return self._project_dto(self._project(project_identifier))
+
+    def list_projects(self, organization_identifier: Optional[str] = None, search_term: Optional[str] = None,
+                      user: Optional[str] = None):
+        with self._lock:
+            return [
+                self._project_dto(project) for project in self._projects.values()
+                if (organization_identifier is None or project.workspace == organization_identifier)
+                and (search_term is None or search_term in project.name)
+                and (user is None or user in project.members)
+            ]
+
+    def list_organizations(self):
+        with self._lock:
+            return [SimpleNamespace(id=w.id, name=w.name) for w in self._workspaces.values()]
+
+    def list_organization_members(self, organization_identifier: str) -> Dict[str, str]:
+        with self._lock:
+            if organization_identifier not in self._workspaces:
+                raise http_error(404, f'Workspace {organization_identifier} not found')
+            return dict(self._workspaces[organization_identifier].members)
+
+    def list_project_members(self, project_identifier: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._project(project_identifier).members)
+
+    def add_project_member(self, project_identifier: str, user_id: str, role: str):
+        with self._lock:
+            project = self._project(project_identifier)
+            if user_id in project.members:
+                raise http_error(409, f'User {user_id} already has access')
+            project.members[user_id] = role
+
+    def delete_project_member(self, project_identifier: str, user_id: str):
+        with self._lock:
+            project = self._project(project_identifier)
+            if user_id not in project.members:
+                raise http_error(422, f'User {user_id} has no access')
+            del project.members[user_id]
+
+    # containers
+
+    def _create_container(self, container_id: str, container_type: ContainerType, project: StoredProject,
+                          short_id: str) -> StoredContainer:
+        container = StoredContainer(container_id, container_type, project, short_id)
+        now = _now()
+        for path, attribute in (
+                ('sys/id', StoredAttribute(AttributeType.STRING, short_id)),
+                ('sys/state', StoredAttribute(AttributeType.RUN_STATE, 'running')),
+                ('sys/owner', StoredAttribute(AttributeType.STRING, self.USER)),
+                ('sys/size', StoredAttribute(AttributeType.FLOAT, 0.0)),
+                ('sys/tags', StoredAttribute(AttributeType.STRING_SET, set())),
+                ('sys/creation_time', StoredAttribute(AttributeType.DATETIME, now)),
+                ('sys/modification_time', StoredAttribute(AttributeType.DATETIME, now)),
+                ('sys/ping_time', StoredAttribute(AttributeType.DATETIME, now)),
+                ('sys/running_time', StoredAttribute(AttributeType.FLOAT, 0.0)),
+                ('sys/monitoring_time', StoredAttribute(AttributeType.INT, 0)),
+        ):
+            container.structure.set(parse_path(path), attribute)
+        self._containers[container_id] = container
+        self._leaderboard = None
+        return container
+
+    def create_experiment(self, project_identifier: str, git_info: Optional[dict] = None,
+                          custom_id: Optional[str] = None):
+        with self._lock:
+            project = self._project(project_identifier)
+            if custom_id is not None:
+                for container in self._containers.values():
+                    if container.project is project and container.custom_run_id == custom_id:
+                        return self._experiment_dto(container)
+
+            short_id = f'{project.key}-{project.next_run}'
+            project.next_run += 1
+            container = self._create_container(str(uuid.uuid4()), ContainerType.RUN, project, short_id)
+            container.custom_run_id = custom_id
+            if git_info:
+                container.structure.set(['source_code', 'git'], StoredAttribute(AttributeType.GIT_REF, git_info))
+            return self._experiment_dto(container)
+
+    def get_experiment(self, experiment_id: str):
+        """Accepts a container UUID or a `workspace/project/SHORT-ID` qualified name."""
+        with self._lock:
+            container = self._containers.get(experiment_id)
+            if container is None and experiment_id.count('/') == 2:
+                workspace, name, short_id = experiment_id.split('/')
+                container = next(
+                    (c for c in self._containers.values()
+                     if c.short_id == short_id and c.project.qualified_name == f'{workspace}/{name}'),
+                    None
+                )
+            if container is None:
+                raise http_error(404, f'Experiment {experiment_id} not found')
+            return self._experiment_dto(container)
+
+    def ping(self, experiment_id: str):
+        with self._lock:
+            self._attribute(experiment_id, 'sys/ping_time').value = _now()
+
+    # operations
+
+    def execute_operations(self, experiment_id: str, operations: List[dict]) -> List[str]:
+        """Applies API-shaped operations (`{"path": ..., "<apiName>": {...}}`); returns error descriptions."""
+        errors = []
+        with self._lock:
+            container = self._container(experiment_id)
+            self._leaderboard = None
+            for operation in operations:
+                path = operation['path']
+                (name, payload), = ((k, v) for k, v in operation.items() if k != 'path')
+                error = self._apply(container, path, name, payload)
+                if error:
+                    errors.append(error)
+            if operations:
+                container.structure.get(['sys', 'modification_time']).value = _now()
+        return errors
+
+    _ATOM_OPERATIONS = {
+        'assignFloat': AttributeType.FLOAT,
+        'assignInt': AttributeType.INT,
+        'assignBool': AttributeType.BOOL,
+        'assignString': AttributeType.STRING,
+        'assignDatetime': AttributeType.DATETIME,
+        'assignArtifact': AttributeType.ARTIFACT,
+        'clearArtifact': AttributeType.ARTIFACT,
+    }
+    _SERIES_OPERATIONS = {
+        'logFloats': AttributeType.FLOAT_SERIES,
+        'clearFloatSeries': AttributeType.FLOAT_SERIES,
+        'configFloatSeries': AttributeType.FLOAT_SERIES,
+        'logStrings': AttributeType.STRING_SERIES,
+        'clearStringSeries': AttributeType.STRING_SERIES,
+        'logImages': AttributeType.IMAGE_SERIES,
+        'clearImageSeries': AttributeType.IMAGE_SERIES,
+    }
+    _SET_OPERATIONS = ('insertStrings', 'removeStrings', 'clearStringSet')
+
+    def _apply(self, container: StoredContainer, path: str, name: str, payload: dict) -> Optional[str]:
+        parsed_path = parse_path(path)
+        try:
+            current = container.structure.get(parsed_path)
+        except Exception as error:  # path runs through an attribute
+            return str(error)
+        if isinstance(current, dict):
+            return f'{path} is a namespace, not an attribute'
+
+        if name == 'deleteAttribute':
+            if current is None:
+                return f'Cannot delete {path}. Attribute not found.'
+            container.structure.pop(parsed_path)
+            return None
+
+        expected_type = self._ATOM_OPERATIONS.get(name) or self._SERIES_OPERATIONS.get(name)
+        if expected_type is None and name in self._SET_OPERATIONS:
+            if path != self.TAGS_PATH:
+                return f'Cannot modify {path}. Only {self.TAGS_PATH} is a string set'
+            expected_type = AttributeType.STRING_SET
+        elif expected_type is None and name == 'deleteFiles':
+            expected_type = AttributeType.FILE_SET
+        elif expected_type is None:
+            return f'Unsupported operation {name}'
+
+        if current is not None and current.type != expected_type:
+            return f'Cannot perform {name} on {path}. Expected {expected_type.value}, {current.type.value} found.'
+        if current is None:
+            current = StoredAttribute(expected_type, self._empty_value(expected_type))
+            try:
+                container.structure.set(parsed_path, current)
+            except Exception as error:  # conflicts with a namespace
+                return str(error)
+
+        if name == 'assignDatetime':
+            current.value = _from_millis(payload['valueMilliseconds'])
+        elif name == 'assignArtifact':
+            current.value = payload['hash']
+        elif name == 'clearArtifact':
+            current.value = None
+        elif name in self._ATOM_OPERATIONS:
+            current.value = payload['value']
+        elif name in ('logFloats', 'logStrings'):
+            entries = payload['entries']
+            current.value.append(
+                [e['step'] for e in entries],
+                [e['timestampMilliseconds'] for e in entries],
+                [e['value'] for e in entries],
+            )
+        elif name == 'logImages':
+            entries = payload['entries']
+            current.value.append(
+                [e['step'] for e in entries],
+                [e['timestampMilliseconds'] for e in entries],
+                [self._blobs.put(base64.b64decode(e['value']['data'])) for e in entries],
+            )
+        elif name.startswith('clear') and expected_type in self._SERIES_OPERATIONS.values():
+            current.value.clear()
+        elif name == 'insertStrings':
+            current.value.update(payload['values'])
+        elif name == 'removeStrings':
+            current.value.difference_update(payload['values'])
+        elif name == 'clearStringSet':
+            current.value.clear()
+        elif name == 'deleteFiles':
+            for file_path in payload['filePaths']:
+                current.value.pop(file_path, None)
+        return None
+
+    @staticmethod
+    def _empty_value(attribute_type: AttributeType):
+        if attribute_type == AttributeType.FLOAT_SERIES:
+            return SeriesColumn(numpy.float64)
+        if attribute_type in (AttributeType.STRING_SERIES, AttributeType.IMAGE_SERIES):
+            return SeriesColumn(object)
+        if attribute_type == AttributeType.STRING_SET:
+            return set()
+        if attribute_type == AttributeType.FILE_SET:
+            return {}
+        return None
+
+    # attributes
+
+    def _properties(self, attribute: StoredAttribute):
+        value = attribute.value
+        if attribute.type in (AttributeType.FLOAT_SERIES, AttributeType.STRING_SERIES):
+            last = value.last()
+            return SimpleNamespace(last=float(last) if attribute.type == AttributeType.FLOAT_SERIES and last is not None
+                                   else last)
+        if attribute.type == AttributeType.IMAGE_SERIES:
+            return SimpleNamespace(lastStep=value.last_step())
+        if attribute.type == AttributeType.STRING_SET:
+            return SimpleNamespace(values=sorted(value))
+        if attribute.type == AttributeType.ARTIFACT:
+            return SimpleNamespace(hash=value)
+        if attribute.type == AttributeType.FILE:
+            digest, name, ext = value
+            return SimpleNamespace(name=name, ext=ext, size=self._blobs.size(digest))
+        if attribute.type == AttributeType.FILE_SET:
+            return SimpleNamespace(size=sum(self._blobs.size(digest) for digest in value.values()))
+        if attribute.type == AttributeType.GIT_REF:
+            return SimpleNamespace(commit=SimpleNamespace(commitId=(value.get('commit') or {}).get('commitId')))
+        return SimpleNamespace(value=value)
+
+    def get_experiment_attributes(self, experiment_id: str) -> List[AttributeWithProperties]:
+        with self._lock:
+            return [
+                AttributeWithProperties(path, attribute.type, self._properties(attribute))
+                for path, attribute in self._container(experiment_id).attributes()
+            ]
+
+    def get_attribute(self, experiment_id: str, attribute: str) -> AttributeWithProperties:
+        with self._lock:
+            stored = self._attribute(experiment_id, attribute)
+            return AttributeWithProperties(attribute, stored.type, self._properties(stored))
+
+    def _series(self, experiment_id: str, attribute: str, attribute_type: AttributeType) -> SeriesColumn:
+        stored = self._attribute(experiment_id, attribute)
+        if stored.type != attribute_type:
+            raise http_error(400, f'Attribute {attribute} is not {attribute_type.value}')
+        return stored.value
+
+    def get_float_series_values(self, experiment_id: str, attribute: str, offset: int, limit: int):
+        """Returns `(total_item_count, steps, timestamps, values)` with numpy columns for the requested page."""
+        with self._lock:
+            column = self._series(experiment_id, attribute, AttributeType.FLOAT_SERIES)
+            return (len(column), *(array.copy() for array in column.slice(offset, limit)))
+
+    def get_string_series_values(self, experiment_id: str, attribute: str, offset: int, limit: int):
+        with self._lock:
+            column = self._series(experiment_id, attribute, AttributeType.STRING_SERIES)
+            return (len(column), *(array.copy() for array in column.slice(offset, limit)))
+
+    def get_image_series_values(self, experiment_id: str, attribute: str, offset: int, limit: int) -> int:
+        # pylint: disable=unused-argument
+        with self._lock:
+            return len(self._series(experiment_id, attribute, AttributeType.IMAGE_SERIES))
+
+    # files
+
+    def upload_attribute(self, experiment_id: str, attribute: str, source, ext: str, name: str) -> Optional[str]:
+        """Stores a file attribute; `source` is a local path or raw bytes."""
+        digest = self._blobs.put(source)
+        with self._lock:
+            container = self._container(experiment_id)
+            try:
+                current = container.structure.get(parse_path(attribute))
+            except Exception as error:  # path runs through an attribute
+                return str(error)
+            if isinstance(current, dict):
+                return f'Cannot upload file to {attribute}. Expected file, namespace found.'
+            if current is not None and current.type != AttributeType.FILE:
+                return f'Cannot upload file to {attribute}. Expected file, {current.type.value} found.'
+            container.structure.set(parse_path(attribute), StoredAttribute(AttributeType.FILE, (digest, name, ext)))
+            return None
+
+    def upload_file_set_attribute(self, experiment_id: str, attribute: str, entries: List[Tuple[str, str]],
+                                  reset: bool) -> Optional[str]:
+        """Adds `(source_path, target_path)` entries to a file set, replacing it first when `reset`."""
+        digests = [(target_path, self._blobs.put(source_path)) for source_path, target_path in entries]
+        with self._lock:
+            container = self._container(experiment_id)
+            try:
+                current = container.structure.get(parse_path(attribute))
+            except Exception as error:  # path runs through an attribute
+                return str(error)
+            if isinstance(current, dict):
+                return f'Cannot upload files to {attribute}. Expected fileSet, namespace found.'
+            if current is not None and current.type != AttributeType.FILE_SET:
+                return f'Cannot upload files to {attribute}. Expected fileSet, {current.type.value} found.'
+            if current is None or reset:
+                current = StoredAttribute(AttributeType.FILE_SET, {})
+                container.structure.set(parse_path(attribute), current)
+            current.value.update(digests)
+            return None
+
+    def download_attribute(self, experiment_id: str, attribute: str) -> Tuple[str, str]:
+        """Returns `(path_to_stream_from, content_disposition_filename)`."""
+        with self._lock:
+            stored = self._attribute(experiment_id, attribute)
+            if stored.type != AttributeType.FILE:
+                raise http_error(400, f'Attribute {attribute} is not a file')
+            digest, _, ext = stored.value
+            filename = parse_path(attribute)[-1] + (f'.{ext}' if ext else '')
+            return self._blobs.path(digest), filename
+
+    def download_file_set_attribute_zip(self, experiment_id: str, attribute: str) -> Tuple[str, str]:
+        with self._lock:
+            stored = self._attribute(experiment_id, attribute)
+            if stored.type != AttributeType.FILE_SET:
+                raise http_error(400, f'Attribute {attribute} is not a file set')
+            entries = sorted(stored.value.items())
+        descriptor, zip_path = tempfile.mkstemp(suffix='.zip', dir=self._blobs.root)
+        os.close(descriptor)
+        with ZipFile(zip_path, 'w') as zipped:
+            zipped.writestr('/', '')
+            for target_path, digest in entries:
+                zipped.write(self._blobs.path(digest), target_path)
+        return zip_path, parse_path(attribute)[-1] + '.zip'
+
+    def get_image_series_value(self, experiment_id: str, attribute: str, index: int) -> Tuple[str, str]:
+        with self._lock:
+            column = self._series(experiment_id, attribute, AttributeType.IMAGE_SERIES)
+            if not 0 <= index < len(column):
+                raise http_error(404, f'No image {index} in {attribute}')
+            _, _, digests = column.slice(index, 1)
+            return self._blobs.path(digests[0]), f'{index}.png'
+
+    # artifacts
+
+    def create_new_artifact(self, project_identifier: str, artifact_hash: str, parent_identifier: str,
+                            size: Optional[int]):
+        # pylint: disable=unused-argument
+        with self._lock:
+            project = self._project(project_identifier)
+            received = (project.id, artifact_hash) in self._artifacts
+            return SimpleNamespace(artifactHash=artifact_hash, receivedMetadata=received, size=size)
+
+    def upload_artifact_files_metadata(self, project_identifier: str, artifact_hash: str, files: List[dict]):
+        with self._lock:
+            project = self._project(project_identifier)
+            self._artifacts[(project.id, artifact_hash)] = list(files)
+            return SimpleNamespace(artifactHash=artifact_hash, receivedMetadata=True, size=None)
+
+    def create_artifact_version(self, project_identifier: str, artifact_hash: str, parent_identifier: str,
+                                files: List[dict]):
+        """Merges `files` into an existing artifact (by file path) and stores the result under its new hash."""
+        # pylint: disable=unused-argument
+        with self._lock:
+            project = self._project(project_identifier)
+            existing = self._artifacts.get((project.id, artifact_hash))
+            if existing is None:
+                raise http_error(404, f'Artifact {artifact_hash} not found')
+            merged = {dto['filePath']: dto for dto in existing}
+            merged.update((dto['filePath'], dto) for dto in files)
+            new_files = list(merged.values())
+            new_hash = FileHasher.get_artifact_hash(artifact_file_from_dto(dto) for dto in new_files)
+            self._artifacts[(project.id, new_hash)] = new_files
+            return SimpleNamespace(artifactHash=new_hash, receivedMetadata=True, size=None)
+
+    def list_artifact_files(self, project_identifier: str, artifact_hash: str) -> List[dict]:
+        with self._lock:
+            project = self._project(project_identifier)
+            files = self._artifacts.get((project.id, artifact_hash))
+            if files is None:
+                raise http_error(404, f'Artifact {artifact_hash} not found')
+            return list(files)
+
+    # runs table
+
+    def _matching_runs(self, project: StoredProject, short_id, state, owner, tags) -> List[StoredContainer]:
+        matching = []
+        for container in self._containers.values():
+            if container.project is not project or container.type != ContainerType.RUN:
+                continue
+            sys_attributes = container.structure.get(['sys'])
+            if short_id and container.short_id not in short_id:
+                continue
+            if state and sys_attributes['state'].value not in state:
+                continue
+            if owner and sys_attributes['owner'].value not in owner:
+                continue
+            if tags and not set(tags).issubset(sys_attributes['tags'].value):
+                continue
+            matching.append(container)
+        return matching
+
+    def get_leaderboard(self, project_identifier: str, short_id: Optional[Iterable[str]] = None,
+                        state: Optional[Iterable[str]] = None, owner: Optional[Iterable[str]] = None,
+                        tags: Optional[Iterable[str]] = None, limit: int = 100,
+                        offset: int = 0) -> List[LeaderboardEntry]:
+        with self._lock:
+            project = self._project(project_identifier)
+            # clients page through a query with growing offsets; filtering all runs for each page is quadratic
+            query = (project.id,) + tuple(
+                tuple(criterion) if criterion else None for criterion in (short_id, state, owner, tags)
+            )
+            if self._leaderboard is None or self._leaderboard[0] != query:
+                self._leaderboard = (query, self._matching_runs(project, short_id, state, owner, tags))
+            matching = self._leaderboard[1]
+            return [
+                LeaderboardEntry(
+                    container.id,
+                    [AttributeWithProperties(path, attribute.type, self._properties(attribute))
+                     for path, attribute in container.attributes()]
+                )
+                for container in matching[offset:offset + limit]
+            ]
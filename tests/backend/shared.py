@@ -0,0 +1,89 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'SharedLocalServer',
+    'connect_local_server',
+]
+
+import multiprocessing
+import shutil
+import tempfile
+from multiprocessing.managers import BaseManager
+from typing import Optional, Tuple
+
+from tests.backend.server import LocalNeptuneServer
+
+_SERVER: Optional[LocalNeptuneServer] = None
+
+
+def _create_server(project: str, root: str):
+    # runs in the manager process
+    global _SERVER  # pylint: disable=global-statement
+    _SERVER = LocalNeptuneServer(project, root=root)
+
+
+def _get_server() -> LocalNeptuneServer:
+    return _SERVER
+
+
+class _ServerManager(BaseManager):
+    pass
+
+
+_ServerManager.register('get_server', _get_server)
+
+
+def connect_local_server(address: Tuple[str, int], authkey: Optional[bytes] = None):
+    """Proxy of a `SharedLocalServer` started elsewhere; usable wherever a `LocalNeptuneServer` is.
+
+    Processes started by `multiprocessing` inherit the authkey, other ones have to pass it."""
+    manager = _ServerManager(address=address, authkey=authkey)
+    manager.connect()
+    return manager.get_server()
+
+
+class SharedLocalServer:
+    """`LocalNeptuneServer` living in a manager process, so that forked and spawned workers,
+    and subprocesses like `neptune sync`, all talk to the same state.
+
+    Calls go through a local socket, so use the in-process server where a single process is enough."""
+
+    def __init__(self, project: str = 'e2e/local', start_method: Optional[str] = None):
+        self._project = project
+        self._context = multiprocessing.get_context(start_method)
+        self._root: Optional[str] = None
+        self._manager: Optional[_ServerManager] = None
+        self.server = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._manager.address
+
+    @property
+    def authkey(self) -> bytes:
+        return bytes(self._context.current_process().authkey)
+
+    def __enter__(self):
+        self._root = tempfile.mkdtemp(prefix='neptune-e2e-shared-')
+        self._manager = _ServerManager(address=('127.0.0.1', 0), ctx=self._context)
+        self._manager.start(initializer=_create_server, initargs=(self._project, self._root))
+        self.server = self._manager.get_server()
+        return self
+
+    def __exit__(self, *_):
+        self.server = None
+        self._manager.shutdown()
+        shutil.rmtree(self._root, ignore_errors=True)
@@ -0,0 +1,156 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'BlobStore',
+    'SeriesColumn',
+]
+
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Optional, Tuple, Union
+
+import numpy
+
+CHUNK_SIZE = 2 ** 20
+
+
+class SeriesColumn:
+    """Append-only series kept in three numpy columns (step, timestamp, value).
+
+    Columns grow geometrically, so appending is amortized O(1) and a series with
+    millions of points costs a few contiguous arrays instead of millions of objects."""
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, dtype=numpy.float64):
+        self._dtype = dtype
+        self._size = 0
+        self._steps, self._timestamps, self._values = self._allocate(self.INITIAL_CAPACITY)
+
+    def _allocate(self, capacity: int):
+        return (
+            numpy.empty(capacity, dtype=numpy.float64),
+            numpy.empty(capacity, dtype=numpy.int64),
+            numpy.empty(capacity, dtype=self._dtype),
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self._steps.nbytes + self._timestamps.nbytes + self._values.nbytes
+
+    def _reserve(self, capacity: int):
+        if capacity <= len(self._values):
+            return
+        new_capacity = max(capacity, 2 * len(self._values))
+        for name in ('_steps', '_timestamps', '_values'):
+            column = getattr(self, name)
+            grown = numpy.empty(new_capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def last_step(self) -> Optional[float]:
+        return float(self._steps[self._size - 1]) if self._size else None
+
+    def last(self):
+        return self._values[self._size - 1] if self._size else None
+
+    def append(self, steps, timestamps, values):
+        """Appends points; `None` steps continue numbering after the last stored step."""
+        count = len(values)
+        if not count:
+            return
+        self._reserve(self._size + count)
+        start, end = self._size, self._size + count
+
+        # `None` becomes NaN; every missing step is "last known step + distance to it"
+        steps = numpy.array(steps, dtype=numpy.float64)
+        missing = numpy.isnan(steps)
+        if missing.any():
+            previous = self.last_step()
+            positions = numpy.arange(count)
+            last_known = numpy.maximum.accumulate(numpy.where(missing, -1, positions))
+            base = numpy.where(last_known >= 0, steps[last_known.clip(0)], -1.0 if previous is None else previous)
+            steps = numpy.where(missing, base + positions - last_known, steps)
+        self._steps[start:end] = steps
+        self._timestamps[start:end] = timestamps
+        self._values[start:end] = values
+        self._size = end
+
+    def slice(self, offset: int, limit: int) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        end = min(self._size, offset + limit)
+        return self._steps[offset:end], self._timestamps[offset:end], self._values[offset:end]
+
+    def clear(self):
+        self._size = 0
+        self._steps, self._timestamps, self._values = self._allocate(self.INITIAL_CAPACITY)
+
+
+class BlobStore:
+    """Content-addressed file store; identical payloads are kept once on disk."""
+
+    def __init__(self, root: Optional[str] = None):
+        self._owned = root is None
+        self._root = root or tempfile.mkdtemp(prefix='neptune-e2e-blobs-')
+        os.makedirs(self._root, exist_ok=True)
+
+    @property
+    def root(self) -> str:
+        return self._root
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self._root, digest[:2], digest)
+
+    def size(self, digest: str) -> int:
+        return os.path.getsize(self.path(digest))
+
+    def _commit(self, tmp_path: str, digest: str) -> str:
+        target = self.path(digest)
+        if os.path.exists(target):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+        return digest
+
+    def put(self, source: Union[str, bytes]) -> str:
+        """Stores a file (given by path) or raw bytes and returns its sha256 digest."""
+        sha = hashlib.sha256()
+        descriptor, tmp_path = tempfile.mkstemp(dir=self._root)
+        with os.fdopen(descriptor, 'wb') as target:
+            if isinstance(source, bytes):
+                sha.update(source)
+                target.write(source)
+            else:
+                with open(source, 'rb') as handler:
+                    for chunk in iter(lambda: handler.read(CHUNK_SIZE), b''):
+                        sha.update(chunk)
+                        target.write(chunk)
+        return self._commit(tmp_path, sha.hexdigest())
+
+    def copy_to(self, digest: str, destination: str):
+        shutil.copyfile(self.path(digest), destination)
+
+    def close(self):
+        if self._owned:
+            shutil.rmtree(self._root, ignore_errors=True)
@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import json
+import socketserver
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import jwt
+import requests
+
+from tests.backend.cassette import Cassette, body_shape, record_cassette, replay_cassette
+
+SLOW_SECONDS = 0.2
+TIMEOUT = 10
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _answer(self, content: bytes, content_type: str = 'application/json'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path.startswith('/slow'):
+            time.sleep(SLOW_SECONDS)
+        if self.path.startswith('/blob'):
+            self._answer(bytes(range(256)), 'application/octet-stream')
+        elif self.path.startswith('/token'):
+            self._answer(json.dumps({'accessToken': 'secret-access', 'refreshToken': 'secret-refresh'}).encode())
+        else:
+            self._answer(json.dumps({'path': self.path}).encode())
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self._answer(json.dumps({'echo': body, 'id': str(uuid.uuid4())}).encode())
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    # `http.server.ThreadingHTTPServer` comes with Python 3.7
+    daemon_threads = True
+
+
+@contextmanager
+def _serving():
+    server = _HTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _record(url: str, path) -> Cassette:
+    with record_cassette({'project': 'workspace/project'}) as recorder:
+        recorder.test = 'test_a'
+        key = uuid.uuid4()
+        requests.post(f'{url}/operations', json={'path': f'Test/{key}', 'values': [1, 2]}, timeout=TIMEOUT)
+        requests.get(f'{url}/attributes?path=Test/{key}', timeout=TIMEOUT)
+        requests.get(f'{url}/blob', stream=True, timeout=TIMEOUT)
+        requests.get(f'{url}/token', timeout=TIMEOUT)
+        requests.get(f'{url}/slow', timeout=TIMEOUT)
+    recorder.cassette.save(str(path))
+    return Cassette.load(str(path))
+
+
+class TestCassette:
+    def test_replays_without_network(self, tmp_path):
+        with _serving() as http_server:
+            cassette = _record(http_server, tmp_path / 'cassette.json.gz')
+        assert cassette.environment == {'project': 'workspace/project'}
+        assert len(cassette.interactions) == 5
+        assert 'secret' not in (tmp_path / 'cassette.json.gz').read_bytes().decode('latin-1')
+
+        with replay_cassette(cassette) as replayer:
+            replayer.test = 'test_a'
+            key = uuid.uuid4()
+            # a batch of another length has the same shape
+            echoed = requests.post(
+                f'{http_server}/operations', json={'path': f'Test/{key}', 'values': [3]}, timeout=TIMEOUT
+            ).json()
+            assert echoed['echo'] == {'path': f'Test/{key}', 'values': [1, 2]}
+            assert requests.get(f'{http_server}/attributes?path=Test/{key}', timeout=TIMEOUT).json() == {
+                'path': f'/attributes?path=Test/{key}'
+            }
+            blob = requests.get(f'{http_server}/blob', stream=True, timeout=TIMEOUT)
+            assert b''.join(blob.iter_content(100)) == bytes(range(256))
+            tokens = requests.get(f'{http_server}/token', timeout=TIMEOUT).json()
+            assert jwt.decode(tokens['accessToken'], options={'verify_signature': False})['exp'] > time.time()
+            assert tokens['refreshToken'] != 'secret-refresh'
+            # served again once replayed
+            assert requests.get(f'{http_server}/blob', timeout=TIMEOUT).content == bytes(range(256))
+            assert requests.get(f'{http_server}/unknown', timeout=TIMEOUT).status_code == 404
+
+        assert replayer.replayed == 5
+        assert replayer.unmatched == [f'test_a: GET {http_server}/unknown']
+
+    def test_original_timing(self, tmp_path):
+        with _serving() as http_server:
+            cassette = _record(http_server, tmp_path / 'cassette.json.gz')
+
+        for timing, slow in (('fast', False), ('original', True)):
+            with replay_cassette(cassette, timing):
+                start = time.monotonic()
+                requests.get(f'{http_server}/slow', timeout=TIMEOUT)
+                assert (time.monotonic() - start >= SLOW_SECONDS) == slow
+
+    def test_body_shape(self):
+        assert body_shape(b'{"a": [1, 2], "b": "x"}') == body_shape('{"b": "y", "a": [3]}')
+        assert body_shape(b'{"a": [1, 2]}') != body_shape(b'{"a": ["1"]}')
+        assert body_shape(b'\x00binary') == 'bytes'
+        assert body_shape(None) == ''
@@ -0,0 +1,48 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import boto3
+import pytest
+
+from tests.s3_utils import object_content, seed_objects
+
+BUCKET = 'listed'
+
+
+class TestLocalS3Server:
+    def test_paginated_listing(self, local_s3):
+        if local_s3 is None:
+            pytest.skip('tests the local S3 stand-in')
+        client = boto3.client('s3')
+        client.create_bucket(Bucket=BUCKET)
+        expected = seed_objects(BUCKET, 25, prefix='inside/', size=100, workers=4)
+        seed_objects(BUCKET, 5, prefix='outside/', size=100, workers=4)
+        local_s3.reset_counts()
+
+        for operation in ('list_objects', 'list_objects_v2'):
+            pages = client.get_paginator(operation).paginate(Bucket=BUCKET, Prefix='inside/', PaginationConfig={
+                'PageSize': 10,
+            })
+            listed = {item['Key']: item['ETag'].strip('"') for page in pages for item in page['Contents']}
+            assert listed == expected
+        assert local_s3.requests == {'ListObjects': 3, 'ListObjectsV2': 3}
+
+        key = sorted(expected)[0]
+        ranged = client.get_object(Bucket=BUCKET, Key=key, Range='bytes=10-19')['Body'].read()
+        assert ranged == object_content(key, 100)[10:20]
+        assert local_s3.served_bytes == 10
+
+        boto3.resource('s3').Bucket(BUCKET).objects.all().delete()
+        client.delete_bucket(Bucket=BUCKET)
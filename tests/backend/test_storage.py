@@ -0,0 +1,53 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import numpy
+
+from tests.backend.storage import BlobStore, SeriesColumn
+
+
+class TestSeriesColumn:
+    def test_missing_steps_numbering(self):
+        column = SeriesColumn()
+        column.append([None, None, 10, None], [1, 2, 3, 4], [0.1, 0.2, 0.3, 0.4])
+        column.append([None], [5], [0.5])
+
+        steps, timestamps, values = column.slice(0, 10)
+        assert steps.tolist() == [0, 1, 10, 11, 12]
+        assert timestamps.tolist() == [1, 2, 3, 4, 5]
+        assert values.tolist() == [0.1, 0.2, 0.3, 0.4, 0.5]
+
+    def test_grows_past_capacity(self):
+        column = SeriesColumn()
+        count = 3 * SeriesColumn.INITIAL_CAPACITY + 1
+        column.append(numpy.arange(count), numpy.zeros(count), numpy.arange(count))
+
+        assert len(column) == count
+        assert column.last() == count - 1
+        assert column.slice(count - 2, 10)[0].tolist() == [count - 2, count - 1]
+
+        column.clear()
+        assert len(column) == 0 and column.last_step() is None
+
+
+class TestBlobStore:
+    def test_dedups_identical_payloads(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+        source = tmp_path / 'source'
+        source.write_bytes(b'payload')
+
+        assert store.put(b'payload') == store.put(str(source))
+        assert store.size(store.put(b'payload')) == len(b'payload')
+        assert len([path for path in tmp_path.rglob('*') if path.is_file()]) == 2  # source + one blob
@@ -0,0 +1,178 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'ENDPOINTS',
+    'EndpointTraffic',
+    'payload_size',
+    'received_size',
+    'record_traffic',
+    'sent_size',
+]
+
+import functools
+import inspect
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Iterable, Optional
+
+import numpy
+from _pytest.monkeypatch import MonkeyPatch
+
+from tests.backend.server import LocalNeptuneServer
+
+# server methods that aren't part of the hosted API
+_INSTRUMENTATION = {'blobs', 'close', 'count_operations', 'get_default_project', 'received_operations'}
+# every other public method stands for one endpoint of the service
+ENDPOINTS = sorted(
+    name for name, _ in inspect.getmembers(LocalNeptuneServer, inspect.isfunction)
+    if not name.startswith('_') and name not in _INSTRUMENTATION
+)
+# arguments and results naming local files whose content the service would have sent or received instead
+_FILE_ARGUMENTS = {'upload_attribute': 'source', 'upload_file_set_attribute': 'entries'}
+_FILE_RESULTS = {'download_attribute', 'download_file_set_attribute_zip', 'get_image_series_value'}
+# endpoints returning a container the client goes on to use
+_CONTAINER_RESULTS = {'create_experiment', 'get_experiment'}
+
+
+def payload_size(value) -> int:
+    """Bytes `value` takes in a request or response, roughly as the JSON the hosted API exchanges."""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, Enum):
+        return payload_size(value.value)
+    if isinstance(value, (bool, int, float, datetime, numpy.generic)):
+        return len(str(value))
+    if isinstance(value, numpy.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(payload_size(key) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(payload_size(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return payload_size(vars(value))
+    return len(str(value))
+
+
+def _file_size(path) -> int:
+    return os.path.getsize(path) if isinstance(path, str) and os.path.isfile(path) else 0
+
+
+def sent_size(endpoint: str, arguments: Dict[str, object]) -> int:
+    """Bytes of a request to `endpoint` made with `arguments` (by parameter name)."""
+    files = _FILE_ARGUMENTS.get(endpoint)
+    if files == 'source':
+        source = arguments['source']
+        return payload_size(source) if isinstance(source, bytes) else _file_size(source)
+    if files == 'entries':
+        return sum(_file_size(source_path) + payload_size(target_path)
+                   for source_path, target_path in arguments['entries'])
+    return payload_size(arguments)
+
+
+def received_size(endpoint: str, result) -> int:
+    """Bytes of the response of `endpoint` that returned `result`."""
+    if endpoint in _FILE_RESULTS:
+        path, filename = result
+        return _file_size(path) + payload_size(filename)
+    return payload_size(result)
+
+
+class EndpointTraffic:
+    """Requests served by the stand-in and bytes sent and received with them, by endpoint."""
+
+    def __init__(self):
+        self.requests = Counter()
+        self.sent_bytes = Counter()
+        self.received_bytes = Counter()
+        self._containers = None
+        self._lock = threading.Lock()
+
+    def limit_to(self, containers: Iterable[str]):
+        """Leaves out requests about containers other than `containers` and the ones created or looked up
+        through the recorded requests, like the monitoring of runs other tests left open."""
+        with self._lock:
+            self._containers = set(containers)
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def add(self, endpoint: str, sent: int, received: int):
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.sent_bytes[endpoint] += sent
+            self.received_bytes[endpoint] += received
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            endpoint: {
+                'requests': self.requests[endpoint],
+                'sent_bytes': self.sent_bytes[endpoint],
+                'received_bytes': self.received_bytes[endpoint],
+            }
+            for endpoint in sorted(self.requests)
+        }
+
+    def _recorded(self, endpoint: str, container_id: Optional[str]) -> bool:
+        if self._containers is None or container_id is None or endpoint in _CONTAINER_RESULTS:
+            return True
+        with self._lock:
+            return container_id in self._containers
+
+    def wrap(self, function, endpoint: str):
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def recorded(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            if not self._recorded(endpoint, arguments.get('experiment_id')):
+                return function(*args, **kwargs)
+
+            sent = sent_size(endpoint, arguments)
+            received = 0
+            try:
+                result = function(*args, **kwargs)
+                received = received_size(endpoint, result)
+                if self._containers is not None and endpoint in _CONTAINER_RESULTS:
+                    with self._lock:
+                        self._containers.add(result.id)
+                return result
+            finally:
+                # failed requests count too, with the size of the error left out
+                self.add(endpoint, sent, received)
+
+        return recorded
+
+
+@contextmanager
+def record_traffic(server: LocalNeptuneServer, traffic: Optional[EndpointTraffic] = None):
+    """Records every request `server` serves, from any thread, into `traffic` (a new one unless given).
+
+    Only works with an in-process server: the proxy of a `SharedLocalServer` serves other processes directly."""
+    if traffic is None:
+        traffic = EndpointTraffic()
+    with MonkeyPatch.context() as patch:
+        for endpoint in ENDPOINTS:
+            patch.setattr(server, endpoint, traffic.wrap(getattr(server, endpoint), endpoint))
+        yield traffic
@@ -0,0 +1,44 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pytest
+
+from tests.benchmarks.results import Benchmark, BenchmarkResults
+
+_results = BenchmarkResults()
+
+
+@pytest.fixture()
+def benchmark(request):
+    return Benchmark(request.node.nodeid, _results, request.config.getoption('--benchmark-scale'))
+
+
+def pytest_sessionfinish(session):
+    if not _results:
+        return
+    config = session.config
+    _results.dump(config.getoption('--benchmark-json'))
+
+    baseline = config.getoption('--benchmark-baseline')
+    if baseline is None:
+        return
+    regressions = _results.regressions(baseline, config.getoption('--benchmark-threshold'))
+    if regressions:
+        reporter = config.pluginmanager.get_plugin('terminalreporter')
+        reporter.ensure_newline()
+        reporter.section('benchmark regressions', red=True)
+        for regression in regressions:
+            reporter.line(regression)
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
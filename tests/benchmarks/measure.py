@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'PeakRss',
+    'Stopwatch',
+    'available_cpus',
+    'current_rss',
+    'limit_cpus',
+]
+
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/statm', encoding='utf-8') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # no procfs (macOS): the lifetime peak is the best available approximation
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+@contextmanager
+def limit_cpus(count: int):
+    """Runs every thread of this process, and the ones started in the block, on the first `count` available CPUs.
+
+    Needs per-thread affinity (Linux); elsewhere the block runs on all CPUs."""
+    threads_dir = '/proc/self/task'
+    if not hasattr(os, 'sched_setaffinity') or not os.path.isdir(threads_dir):
+        yield
+        return
+
+    cpus = set(available_cpus()[:count])
+    previous = {}
+    try:
+        for thread_id in map(int, os.listdir(threads_dir)):
+            try:
+                previous[thread_id] = os.sched_getaffinity(thread_id)
+                os.sched_setaffinity(thread_id, cpus)
+            except ProcessLookupError:
+                # ended in the meantime
+                pass
+        yield
+    finally:
+        for thread_id, thread_cpus in previous.items():
+            try:
+                os.sched_setaffinity(thread_id, thread_cpus)
+            except ProcessLookupError:
+                pass
+
+
+class PeakRss:
+    """Samples RSS in a background thread while the block runs; `peak_bytes` is the growth above the start.
+
+    Unlike tracemalloc it doesn't slow down allocations, so it can wrap timed code."""
+
+    def __init__(self, interval: float = 0.01):
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._start = self._peak = 0
+
+    @property
+    def peak_bytes(self) -> int:
+        return max(0, self._peak - self._start)
+
+    def _sample(self):
+        while not self._stop.wait(self._interval):
+            self._peak = max(self._peak, current_rss())
+
+    def __enter__(self):
+        self._start = self._peak = current_rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._stop.set()
+        self._thread.join()
+        self._peak = max(self._peak, current_rss())
+
+
+class Stopwatch:
+    """Wall-clock laps: `lap(name)` stores the time since the previous lap (or since creation)."""
+
+    def __init__(self):
+        self.laps: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name: str) -> float:
+        now = time.perf_counter()
+        self.laps[name] = now - self._last
+        self._last = now
+        return self.laps[name]
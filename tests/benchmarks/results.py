@@ -0,0 +1,100 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'Benchmark',
+    'BenchmarkResults',
+]
+
+import json
+import platform
+import sys
+from typing import Dict, Iterable, List, Optional
+
+import pytest
+
+
+def higher_is_better(metric: str) -> bool:
+    """Throughputs (`*_per_s`) and ratios (`*_ratio`) should go up, everything else (times, bytes) down."""
+    return metric.endswith(('_per_s', '_ratio'))
+
+
+class BenchmarkResults:
+    """Metrics of all benchmarks in a session, keyed by test node id."""
+
+    def __init__(self):
+        self._benchmarks: Dict[str, dict] = {}
+
+    def __bool__(self):
+        return bool(self._benchmarks)
+
+    def record(self, name: str, metrics: Dict[str, float], gated: Iterable[str] = ()):
+        entry = self._benchmarks.setdefault(name, {'metrics': {}, 'gated': []})
+        entry['metrics'].update(metrics)
+        entry['gated'] = sorted(set(entry['gated']).union(gated))
+
+    def dump(self, path: str):
+        with open(path, 'w', encoding='utf-8') as results_file:
+            json.dump(
+                {
+                    'machine': {
+                        'python': sys.version.split()[0],
+                        'platform': platform.platform(),
+                        'processor': platform.processor(),
+                    },
+                    'benchmarks': self._benchmarks,
+                },
+                results_file,
+                indent=2,
+                sort_keys=True,
+            )
+
+    def regressions(self, baseline_path: str, threshold: float) -> List[str]:
+        """Describes every gated metric that is worse than in `baseline_path` by more than `threshold`."""
+        with open(baseline_path, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['benchmarks']
+
+        found = []
+        for name, entry in sorted(self._benchmarks.items()):
+            for metric in entry['gated']:
+                previous = baseline.get(name, {}).get('metrics', {}).get(metric)
+                current = entry['metrics'].get(metric)
+                if not previous or current is None:
+                    continue
+                change = (current - previous) / previous
+                if higher_is_better(metric):
+                    change = -change
+                if change > threshold:
+                    found.append(f'{name}: {metric} {previous:.4g} -> {current:.4g} ({change:.0%} worse)')
+        return found
+
+
+class Benchmark:
+    """Handle given to a single benchmark: size gating and recording under the test's node id."""
+
+    def __init__(self, name: str, results: BenchmarkResults, scale: int):
+        self.name = name
+        self._results = results
+        self._scale = scale
+
+    def require(self, size: int):
+        """Skips the benchmark when `size` is above `--benchmark-scale`."""
+        if size > 10 ** self._scale:
+            pytest.skip(f'size {size} is above --benchmark-scale={self._scale}')
+
+    def record(self, gated: Iterable[str] = (), variant: Optional[str] = None, **metrics: float):
+        """Stores metrics of this benchmark, or of one of its phases when `variant` is given."""
+        name = self.name if variant is None else f'{self.name}::{variant}'
+        self._results.record(name, metrics, gated)
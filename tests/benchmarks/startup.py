@@ -0,0 +1,133 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Client startup measured in fresh interpreters.
+
+Run as `python -m tests.benchmarks.startup <container> <syslog>` this module is the measured process itself:
+nothing of neptune is imported before the clock starts."""
+__all__ = [
+    'CONTAINERS',
+    'cold_start',
+    'import_times',
+]
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from typing import Dict, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# `host:port:authkey` of a `SharedLocalServer` the measured process should use
+SERVER_ENV = 'NEPTUNE_E2E_SHARED_SERVER'
+CONTAINERS = ('run', 'project', 'read_only')
+
+
+def _python(args, env: Optional[Dict[str, str]] = None) -> Tuple[float, subprocess.CompletedProcess]:
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    environment.update(env or {})
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable] + args, cwd=tmp, env=environment,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=False,
+        )
+        seconds = time.perf_counter() - start
+    assert process.returncode == 0, process.stderr
+    return seconds, process
+
+
+def import_times(module: str = 'neptune.new') -> Tuple[float, float, Dict[str, float]]:
+    """Imports `module` in a fresh interpreter with `-X importtime`.
+
+    Returns the wall-clock time of the process, that of an interpreter importing nothing,
+    and the import time of every top-level package, summed from the self times of its modules.
+    Python 3.6 ignores `-X importtime`, the packages are left empty there."""
+    interpreter, _ = _python(['-c', 'pass'])
+    if sys.version_info < (3, 7):
+        process_seconds, _ = _python(['-c', f'import {module}'])
+        return process_seconds, interpreter, {}
+    process_seconds, process = _python(['-X', 'importtime', '-c', f'import {module}'])
+    packages = defaultdict(float)
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 10 ** 6
+    assert packages, f'no import times in the output of -X importtime:\n{process.stderr}'
+    return process_seconds, interpreter, dict(packages)
+
+
+def cold_start(container: str, syslog: bool, server=None) -> Dict[str, float]:
+    """Starts `container` ('run', 'project' or 'read_only', i.e. `get_project()`) in a fresh interpreter
+    and performs its first op: an assignment synced to the backend, or a fetch for read-only projects.
+
+    `syslog` enables stdout, stderr and hardware metrics capture of runs. Pass a `SharedLocalServer`
+    as `server` to start against the stand-in. Returns the seconds taken by the whole process,
+    `import neptune.new`, `init` and init-to-first-op."""
+    env = {}
+    if server is not None:
+        host, port = server.address
+        env[SERVER_ENV] = f'{host}:{port}:{server.authkey.hex()}'
+    process_seconds, process = _python(
+        ['-m', 'tests.benchmarks.startup', container, 'on' if syslog else 'off'], env=env
+    )
+    return dict(json.loads(process.stdout.splitlines()[-1]), process_s=process_seconds)
+
+
+def _measure(container: str, syslog: bool) -> Dict[str, float]:
+    # pylint: disable=import-outside-toplevel
+    start = time.perf_counter()
+    import neptune.new as neptune
+    imported = time.perf_counter()
+
+    from tests.backend import local_backend
+    from tests.backend.shared import connect_local_server
+    from tests.utils import DISABLE_SYSLOG_KWARGS
+
+    with ExitStack() as stack:
+        if SERVER_ENV in os.environ:
+            host, port, authkey = os.environ[SERVER_ENV].split(':')
+            stack.enter_context(local_backend(connect_local_server((host, int(port)), bytes.fromhex(authkey))))
+
+        started = time.perf_counter()
+        if container == 'run':
+            handle = neptune.init(**({} if syslog else DISABLE_SYSLOG_KWARGS))
+        elif container == 'project':
+            handle = neptune.init_project()
+        else:
+            handle = neptune.get_project()
+        initialized = time.perf_counter()
+        if container == 'read_only':
+            handle['sys/id'].fetch()
+        else:
+            handle['startup/first_op'] = 1
+            handle.sync()
+        first_op = time.perf_counter()
+        handle.stop()
+
+    return {
+        'import_s': imported - start,
+        'init_s': initialized - started,
+        'first_op_s': first_op - started,
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(_measure(sys.argv[1], sys.argv[2] == 'on')))
@@ -0,0 +1,91 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+
+import pytest
+
+from neptune.new.attribute_container import AttributeContainer
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.utils import FileHashingStats, create_large_file, file_hashing_stats, tmp_context
+
+pytestmark = pytest.mark.benchmark
+
+KB, MB, GB = 2 ** 10, 2 ** 20, 2 ** 30
+FILE_COUNTS = [1, 100, 10 ** 4, 10 ** 5]
+FILE_SIZES = {'1KB': KB, '1MB': MB, '1GB': GB, '10GB': 10 * GB}
+# keep a single dataset under ~10GB
+DATASETS = [
+    pytest.param(count, size, id=f'{count}x{size_id}')
+    for count in FILE_COUNTS
+    for size_id, size in FILE_SIZES.items()
+    if count * size <= 10 * GB
+]
+
+
+class TestArtifactHashing(BaseE2ETest):
+    @staticmethod
+    def _track(benchmark: Benchmark, container: AttributeContainer, key: str, stats: FileHashingStats,
+               phase: str, expected_hashed: int):
+        stats.reset()
+        stopwatch = Stopwatch()
+        container[key].track_files('.', wait=True)
+        seconds = stopwatch.lap(phase)
+
+        benchmark.record(
+            variant=phase,
+            gated=('files_per_s', 'mb_per_s'),
+            seconds=seconds,
+            files_per_s=stats.lookups / seconds,
+            mb_per_s=stats.hashed_bytes / MB / seconds,
+            cache_hit_ratio=stats.cache_hit_ratio,
+            hashed_files=stats.hashed_files,
+            hashed_bytes=stats.hashed_bytes,
+        )
+        assert stats.hashed_files == expected_hashed
+
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('count,size', DATASETS)
+    def test_track_files(self, benchmark: Benchmark, container: AttributeContainer, count: int, size: int,
+                         monkeypatch, tmp_path):
+        benchmark.require(count)
+        benchmark.require(count * size // MB)
+        # a fresh home directory means a fresh ~/.neptune/files.db hash cache
+        monkeypatch.setenv('HOME', str(tmp_path))
+        key = self.gen_key()
+
+        with tmp_context(), file_hashing_stats() as stats:
+            files = [
+                create_large_file(f'file-{i}.bin', size, sparse=size > MB, seed=i)
+                for i in range(count)
+            ]
+
+            self._track(benchmark, container, key, stats, 'cold', expected_hashed=count)
+            self._track(benchmark, container, key, stats, 'warm', expected_hashed=0)
+
+            # bump mtime explicitly, filesystems with coarse timestamps could otherwise keep it unchanged
+            stat = os.stat(files[0].path)
+            os.utime(files[0].path, (stat.st_atime, stat.st_mtime + 1))
+            self._track(benchmark, container, key, stats, 'touched', expected_hashed=1)
+
+            files[-1].append(KB)
+            stat = os.stat(files[-1].path)
+            os.utime(files[-1].path, (stat.st_atime, stat.st_mtime + 2))
+            self._track(benchmark, container, key, stats, 'appended', expected_hashed=1)
+
+        assert len(container[key].fetch_files_list()) == count
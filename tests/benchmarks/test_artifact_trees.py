@@ -0,0 +1,101 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import tracemalloc
+
+import pytest
+
+from neptune.new.attribute_container import AttributeContainer
+from neptune.new.internal.artifacts.file_hasher import FileHasher
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import Stopwatch, available_cpus, limit_cpus
+from tests.benchmarks.results import Benchmark
+from tests.utils import file_hashing_stats
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** n for n in range(3, 7)]
+# depth and fan-out: every file in one directory, or spread over a thousand like a sharded feature-store snapshot
+SHAPES = {'flat': (0, 1), 'nested': (3, 10)}
+# powers of two up to, and including, every available core
+CORES = sorted({2 ** n for n in range(len(available_cpus()).bit_length())}.union({len(available_cpus())}))
+
+
+def _retained_bytes(function):
+    """Calls `function`; returns its result and the memory allocated by the call that's still held."""
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+class TestArtifactTrees(BaseE2ETest):
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('shape', sorted(SHAPES))
+    @pytest.mark.parametrize('size', SIZES)
+    def test_track_tree(self, benchmark: Benchmark, container: AttributeContainer, file_tree, monkeypatch, tmp_path,
+                        size: int, shape: str):
+        """The tree is tracked once per core count, with a cold hash cache each time: the speedup over
+        a single core shows whether the client hashes files in parallel."""
+        benchmark.require(size)
+        depth, fan_out = SHAPES[shape]
+        tree = file_tree(size, depth=depth, fan_out=fan_out)
+
+        single_core_s = None
+        for cores in CORES:
+            # a fresh home directory means a fresh ~/.neptune/files.db hash cache
+            monkeypatch.setenv('HOME', str(tmp_path / f'home_{cores}'))
+            key = self.gen_key()
+            with limit_cpus(cores), file_hashing_stats() as stats:
+                stopwatch = Stopwatch()
+                container[key].track_files(tree, wait=True)
+                seconds = stopwatch.lap('track_files')
+
+            single_core_s = single_core_s or seconds
+            benchmark.record(
+                gated=('files_per_s',),
+                variant=f'cores={cores}',
+                track_files_s=seconds,
+                files_per_s=size / seconds,
+                speedup_ratio=single_core_s / seconds,
+                hashed_files=stats.hashed_files,
+            )
+            assert stats.hashed_files == size
+
+        stopwatch = Stopwatch()
+        artifact_hash = container[key].fetch_hash()
+        stopwatch.lap('fetch_hash')
+        container[key].fetch_files_list()
+        stopwatch.lap('fetch_files_list')
+        # measured apart from the timed call, tracing slows allocations down
+        files, list_bytes = _retained_bytes(container[key].fetch_files_list)
+
+        benchmark.record(
+            gated=('fetch_hash_s', 'fetch_files_list_s', 'list_bytes'),
+            variant='fetch',
+            fetch_hash_s=stopwatch.laps['fetch_hash'],
+            fetch_files_list_s=stopwatch.laps['fetch_files_list'],
+            list_bytes=list_bytes,
+            bytes_per_entry=list_bytes / size,
+        )
+        assert len(files) == size
+        assert FileHasher.get_artifact_hash(files) == artifact_hash
@@ -0,0 +1,93 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pytest
+
+from neptune.new.attribute_container import AttributeContainer
+
+from tests.backend.traffic import record_traffic
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.s3_utils import seed_objects
+from tests.utils import file_hashing_stats
+
+pytestmark = pytest.mark.benchmark
+
+# entries of the artifact updated
+SIZES = [10 ** n for n in range(3, 6)]
+# files added to it by every update
+ADDED = [1, 10, 1000]
+SOURCES = ['local', 's3']
+
+
+class TestArtifactUpdates(BaseE2ETest):
+    @staticmethod
+    def _source(source: str, files: int, file_tree, bucket, prefix: str) -> str:
+        """Location of `files` new files to track."""
+        if source == 'local':
+            return file_tree(files, depth=1, fan_out=100)
+        bucket_name, _ = bucket
+        seed_objects(bucket_name, files, prefix, size=256)
+        return f's3://{bucket_name}/{prefix}'
+
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('source', SOURCES)
+    @pytest.mark.parametrize('size', SIZES)
+    def test_add_files(self, benchmark: Benchmark, container: AttributeContainer, neptune_backend, local_s3,
+                       file_tree, bucket, monkeypatch, tmp_path, size: int, source: str):
+        """Files are added to copies of an artifact of `size` entries, as with a nightly dataset update; an update
+        costing as much for one file as for a thousand re-does the whole artifact."""
+        benchmark.require(size)
+        if neptune_backend is None or local_s3 is None:
+            pytest.skip('requests and bytes are counted by the local stand-ins')
+        # a fresh home directory means a fresh ~/.neptune/files.db hash cache
+        monkeypatch.setenv('HOME', str(tmp_path))
+        base = self.gen_key()
+        container[base].track_files(self._source(source, size, file_tree, bucket, f'{base}/'), wait=True)
+
+        for added in ADDED:
+            key = self.gen_key()
+            container[key] = container[base].fetch()
+            location = self._source(source, added, file_tree, bucket, f'{key}/')
+            container.wait()
+
+            local_s3.reset_counts()
+            with file_hashing_stats() as stats, record_traffic(neptune_backend) as traffic:
+                stopwatch = Stopwatch()
+                container[key].track_files(location, destination=f'added_{added}', wait=True)
+                seconds = stopwatch.lap('update')
+
+            # the stand-in re-hashes the whole artifact on every update, that's not the client's time
+            client_s = seconds - stats.stand_in_hash_s
+            benchmark.record(
+                gated=('client_update_s', 'sent_bytes'),
+                variant=f'added={added}',
+                update_s=seconds,
+                client_update_s=client_s,
+                client_update_s_per_added=client_s / added,
+                stand_in_hash_s=stats.stand_in_hash_s,
+                rehashed_files=stats.hashed_files,
+                artifact_entries=stats.artifact_entries,
+                stand_in_artifact_entries=stats.stand_in_artifact_entries,
+                requests=traffic.total_requests,
+                sent_bytes=sum(traffic.sent_bytes.values()),
+                sent_bytes_per_added=sum(traffic.sent_bytes.values()) / added,
+                s3_requests=sum(local_s3.requests.values()),
+            )
+            # only the added files are read
+            assert stats.hashed_files == (added if source == 'local' else 0)
+            assert local_s3.requests['GetObject'] == 0
+            assert len(container[key].fetch_files_list()) == size + added
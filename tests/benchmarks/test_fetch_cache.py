@@ -0,0 +1,74 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from contextlib import ExitStack
+
+import pytest
+
+from neptune.new.attribute_container import AttributeContainer
+
+from tests.backend import count_backend_calls
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.fetch_cache import cache_atom_fetches
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** n for n in range(2, 5)]
+# a monitoring loop reads every field this many times...
+ROUNDS = 5
+# ...and every n-th field is rewritten between the reads
+REWRITTEN_EVERY = 10
+
+
+class TestFetchCache(BaseE2ETest):
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('size', SIZES)
+    def test_repeated_fetches(self, benchmark: Benchmark, container: AttributeContainer, size: int):
+        benchmark.require(size)
+        namespace = self.gen_key()
+        keys = [f'{namespace}/field_{i}' for i in range(size)]
+        container[namespace] = {f'field_{i}': float(i) for i in range(size)}
+        container.sync()
+
+        for variant in ('uncached', 'cached'):
+            with ExitStack() as stack:
+                calls = stack.enter_context(count_backend_calls())
+                if variant == 'cached':
+                    stack.enter_context(cache_atom_fetches(container, max_size=size))
+                stopwatch = Stopwatch()
+                for round_number in range(ROUNDS):
+                    values = [container[key].fetch() for key in keys]
+                    # rewritten fields hold the value of the last round, a stale cached one would differ
+                    assert values == [
+                        float(i + round_number if i % REWRITTEN_EVERY == 0 else i) for i in range(size)
+                    ]
+                    for i in range(0, size, REWRITTEN_EVERY):
+                        container[keys[i]] = float(i + round_number + 1)
+                    container.wait()
+                seconds = stopwatch.lap('rounds')
+            container[namespace] = {f'field_{i}': float(i) for i in range(0, size, REWRITTEN_EVERY)}
+            container.wait()
+
+            fetches = size * ROUNDS
+            benchmark.record(
+                gated=('requests', 'total_s'),
+                variant=variant,
+                requests=calls.total,
+                requests_per_fetch=calls.total / fetches,
+                total_s=seconds,
+                fetches_per_s=fetches / seconds,
+            )
@@ -0,0 +1,126 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import time
+
+import numpy
+import pytest
+import neptune.new as neptune
+
+from tests.backend.network import PROFILES, network_conditions
+from tests.backend.traffic import record_traffic
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.utils import DISABLE_SYSLOG_KWARGS, assert_file_matches, create_large_file, tmp_context
+
+pytestmark = pytest.mark.benchmark
+
+# how long points are logged for, as fast as the client takes them
+LOG_SECONDS = 2.0
+# points logged between two looks at the queue
+LOG_CHUNK = 500
+SYNC_ROUNDS = 10
+UPLOAD_BYTES = 2 * 2 ** 20
+
+
+def _require_local(server):
+    if server is None:
+        pytest.skip('network conditions are injected into the local stand-in')
+
+
+class TestNetworkProfiles(BaseE2ETest):
+    @pytest.mark.parametrize('profile', sorted(PROFILES))
+    def test_log_throughput(self, benchmark: Benchmark, neptune_backend, profile: str):
+        """Points are logged faster than a degraded link takes them; the growth of the queue
+        shows whether the client holds back or lets it grow without bound."""
+        _require_local(neptune_backend)
+        key = self.gen_key()
+        with network_conditions(neptune_backend, PROFILES[profile]) as conditions, \
+                neptune.init(**DISABLE_SYSLOG_KWARGS) as run, record_traffic(neptune_backend) as traffic:
+            queue = run._op_processor._queue  # pylint: disable=protected-access
+            samples, points = [], 0
+            start = time.monotonic()
+            while time.monotonic() - start < LOG_SECONDS:
+                for _ in range(LOG_CHUNK):
+                    run[key].log(float(points))
+                    points += 1
+                samples.append((time.monotonic() - start, queue.size()))
+            logged_s = time.monotonic() - start
+            stopwatch = Stopwatch()
+            run.sync()
+            drain_s = stopwatch.lap('drain')
+            requests = traffic.requests['execute_operations']
+            delivered = len(run[key].fetch_values())
+
+        times, sizes = numpy.array(samples).T
+        growth = numpy.polyfit(times, sizes, 1)[0] if len(samples) > 1 else 0.0
+        benchmark.record(
+            gated=('log_per_s', 'drain_s'),
+            log_per_s=points / logged_s,
+            drain_s=drain_s,
+            queue_peak_ops=int(sizes.max()),
+            queue_growth_ops_per_s=float(growth),
+            ops_per_request=points / max(requests, 1),
+            injected_errors=sum(conditions.errors.values()),
+            injected_stalls=sum(conditions.stalls.values()),
+            lost_points=points - delivered,
+        )
+        assert delivered == points
+
+    @pytest.mark.parametrize('profile', sorted(PROFILES))
+    def test_sync_latency(self, benchmark: Benchmark, neptune_backend, profile: str):
+        _require_local(neptune_backend)
+        key = self.gen_key()
+        latencies = []
+        with network_conditions(neptune_backend, PROFILES[profile]) as conditions, \
+                neptune.init(**DISABLE_SYSLOG_KWARGS) as run:
+            for i in range(SYNC_ROUNDS):
+                run[key] = i
+                stopwatch = Stopwatch()
+                run.sync()
+                latencies.append(stopwatch.lap('sync'))
+            assert run[key].fetch() == SYNC_ROUNDS - 1
+
+        sync_p50, sync_p99 = numpy.percentile(latencies, [50, 99])
+        benchmark.record(
+            gated=('sync_p50_s', 'sync_p99_s'),
+            sync_p50_s=float(sync_p50),
+            sync_p99_s=float(sync_p99),
+            injected_errors=sum(conditions.errors.values()),
+            injected_stalls=sum(conditions.stalls.values()),
+        )
+
+    @pytest.mark.parametrize('profile', sorted(PROFILES))
+    def test_upload_throughput(self, benchmark: Benchmark, neptune_backend, profile: str):
+        _require_local(neptune_backend)
+        key = self.gen_key()
+        with tmp_context(), network_conditions(neptune_backend, PROFILES[profile]) as conditions, \
+                neptune.init(**DISABLE_SYSLOG_KWARGS) as run:
+            expected = create_large_file('upload.bin', UPLOAD_BYTES)
+            stopwatch = Stopwatch()
+            run[key].upload('upload.bin')
+            run.sync()
+            seconds = stopwatch.lap('upload')
+            run[key].download('downloaded.bin')
+            assert_file_matches('downloaded.bin', expected)
+
+        benchmark.record(
+            gated=('upload_mb_per_s',),
+            upload_s=seconds,
+            upload_mb_per_s=UPLOAD_BYTES / 2 ** 20 / seconds,
+            injected_errors=sum(conditions.errors.values()),
+            injected_stalls=sum(conditions.stalls.values()),
+        )
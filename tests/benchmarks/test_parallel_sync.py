@@ -0,0 +1,52 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from pathlib import Path
+
+import pytest
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.sync_utils import generate_offline_runs, parallel_sync
+from tests.utils import tmp_context
+
+pytestmark = pytest.mark.benchmark
+
+RUNS = 16
+
+
+class TestParallelSync(BaseE2ETest):
+    @pytest.mark.parametrize('ops_per_run', [10 ** n for n in range(2, 6)])
+    @pytest.mark.parametrize('workers', [1, 2, 4, 8])
+    def test_sync_offline_runs(self, benchmark: Benchmark, shared_backend, workers: int, ops_per_run: int):
+        benchmark.require(RUNS * ops_per_run)
+
+        with tmp_context() as tmp:
+            generate_offline_runs(tmp, runs=RUNS, ops_per_run=ops_per_run)
+
+            stopwatch = Stopwatch()
+            results = parallel_sync(tmp, workers=workers, server=shared_backend and shared_backend.server)
+            seconds = stopwatch.lap('sync')
+
+            assert all(result.exit_code == 0 for result in results)
+            assert not list(Path(tmp, '.neptune', 'offline').iterdir())
+
+        benchmark.record(
+            gated=('ops_per_s',),
+            seconds=seconds,
+            ops_per_s=RUNS * ops_per_run / seconds,
+            runs_per_s=RUNS / seconds,
+        )
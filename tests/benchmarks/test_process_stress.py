@@ -0,0 +1,74 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import multiprocessing
+import os
+
+import numpy
+import pytest
+import neptune.new as neptune
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.results import Benchmark
+from tests.stress_utils import count_lost_writes, write_from_processes
+from tests.utils import DISABLE_SYSLOG_KWARGS
+
+pytestmark = pytest.mark.benchmark
+
+# reinitialized runs each worker writes through, one after another
+HANDLES = 2
+CPUS = os.cpu_count() or 1
+# powers of two up to, and including, one process per core
+PROCESSES = sorted({2 ** n for n in range(CPUS.bit_length())}.union({CPUS}))
+
+
+class TestProcessStress(BaseE2ETest):
+    @pytest.mark.parametrize('ops_per_handle', [10 ** n for n in range(2, 5)])
+    @pytest.mark.parametrize('start_method', ['fork', 'spawn', 'forkserver'])
+    def test_processes_writing_to_run(self, benchmark: Benchmark, shared_backend, start_method: str,
+                                      ops_per_handle: int):
+        """Every process count is recorded as a variant of its own, with its throughput relative
+        to a single process, so the results chart how writing scales across cores."""
+        benchmark.require(HANDLES * ops_per_handle)
+        if start_method not in multiprocessing.get_all_start_methods():
+            pytest.skip(f'{start_method} is not available on this platform')
+
+        single_process_ops_per_s = None
+        for processes in PROCESSES:
+            with neptune.init(**DISABLE_SYSLOG_KWARGS) as run:
+                sys_id = run['sys/id'].fetch()
+            namespace = f'processes_{processes}'
+            result = write_from_processes(
+                sys_id, namespace, processes, HANDLES, ops_per_handle,
+                server=shared_backend and shared_backend.server, start_method=start_method,
+            )
+            with neptune.init(run=sys_id, **DISABLE_SYSLOG_KWARGS) as written:
+                lost_writes = count_lost_writes(written, namespace, processes, HANDLES, ops_per_handle)
+
+            single_process_ops_per_s = single_process_ops_per_s or result.ops_per_s
+            sync_p50, sync_p99 = numpy.percentile(result.sync_latencies, [50, 99])
+            benchmark.record(
+                gated=('ops_per_s', 'sync_p99_s'),
+                variant=f'processes={processes}',
+                seconds=result.seconds,
+                ops_per_s=result.ops_per_s,
+                speedup_ratio=result.ops_per_s / single_process_ops_per_s,
+                sync_p50_s=float(sync_p50),
+                sync_p99_s=float(sync_p99),
+                lost_writes=lost_writes,
+                queue_dir_collisions=result.queue_dir_collisions,
+            )
+            assert lost_writes == 0
+            assert result.queue_dir_collisions == 0
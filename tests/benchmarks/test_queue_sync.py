@@ -0,0 +1,68 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from pathlib import Path
+
+import neptune.new as neptune
+import pytest
+from click.testing import CliRunner
+
+from neptune.new.constants import ASYNC_DIRECTORY, NEPTUNE_DATA_DIRECTORY
+from neptune.new.internal.container_type import ContainerType
+from neptune.new.sync import sync
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import PeakRss, Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.sync_utils import QueueReader, sync_backend, sync_queue, synthetic_operations, write_queue
+from tests.utils import DISABLE_SYSLOG_KWARGS, tmp_context
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** n for n in range(4, 7)]
+# 'disk_queue' is `neptune sync` itself, 'mmap_reader' the same batches read with `QueueReader`
+READERS = ['disk_queue', 'mmap_reader']
+
+
+class TestQueueSync(BaseE2ETest):
+    @pytest.mark.parametrize('size', SIZES)
+    @pytest.mark.parametrize('reader', READERS)
+    def test_sync_queue(self, benchmark: Benchmark, reader: str, size: int):
+        benchmark.require(size)
+
+        with tmp_context() as tmp:
+            with neptune.init(**DISABLE_SYSLOG_KWARGS) as run:
+                run_id = run._id  # pylint: disable=protected-access
+            # next to the run's own (already synced) execution, as if its process died before syncing
+            queue_dir = Path(tmp) / NEPTUNE_DATA_DIRECTORY / ASYNC_DIRECTORY / run_id / 'exec-benchmark'
+            write_queue(queue_dir, synthetic_operations(size, copy_from=(run_id, ContainerType.RUN)))
+
+            with PeakRss() as rss:
+                stopwatch = Stopwatch()
+                if reader == 'disk_queue':
+                    result = CliRunner().invoke(sync, ['--path', tmp])
+                    assert result.exit_code == 0, result.output
+                else:
+                    assert sync_queue(queue_dir, run_id, ContainerType.RUN, sync_backend()) == size
+                seconds = stopwatch.lap('sync')
+
+            assert QueueReader(queue_dir).last_ack_version == size
+
+        benchmark.record(
+            gated=('ops_per_s', 'peak_rss_bytes'),
+            seconds=seconds,
+            ops_per_s=size / seconds,
+            peak_rss_bytes=rss.peak_bytes,
+        )
@@ -0,0 +1,92 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import uuid
+from typing import List
+
+import neptune.new as neptune
+import pytest
+
+from neptune.new.internal.container_type import ContainerType
+from neptune.new.internal.operation import AssignFloat
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import PeakRss, Stopwatch, current_rss
+from tests.benchmarks.results import Benchmark
+from tests.sync_utils import sync_backend
+from tests.utils import DISABLE_SYSLOG_KWARGS
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** n for n in range(3, 7)]
+BATCH_SIZE = 10 ** 4
+
+
+def _path(i: int, size: int) -> List[str]:
+    """One namespace level per decimal digit of `i`, so 10^6 paths are 6 levels deep with 10 entries in each."""
+    digits = str(i).zfill(len(str(size - 1)))
+    return ['structure'] + [f'level_{digit}' for digit in digits[:-1]] + [f'attribute_{digits[-1]}']
+
+
+def _count_leaves(structure: dict) -> int:
+    return sum(_count_leaves(value) if isinstance(value, dict) else 1 for value in structure.values())
+
+
+class TestResumeStructure(BaseE2ETest):
+    @staticmethod
+    def _seed_run(size: int, custom_run_id: str) -> str:
+        """Creates a run with `size` float attributes straight through the backend; returns its short id."""
+        backend = sync_backend()
+        run = backend.create_run(backend.get_project(os.environ['NEPTUNE_PROJECT']).id, custom_run_id=custom_run_id)
+        for start in range(0, size, BATCH_SIZE):
+            backend.execute_operations(
+                run.id, ContainerType.RUN,
+                [AssignFloat(_path(i, size), float(i)) for i in range(start, min(start + BATCH_SIZE, size))],
+            )
+        return run.short_id
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_resume_large_structure(self, benchmark: Benchmark, size: int):
+        benchmark.require(size)
+        custom_run_id = str(uuid.uuid4())
+        short_id = self._seed_run(size, custom_run_id)
+        last = size - 1
+        # the first init of a session loads what every later one reuses
+        neptune.init(**DISABLE_SYSLOG_KWARGS).stop()
+
+        for resumed_by, kwargs in (('run', {'run': short_id}), ('custom_run_id', {'custom_run_id': custom_run_id})):
+            rss_before = current_rss()
+            with PeakRss() as rss:
+                stopwatch = Stopwatch()
+                run = neptune.init(**kwargs, **DISABLE_SYSLOG_KWARGS)
+                stopwatch.lap('init')
+                assert run['/'.join(_path(last, size))].fetch() == float(last)
+                stopwatch.lap('first_fetch')
+                structure = run.get_structure()
+                stopwatch.lap('get_structure')
+            retained_bytes = current_rss() - rss_before
+            assert _count_leaves(structure['structure']) == size
+            run.stop()
+
+            benchmark.record(
+                gated=('resume_s', 'get_structure_s', 'peak_rss_bytes'),
+                variant=resumed_by,
+                init_s=stopwatch.laps['init'],
+                resume_s=stopwatch.laps['init'] + stopwatch.laps['first_fetch'],
+                get_structure_s=stopwatch.laps['get_structure'],
+                peak_rss_bytes=rss.peak_bytes,
+                retained_rss_bytes=retained_bytes,
+            )
@@ -0,0 +1,96 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import uuid
+
+import neptune.new as neptune
+import pytest
+
+from neptune.new.internal.backends.neptune_backend import NeptuneBackend
+from neptune.new.internal.container_type import ContainerType
+from neptune.new.internal.operation import AddStrings, AssignFloat, AssignString
+
+from tests.backend import local_backend
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import PeakRss, Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.sync_utils import sync_backend
+from tests.utils import wait_for
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** n for n in range(3, 6)]
+# seeded runs stay in the project; more of them are created in a project of the local stand-in only
+LIVE_MAX_SIZE = 10 ** 3
+# float and string params per run, besides the sys/ namespace
+FLOAT_COLUMNS = 40
+STRING_COLUMNS = 10
+
+
+class TestRunsTable(BaseE2ETest):
+    @staticmethod
+    def _seed_runs(backend: NeptuneBackend, project_id: str, count: int, tag: str):
+        """Creates runs straight through the backend; `neptune.init` would start a process' worth of threads each."""
+        for i in range(count):
+            run = backend.create_run(project_id)
+            operations = [AddStrings(['sys', 'tags'], {tag})]
+            operations += [AssignFloat(['params', f'float_{j}'], float(i * j)) for j in range(FLOAT_COLUMNS)]
+            operations += [AssignString(['params', f'string_{j}'], f'value-{i}-{j}') for j in range(STRING_COLUMNS)]
+            backend.execute_operations(run.id, ContainerType.RUN, operations)
+
+    def _measure(self, benchmark: Benchmark, size: int):
+        backend = sync_backend()
+        project = neptune.init_project()
+        tag = str(uuid.uuid4())
+        self._seed_runs(backend, backend.get_project(os.environ['NEPTUNE_PROJECT']).id, size, tag)
+        # the table is served by an index catching up asynchronously
+        polled = wait_for(
+            lambda: project.fetch_runs_table(tag=tag), lambda table: len(table.to_runs()) == size, timeout=600
+        )
+
+        with PeakRss() as rss:
+            stopwatch = Stopwatch()
+            table = project.fetch_runs_table(tag=tag)
+            stopwatch.lap('fetch')
+            runs = table.to_runs()
+            stopwatch.lap('to_runs')
+            dataframe = table.to_pandas()
+            stopwatch.lap('to_pandas')
+
+        assert len(runs) == size
+        assert len(dataframe) == size
+        assert {'params/float_0', f'params/string_{STRING_COLUMNS - 1}'}.issubset(dataframe.columns)
+        benchmark.record(
+            gated=('fetch_s', 'to_pandas_s', 'peak_rss_bytes'),
+            index_catch_up_s=polled.seconds,
+            fetch_s=stopwatch.laps['fetch'],
+            to_runs_s=stopwatch.laps['to_runs'],
+            to_pandas_s=stopwatch.laps['to_pandas'],
+            runs_per_s=size / stopwatch.laps['fetch'],
+            peak_rss_bytes=rss.peak_bytes,
+        )
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_fetch_runs_table(self, benchmark: Benchmark, request, size: int):
+        benchmark.require(size)
+        if request.config.getoption('--backend') == 'local':
+            # a project of its own, the session one shouldn't carry this many runs for other tests
+            with local_backend():
+                self._measure(benchmark, size)
+        elif size > LIVE_MAX_SIZE:
+            pytest.skip(f'more than {LIVE_MAX_SIZE} runs are seeded with --backend=local only')
+        else:
+            self._measure(benchmark, size)
@@ -0,0 +1,109 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+
+import pytest
+
+from neptune.new.attribute_container import AttributeContainer
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.s3_utils import seed_objects
+from tests.utils import file_digest, tmp_context
+
+pytestmark = pytest.mark.benchmark
+
+KB = 2 ** 10
+SIZES = [10 ** n for n in range(3, 6)]
+OBJECT_BYTES = KB
+# every object is downloaded with requests of its own, fewer and bigger ones show the throughput
+DOWNLOAD_SIZES = [10 ** n for n in range(2, 5)]
+DOWNLOAD_OBJECT_BYTES = 64 * KB
+LIST_OPERATIONS = ('ListObjects', 'ListObjectsV2')
+
+
+def _require_local_s3(local_s3):
+    if local_s3 is None:
+        pytest.skip('S3 requests are counted by the local stand-in')
+
+
+class TestS3Artifacts(BaseE2ETest):
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('size', SIZES)
+    def test_track_prefix(self, benchmark: Benchmark, container: AttributeContainer, local_s3, bucket, size: int):
+        """Tracking a prefix lists it page by page and takes the ETags as hashes: no object is read."""
+        benchmark.require(size)
+        _require_local_s3(local_s3)
+        bucket_name, _ = bucket
+        key = self.gen_key()
+        prefix = f'{key}/'
+
+        stopwatch = Stopwatch()
+        expected = seed_objects(bucket_name, size, prefix, OBJECT_BYTES)
+        seed_s = stopwatch.lap('seed')
+        local_s3.reset_counts()
+        container[key].track_files(f's3://{bucket_name}/{prefix}', wait=True)
+        track_s = stopwatch.lap('track_files')
+
+        list_requests = sum(local_s3.requests[operation] for operation in LIST_OPERATIONS)
+        list_s = sum(local_s3.seconds[operation] for operation in LIST_OPERATIONS)
+        benchmark.record(
+            gated=('objects_per_s', 'list_requests'),
+            seed_objects_per_s=size / seed_s,
+            track_files_s=track_s,
+            objects_per_s=size / track_s,
+            list_requests=list_requests,
+            objects_per_list_request=size / max(list_requests, 1),
+            list_s=list_s,
+            list_share=list_s / track_s,
+            object_reads=local_s3.requests['GetObject'] + local_s3.requests['HeadObject'],
+        )
+        assert local_s3.requests['GetObject'] == 0
+        assert local_s3.requests['HeadObject'] == 0
+
+        files = container[key].fetch_files_list()
+        assert {file.file_path: file.file_hash for file in files} == {
+            object_key[len(prefix):]: etag for object_key, etag in expected.items()
+        }
+
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('size', DOWNLOAD_SIZES)
+    def test_download(self, benchmark: Benchmark, container: AttributeContainer, local_s3, bucket, size: int):
+        benchmark.require(size)
+        _require_local_s3(local_s3)
+        bucket_name, _ = bucket
+        key = self.gen_key()
+        prefix = f'{key}/'
+        expected = seed_objects(bucket_name, size, prefix, DOWNLOAD_OBJECT_BYTES)
+        container[key].track_files(f's3://{bucket_name}/{prefix}', wait=True)
+
+        with tmp_context() as tmp:
+            local_s3.reset_counts()
+            stopwatch = Stopwatch()
+            container[key].download(tmp)
+            seconds = stopwatch.lap('download')
+
+            benchmark.record(
+                gated=('files_per_s', 'mb_per_s'),
+                download_s=seconds,
+                files_per_s=size / seconds,
+                mb_per_s=local_s3.served_bytes / 2 ** 20 / seconds,
+                requests_per_file=sum(local_s3.requests.values()) / size,
+            )
+            assert local_s3.served_bytes == size * DOWNLOAD_OBJECT_BYTES
+            for object_key, etag in expected.items():
+                assert file_digest(os.path.join(tmp, object_key[len(prefix):]), 'md5') == etag
@@ -0,0 +1,124 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import time
+from typing import Optional
+
+import numpy
+import pandas
+import pytest
+
+from neptune.new.attribute_container import AttributeContainer
+from neptune.new.internal.container_type import ContainerType
+from neptune.new.internal.operation import LogFloats
+from neptune.new.internal.utils.paths import parse_path
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import PeakRss, Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.series_utils import iter_series_values
+from tests.sync_utils import sync_backend
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** n for n in range(3, 8)]
+SEED_BATCH = 10 ** 5
+# every n-th point of the 'decimated' variant, enough for a plot of a long loss curve
+DECIMATION = 1000
+# fetch_values() builds a dict per point before the DataFrame, measured at ~800 bytes each for 10^6 points
+FULL_FETCH_BYTES_PER_POINT = 800
+
+
+def _available_memory() -> Optional[int]:
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+class TestSeriesFetch(BaseE2ETest):
+    @staticmethod
+    def _seed_series(container: AttributeContainer, key: str, size: int):
+        """Logs `size` points straight through the backend, in ops of SEED_BATCH points."""
+        timestamp = time.time()
+        backend = sync_backend()
+        for start in range(0, size, SEED_BATCH):
+            points = [
+                LogFloats.ValueType(float(i), float(i), timestamp) for i in range(start, min(start + SEED_BATCH, size))
+            ]
+            backend.execute_operations(
+                container._id,  # pylint: disable=protected-access
+                ContainerType.RUN, [LogFloats(parse_path(key), points)],
+            )
+        container.sync()
+
+    @staticmethod
+    def _consume_pages(container: AttributeContainer, key: str, stopwatch: Stopwatch, **kwargs) -> int:
+        """Reads every page as an analysis would, keeping none of them; returns the number of points."""
+        points = 0
+        for page in iter_series_values(container, key, **kwargs):
+            if not points:
+                stopwatch.lap('first_point')
+            points += len(page) if isinstance(page, pandas.DataFrame) else len(page.steps)
+        return points
+
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('size', SIZES)
+    def test_fetch_long_float_series(self, benchmark: Benchmark, container: AttributeContainer, size: int):
+        benchmark.require(size)
+        key = self.gen_key()
+        self._seed_series(container, key, size)
+
+        variants = {
+            'pages': ({}, size),
+            'frames': ({'as_frame': True}, size),
+            'decimated': ({'every': DECIMATION}, -(-size // DECIMATION)),
+            'step_range': ({'step_range': (size // 2, None)}, size - size // 2),
+        }
+        for variant, (kwargs, expected_points) in variants.items():
+            with PeakRss() as rss:
+                stopwatch = Stopwatch()
+                points = self._consume_pages(container, key, stopwatch, **kwargs)
+                stopwatch.lap('rest')
+            assert points == expected_points
+            benchmark.record(
+                gated=('total_s', 'peak_rss_bytes'),
+                variant=variant,
+                first_point_s=stopwatch.laps['first_point'],
+                total_s=stopwatch.laps['first_point'] + stopwatch.laps['rest'],
+                points_per_s=points / (stopwatch.laps['first_point'] + stopwatch.laps['rest']),
+                peak_rss_bytes=rss.peak_bytes,
+            )
+
+        available = _available_memory()
+        if available is not None and size * FULL_FETCH_BYTES_PER_POINT > available:
+            # the full fetch would get the whole session killed, the pages above are what this size is for
+            return
+        # last, the memory it leaves to the allocator would inflate the peaks above
+        with PeakRss() as rss:
+            stopwatch = Stopwatch()
+            values = container[key].fetch_values()
+            seconds = stopwatch.lap('full')
+        assert len(values) == size
+        benchmark.record(
+            gated=('total_s', 'peak_rss_bytes'),
+            variant='full',
+            first_point_s=seconds,
+            total_s=seconds,
+            points_per_s=size / seconds,
+            peak_rss_bytes=rss.peak_bytes,
+        )
+        assert numpy.isclose(values['value'].iloc[-1], size - 1)
@@ -0,0 +1,105 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import numpy
+import pytest
+from faker import Faker
+
+from neptune.new.attribute_container import AttributeContainer
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import PeakRss, Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.utils import generate_image
+
+fake = Faker()
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** n for n in range(3, 8)]
+# 'call' is one `log(x)` per point, 'list' a single `log(values)`,
+# 'numpy' a training-loop style buffer flushed every NUMPY_BATCH points
+MODES = ['call', 'list', 'numpy']
+NUMPY_BATCH = 10 ** 4
+IMAGE_POOL = 16
+
+
+class TestSeriesThroughput(BaseE2ETest):
+    @staticmethod
+    def _log(container: AttributeContainer, key: str, mode: str, values: numpy.ndarray):
+        if mode == 'call':
+            for value in values.tolist():
+                container[key].log(value)
+        elif mode == 'list':
+            container[key].log(values.tolist())
+        else:
+            for start in range(0, len(values), NUMPY_BATCH):
+                container[key].log(values[start:start + NUMPY_BATCH].tolist())
+
+    def _measure(self, benchmark: Benchmark, container: AttributeContainer, mode: str, values: numpy.ndarray) -> str:
+        key = self.gen_key()
+        with PeakRss() as rss:
+            stopwatch = Stopwatch()
+            self._log(container, key, mode, values)
+            stopwatch.lap('log')
+            container.sync()
+            stopwatch.lap('sync')
+
+        benchmark.record(
+            gated=('ops_per_s', 'sync_s'),
+            points=len(values),
+            ops_per_s=len(values) / stopwatch.laps['log'],
+            log_s=stopwatch.laps['log'],
+            sync_s=stopwatch.laps['sync'],
+            peak_rss_bytes=rss.peak_bytes,
+        )
+        return key
+
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('size', SIZES)
+    @pytest.mark.parametrize('mode', MODES)
+    def test_float_series(self, benchmark: Benchmark, container: AttributeContainer, mode: str, size: int):
+        benchmark.require(size)
+        values = numpy.random.rand(size)
+
+        key = self._measure(benchmark, container, mode, values)
+
+        assert container[key].fetch_last() == values[-1]
+
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('size', SIZES)
+    @pytest.mark.parametrize('mode', MODES)
+    def test_string_series(self, benchmark: Benchmark, container: AttributeContainer, mode: str, size: int):
+        benchmark.require(size)
+        words = numpy.array([fake.word() for _ in range(100)])
+        values = words[numpy.random.randint(len(words), size=size)]
+
+        key = self._measure(benchmark, container, mode, values)
+
+        assert container[key].fetch_last() == values[-1]
+
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    @pytest.mark.parametrize('size', SIZES)
+    @pytest.mark.parametrize('mode', MODES)
+    def test_image_series(self, benchmark: Benchmark, container: AttributeContainer, mode: str, size: int):
+        benchmark.require(size)
+        # small images drawn from a pool, so the cost measured is per point, not per pixel
+        pool = [generate_image(size=8) for _ in range(IMAGE_POOL)]
+        values = numpy.empty(size, dtype=object)
+        values[:] = [pool[i % IMAGE_POOL] for i in range(size)]
+
+        key = self._measure(benchmark, container, mode, values)
+
+        assert container.exists(key)
@@ -0,0 +1,126 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import threading
+from zipfile import ZipFile
+
+import neptune.new as neptune
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from neptune.internal.storage.datastream import compress_to_tar_gz_in_memory
+from neptune.internal.storage.storage_utils import split_upload_files
+from neptune.new.internal.backends.hosted_file_operations import DEFAULT_UPLOAD_CONFIG, get_unique_upload_entries
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.utils import DISABLE_SYSLOG_KWARGS, create_source_tree, tmp_context
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** n for n in range(2, 6)]
+SOURCE_FILES = 'src/**/*.py'
+# how long the stand-in holds the snapshot upload back; `init()` waiting for it would take this long
+HOLD_TIMEOUT = 300
+
+
+class _HeldUploads:
+    """Makes the stand-in hold file set uploads until `release()`, to tell whether anything waits for them."""
+
+    def __init__(self, server):
+        self.finished = threading.Event()
+        self._release = threading.Event()
+        self._upload = server.upload_file_set_attribute
+        self._patch = MonkeyPatch()
+        self._patch.setattr(server, 'upload_file_set_attribute', self._held_upload)
+
+    def _held_upload(self, *args, **kwargs):
+        self._release.wait(HOLD_TIMEOUT)
+        try:
+            return self._upload(*args, **kwargs)
+        finally:
+            self.finished.set()
+
+    def release(self):
+        self._release.set()
+        self._patch.undo()
+
+
+class TestSourceCode(BaseE2ETest):
+    @staticmethod
+    def _package(entries) -> int:
+        """Builds the archives the hosted backend uploads; returns their total size."""
+        return sum(
+            len(compress_to_tar_gz_in_memory(upload_entries=package.items))
+            for package in split_upload_files(upload_entries=entries, upload_configuration=DEFAULT_UPLOAD_CONFIG)
+        )
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_init_with_source_files(self, benchmark: Benchmark, neptune_backend, size: int):
+        benchmark.require(size)
+
+        with tmp_context() as tmp:
+            create_source_tree(os.path.join(tmp, 'src'), size)
+
+            stopwatch = Stopwatch()
+            entries = get_unique_upload_entries([os.path.abspath(SOURCE_FILES)])
+            stopwatch.lap('glob')
+            archive_bytes = self._package(entries)
+            stopwatch.lap('package')
+            assert len(entries) == size
+
+            # the first init of a session loads what every later one reuses
+            neptune.init(source_files=[], **DISABLE_SYSLOG_KWARGS).stop()
+            stopwatch.lap('warm_up')
+            neptune.init(source_files=[], **DISABLE_SYSLOG_KWARGS).stop()
+            stopwatch.lap('init_without_source_files')
+
+            held = _HeldUploads(neptune_backend) if neptune_backend else None
+            run = None
+            try:
+                run = neptune.init(source_files=SOURCE_FILES, **DISABLE_SYSLOG_KWARGS)
+                stopwatch.lap('init')
+                run['params/first_op'] = 1
+                stopwatch.lap('first_op')
+                # the snapshot is still held back by the stand-in: nothing above waited for it
+                assert held is None or not held.finished.is_set()
+                if held:
+                    held.release()
+                run.wait()
+                stopwatch.lap('upload')
+
+                run['source_code/files'].download(os.path.join(tmp, 'files.zip'))
+            finally:
+                if held:
+                    held.release()
+                if run is not None:
+                    run.stop()
+            with ZipFile(os.path.join(tmp, 'files.zip')) as snapshot:
+                assert sum(name.endswith('.py') for name in snapshot.namelist()) == size
+
+        laps = stopwatch.laps
+        benchmark.record(
+            gated=('glob_s', 'package_s', 'init_overhead_s', 'first_op_s'),
+            glob_s=laps['glob'],
+            package_s=laps['package'],
+            archive_bytes=archive_bytes,
+            files_per_s=size / (laps['glob'] + laps['package']),
+            init_s=laps['init'],
+            init_overhead_s=laps['init'] - laps['init_without_source_files'],
+            first_op_s=laps['init'] + laps['first_op'],
+            upload_s=laps['upload'],
+        )
@@ -0,0 +1,68 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import statistics
+
+import pytest
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.results import Benchmark
+from tests.benchmarks.startup import cold_start, import_times
+
+pytestmark = pytest.mark.benchmark
+
+# cold starts are noisy, every metric is the median of this many processes
+REPEATS = 3
+# top-level packages whose import time is recorded
+TOP_PACKAGES = 10
+
+
+class TestStartup(BaseE2ETest):
+    def test_import(self, benchmark: Benchmark, request):
+        measured = [import_times() for _ in range(REPEATS)]
+        process_s = statistics.median(process for process, _, _ in measured)
+        interpreter_s = statistics.median(interpreter for _, interpreter, _ in measured)
+        packages = {
+            package: statistics.median(times.get(package, 0.0) for _, _, times in measured)
+            for package in measured[0][2]
+        }
+        top = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:TOP_PACKAGES]
+
+        import_s = process_s - interpreter_s
+        benchmark.record(
+            gated=('import_s',),
+            import_s=import_s,
+            interpreter_s=interpreter_s,
+            **{f'import_{package}_s': seconds for package, seconds in top},
+        )
+        budget = request.config.getoption('--startup-budget')
+        assert budget is None or import_s <= budget, \
+            f'import neptune.new took {import_s:.2f}s, over the {budget}s budget; slowest: {top[:3]}'
+
+    @pytest.mark.parametrize('container, syslog', [
+        ('run', False),
+        ('run', True),
+        ('project', False),
+        ('read_only', False),
+    ])
+    def test_init_to_first_op(self, benchmark: Benchmark, request, shared_backend, container: str, syslog: bool):
+        measured = [cold_start(container, syslog, server=shared_backend) for _ in range(REPEATS)]
+        metrics = {metric: statistics.median(times[metric] for times in measured) for metric in measured[0]}
+
+        benchmark.record(gated=('import_s', 'first_op_s'), **metrics)
+        budget = request.config.getoption('--startup-budget')
+        startup_s = metrics['import_s'] + metrics['first_op_s']
+        assert budget is None or startup_s <= budget, \
+            f'{container} took {startup_s:.2f}s from import to the first op, over the {budget}s budget'
@@ -0,0 +1,88 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import random
+from pathlib import Path
+
+import neptune.new as neptune
+import pytest
+from click.testing import CliRunner
+
+from neptune.new.constants import ASYNC_DIRECTORY, NEPTUNE_DATA_DIRECTORY
+from neptune.new.sync import sync
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.measure import Stopwatch
+from tests.benchmarks.results import Benchmark
+from tests.sync_utils import (
+    count_duplicate_points,
+    expected_series_lengths,
+    kill_sync,
+    synthetic_operations,
+    write_queue,
+)
+from tests.utils import DISABLE_SYSLOG_KWARGS, tmp_context
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [10 ** n for n in range(4, 7)]
+# how much of the queue is acknowledged when sync gets killed
+KILLED_AT = [0.1, 0.5, 0.9]
+# ops `neptune sync` sends per request
+BATCH = 1000
+
+
+class TestSyncResume(BaseE2ETest):
+    @pytest.mark.parametrize('killed_at', KILLED_AT)
+    @pytest.mark.parametrize('size', SIZES)
+    def test_resume_killed_sync(self, benchmark: Benchmark, shared_backend, size: int, killed_at: float):
+        benchmark.require(size)
+        server = shared_backend and shared_backend.server
+        # a random point within the batch after `killed_at`, the same one on every run
+        delay = random.Random(size).uniform(0, 0.05)
+
+        with tmp_context() as tmp:
+            with neptune.init(**DISABLE_SYSLOG_KWARGS) as run:
+                run_id = run._id  # pylint: disable=protected-access
+                sys_id = run['sys/id'].fetch()
+            queue_dir = Path(tmp) / NEPTUNE_DATA_DIRECTORY / ASYNC_DIRECTORY / run_id / 'exec-killed'
+            write_queue(queue_dir, synthetic_operations(size))
+
+            acked = kill_sync(tmp, queue_dir, int(size * killed_at), server=server, delay=delay)
+            received = server.received_operations(run_id) if server else 0
+
+            stopwatch = Stopwatch()
+            result = CliRunner().invoke(sync, ['--path', tmp])
+            seconds = stopwatch.lap('resume')
+            assert result.exit_code == 0, result.output
+
+        unsent = size - acked
+        metrics = {}
+        if server:
+            metrics['resent_ops'] = server.received_operations(run_id) - received - unsent
+        with neptune.init(run=sys_id, **DISABLE_SYSLOG_KWARGS) as resumed:
+            metrics['duplicate_points'] = sum(
+                count_duplicate_points(resumed[path].fetch_values()) for path in expected_series_lengths(size)
+            )
+
+        benchmark.record(
+            gated=('resume_s',),
+            unsent_ops=unsent,
+            resume_s=seconds,
+            unsent_ops_per_s=unsent / seconds if unsent else 0.0,
+            **metrics,
+        )
+        # at most the batch in flight when sync died is sent again
+        assert metrics.get('resent_ops', 0) <= 2 * BATCH
@@ -0,0 +1,61 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import numpy
+import pytest
+import neptune.new as neptune
+
+from tests.base import BaseE2ETest
+from tests.benchmarks.results import Benchmark
+from tests.stress_utils import count_lost_writes, write_from_threads
+from tests.utils import DISABLE_SYSLOG_KWARGS
+
+pytestmark = pytest.mark.benchmark
+
+# reinitialized runs each thread writes through, one after another
+HANDLES = 4
+THREADS = [1, 2, 4, 8]
+
+
+class TestThreadStress(BaseE2ETest):
+    @pytest.mark.parametrize('ops_per_handle', [10 ** n for n in range(2, 5)])
+    def test_threads_writing_to_run(self, benchmark: Benchmark, ops_per_handle: int):
+        """Every thread count is recorded as a variant of its own, with its throughput relative
+        to a single thread, so the results chart how writing scales with threads."""
+        benchmark.require(HANDLES * ops_per_handle)
+
+        single_thread_ops_per_s = None
+        for threads in THREADS:
+            # a run of its own, reinitializing fetches the whole structure written before
+            with neptune.init(**DISABLE_SYSLOG_KWARGS) as run:
+                sys_id = run['sys/id'].fetch()
+            namespace = f'threads_{threads}'
+            result = write_from_threads(sys_id, namespace, threads, HANDLES, ops_per_handle)
+            with neptune.init(run=sys_id, **DISABLE_SYSLOG_KWARGS) as written:
+                lost_writes = count_lost_writes(written, namespace, threads, HANDLES, ops_per_handle)
+
+            single_thread_ops_per_s = single_thread_ops_per_s or result.ops_per_s
+            sync_p50, sync_p99 = numpy.percentile(result.sync_latencies, [50, 99])
+            benchmark.record(
+                gated=('ops_per_s', 'sync_p99_s'),
+                variant=f'threads={threads}',
+                seconds=result.seconds,
+                ops_per_s=result.ops_per_s,
+                speedup_ratio=result.ops_per_s / single_thread_ops_per_s,
+                sync_p50_s=float(sync_p50),
+                sync_p99_s=float(sync_p99),
+                lost_writes=lost_writes,
+            )
+            assert lost_writes == 0
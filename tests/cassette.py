@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'CassettePlugin',
+]
+
+import base64
+import json
+import os
+import random
+from contextlib import ExitStack
+from typing import Dict
+
+import pytest
+from faker import Faker
+
+from tests.backend.cassette import Cassette, record_cassette, replay_cassette, replay_token
+
+# environment variables the tests read and their names in a cassette; tokens are never recorded
+ENVIRONMENT = {
+    'NEPTUNE_PROJECT': 'project',
+    'WORKSPACE_NAME': 'workspace',
+    'USER_USERNAME': 'user',
+    'ADMIN_USERNAME': 'admin',
+}
+TOKENS = ('NEPTUNE_API_TOKEN', 'ADMIN_NEPTUNE_API_TOKEN')
+# values the tests generate are drawn the same way in the recorded and the replayed run
+SEED = 0
+
+
+def _recorded_environment() -> Dict[str, str]:
+    environment = {name: os.environ[variable] for variable, name in ENVIRONMENT.items() if variable in os.environ}
+    token = os.environ.get('NEPTUNE_API_TOKEN')
+    if token:
+        api_address = json.loads(base64.b64decode(token.encode()).decode('utf-8'))['api_address']
+        environment['api_address'] = api_address
+    return environment
+
+
+class CassettePlugin:
+    """Records the HTTP exchanges of a session against the live service into `--record-cassette`,
+    or replays the ones of `--replay-cassette` instead of the service, see tests/backend/cassette.py.
+
+    Both seed the generators of test values; the UUIDs of `BaseE2ETest.gen_key` differ anyway
+    and are mapped to the recorded ones on replay."""
+
+    def __init__(self, config):
+        self._config = config
+        self._stack = ExitStack()
+        self._recorder = None
+        self._replayer = None
+        random.seed(SEED)
+        Faker.seed(SEED)
+
+        replayed = config.getoption('--replay-cassette')
+        if replayed is not None:
+            cassette = Cassette.load(replayed)
+            patch = self._stack.enter_context(pytest.MonkeyPatch.context())
+            for variable, name in ENVIRONMENT.items():
+                if name in cassette.environment:
+                    patch.setenv(variable, cassette.environment[name])
+            token = replay_token(cassette.environment.get('api_address', 'https://app.neptune.ai'))
+            for variable in TOKENS:
+                patch.setenv(variable, token)
+            self._replayer = self._stack.enter_context(
+                replay_cassette(cassette, config.getoption('--replay-timing'))
+            )
+        else:
+            self._recorder = self._stack.enter_context(record_cassette(_recorded_environment()))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        (self._recorder or self._replayer).test = item.nodeid
+        yield
+        (self._recorder or self._replayer).test = None
+
+    def pytest_sessionfinish(self):
+        # session fixtures are torn down by now
+        self._stack.close()
+        if self._recorder is not None:
+            self._recorder.cassette.save(self._config.getoption('--record-cassette'))
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self._recorder is not None:
+            terminalreporter.line(
+                f'cassette: recorded {len(self._recorder.cassette.interactions)} requests '
+                f"to {self._config.getoption('--record-cassette')}"
+            )
+            return
+        unmatched = self._replayer.unmatched
+        terminalreporter.line(f'cassette: replayed {self._replayer.replayed} requests, {len(unmatched)} unmatched')
+        if unmatched:
+            terminalreporter.section('requests missing from the cassette', red=True)
+            for request in unmatched:
+                terminalreporter.line(request)
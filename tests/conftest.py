@@ -14,16 +14,186 @@
 # limitations under the License.
 #
 import os
+import tempfile
 from collections import namedtuple
+from contextlib import ExitStack
 
 import boto3
 import pytest
 
 import neptune.new as neptune
 
+from tests.backend import local_backend
+from tests.backend.cassette import TIMINGS
+from tests.backend.network import PROFILES, network_conditions
+from tests.backend.shared import SharedLocalServer
+from tests.backend.traffic import EndpointTraffic
+from tests.cassette import CassettePlugin
+from tests.latency import LatencyPlugin
+from tests.memory import MemoryPlugin
+from tests.request_budget import RequestBudgetPlugin
+
+# bucket of the local S3 stand-in, emptied after every test like the live one
+LOCAL_BUCKET = 'neptune-e2e'
+
+# verifiers in tests.utils assert on their own; get the same detailed failure messages as in tests
+pytest.register_assert_rewrite('tests.utils')
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--backend',
+        choices=('live', 'local'),
+        default='live',
+        help="'live' talks to the Neptune instance from the environment, "
+             "'local' to an in-process stand-in (no network or credentials needed)",
+    )
+    parser.addoption(
+        '--network-profile',
+        choices=sorted(PROFILES),
+        default=None,
+        help="conditions of the link to the 'local' stand-in (latency, bandwidth, stalls, errors), "
+             'see tests/backend/network.py',
+    )
+    parser.addoption(
+        '--record-cassette',
+        default=None,
+        help="records the HTTP exchanges with the 'live' service into this file, see tests/backend/cassette.py",
+    )
+    parser.addoption(
+        '--replay-cassette',
+        default=None,
+        help='answers the requests of the tests from this --record-cassette file instead of the live service',
+    )
+    parser.addoption(
+        '--replay-timing',
+        choices=TIMINGS,
+        default='fast',
+        help="'fast' replays responses right away, 'original' as slowly as they were recorded",
+    )
+    parser.addoption(
+        '--benchmark-scale',
+        type=int,
+        default=3,
+        help='largest problem size benchmarks run at, as a power of ten; bigger parametrizations are skipped',
+    )
+    parser.addoption(
+        '--benchmark-json',
+        default='benchmark-results.json',
+        help='file benchmark results are written to',
+    )
+    parser.addoption(
+        '--benchmark-baseline',
+        default=None,
+        help='results file of a previous run; gated metrics worse than it by more than the threshold fail the session',
+    )
+    parser.addoption(
+        '--benchmark-threshold',
+        type=float,
+        default=0.2,
+        help='allowed relative regression against --benchmark-baseline',
+    )
+    parser.addoption(
+        '--latency-json',
+        default=None,
+        help='records p50/p90/p99/max latency of client calls per test and writes them to this file',
+    )
+    parser.addoption(
+        '--latency-csv',
+        default=None,
+        help='the same latency statistics as --latency-json, as CSV',
+    )
+    parser.addoption(
+        '--latency-baseline',
+        default=None,
+        help='--latency-json file of a previous run; percentiles slower by more than the threshold fail the session',
+    )
+    parser.addoption(
+        '--latency-threshold',
+        type=float,
+        default=0.5,
+        help='allowed relative slowdown against --latency-baseline',
+    )
+    parser.addoption(
+        '--memory-json',
+        default=None,
+        help='records RSS and traced (tracemalloc) memory peaks of every test, '
+             'with the neptune code holding the most memory, and writes them to this file',
+    )
+    parser.addoption(
+        '--memory-budget',
+        default=None,
+        help="peak memory a test may use, e.g. '512MB'; also enables the recording; "
+             "tests can set their own with @pytest.mark.memory_budget('64MB')",
+    )
+    parser.addoption(
+        '--startup-budget',
+        type=float,
+        default=None,
+        help='seconds a fresh process may take to import neptune.new and perform the first op of a container; '
+             'checked by the startup benchmarks',
+    )
+
+
+def pytest_configure(config):
+    if config.getoption('--record-cassette') or config.getoption('--replay-cassette'):
+        if config.getoption('--backend') != 'live':
+            raise pytest.UsageError('cassettes record and replay the live backend, not --backend=local')
+        if config.getoption('--record-cassette') and config.getoption('--replay-cassette'):
+            raise pytest.UsageError('--record-cassette and --replay-cassette are exclusive')
+        config.pluginmanager.register(CassettePlugin(config), 'cassette')
+    if any(config.getoption(option) for option in ('--latency-json', '--latency-csv', '--latency-baseline')):
+        config.pluginmanager.register(LatencyPlugin(config), 'latency')
+    config.addinivalue_line('markers', 'benchmark: performance benchmark, see --benchmark-scale and --benchmark-json')
+    config.addinivalue_line('markers', 'memory_budget(size): peak memory the test may use, see --memory-budget')
+    if config.getoption('--memory-json') or config.getoption('--memory-budget'):
+        config.pluginmanager.register(MemoryPlugin(config), 'memory')
+    config.addinivalue_line(
+        'markers',
+        'request_budget(**requests, sent_bytes=None, received_bytes=None): requests and bytes the test may send '
+        'to each endpoint of the local stand-in, see tests/request_budget.py',
+    )
+    # only the stand-in sees the requests
+    if config.getoption('--backend') == 'local':
+        check_budgets = config.getoption('--network-profile') is None
+        config.pluginmanager.register(RequestBudgetPlugin(check_budgets), 'request_budget')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def neptune_backend(request):
+    if request.config.getoption('--backend') == 'local':
+        profile = request.config.getoption('--network-profile')
+        with local_backend() as server, ExitStack() as stack:
+            if profile is not None:
+                stack.enter_context(network_conditions(server, PROFILES[profile]))
+            yield server
+    else:
+        yield None
+
+
+@pytest.fixture()
+def shared_backend(request):
+    """Stand-in reachable from other processes (pool workers, `neptune sync` subprocesses),
+    also used by this process for the duration of the test. `None` when running against the live service."""
+    if request.config.getoption('--backend') == 'local':
+        with SharedLocalServer() as shared, local_backend(shared.server):
+            yield shared
+    else:
+        yield None
+
+
+@pytest.fixture()
+def request_traffic(request):
+    """Requests the local stand-in serves while the test runs, and their bytes, by endpoint.
+    `None` when running against the live service."""
+    if request.config.getoption('--backend') == 'local':
+        yield EndpointTraffic()
+    else:
+        yield None
+
 
 @pytest.fixture(scope='session')
-def container(request):
+def container(request, neptune_backend):  # pylint: disable=unused-argument,redefined-outer-name
     if request.param == 'project':
         project = neptune.init_project()
         yield project
@@ -38,10 +208,43 @@ def container(request):
 
 
 @pytest.fixture()
-def bucket():
-    bucket_name = os.environ.get('BUCKET_NAME')
+def file_tree():
+    """Creates trees of small files, called with the arguments of `tests.utils.create_file_tree` but the path;
+    returns the path of the new tree. The trees are removed after the test, as they can hold millions of files."""
+    # imported when used, importing tests.utils earlier would keep its asserts from being rewritten
+    from tests.utils import create_file_tree  # pylint: disable=import-outside-toplevel
+
+    with ExitStack() as stack:
+        def create(files: int, **kwargs) -> str:
+            path = stack.enter_context(tempfile.TemporaryDirectory())
+            create_file_tree(path, files, **kwargs)
+            return path
+
+        yield create
+
 
+@pytest.fixture(scope='session')
+def local_s3(request):
+    """S3 stand-in boto3 talks to for the rest of the session, with --backend=local.
+    `None` when running against the live service."""
+    if request.config.getoption('--backend') == 'local':
+        # imported when used, the rest of the suite doesn't need the S3 stand-in
+        from tests.backend.s3 import LocalS3Server  # pylint: disable=import-outside-toplevel
+
+        with LocalS3Server() as server, server.boto3_redirected():
+            yield server
+    else:
+        yield None
+
+
+@pytest.fixture()
+def bucket(local_s3):  # pylint: disable=redefined-outer-name
     s3_client = boto3.resource('s3')
+    if local_s3 is not None:
+        bucket_name = LOCAL_BUCKET
+        s3_client.create_bucket(Bucket=bucket_name)
+    else:
+        bucket_name = os.environ.get('BUCKET_NAME')
     s3_bucket = s3_client.Bucket(bucket_name)
 
     yield bucket_name, s3_client
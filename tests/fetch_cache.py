@@ -0,0 +1,205 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'AtomFetchCache',
+    'cache_atom_fetches',
+]
+
+import functools
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Set, Tuple
+
+from neptune.new.attribute_container import AttributeContainer
+from neptune.new.internal.operation import Operation
+
+# pylint: disable=protected-access
+
+DEFAULT_MAX_SIZE = 10000
+# backend getters of single valued attributes, the ones `fetch()` of an atom goes through
+CACHED_GETTERS = (
+    'get_bool_attribute',
+    'get_datetime_attribute',
+    'get_float_attribute',
+    'get_int_attribute',
+    'get_string_attribute',
+)
+
+
+class _PathIndex:
+    """Items by the attribute path they belong to, to find the ones of a path and of everything under or over it
+    without going through all of them."""
+
+    def __init__(self):
+        self._at: Dict[Tuple[str, ...], Set] = defaultdict(set)
+        self._under: Dict[Tuple[str, ...], Set] = defaultdict(set)
+
+    def add(self, path: Tuple[str, ...], item):
+        self._at[path].add(item)
+        for depth in range(1, len(path)):
+            self._under[path[:depth]].add(item)
+
+    def remove(self, path: Tuple[str, ...], item):
+        for index, prefix in [(self._at, path)] + [(self._under, path[:depth]) for depth in range(1, len(path))]:
+            items = index[prefix]
+            items.discard(item)
+            if not items:
+                del index[prefix]
+
+    def overlapping(self, path: Tuple[str, ...]) -> Set:
+        found = set(self._at.get(path, ())) | self._under.get(path, set())
+        for depth in range(1, len(path)):
+            found |= self._at.get(path[:depth], set())
+        return found
+
+    def clear(self):
+        self._at.clear()
+        self._under.clear()
+
+
+class AtomFetchCache:
+    """Atom values fetched by one container, the `max_size` least recently used ones.
+
+    An entry goes away when the container writes to its path or to a namespace over or under it, and no value
+    is kept for a path until the backend has processed all of its writes. `sync()` empties the cache, as it
+    refreshes the rest of the container: writes of other handles are seen after it, as the structure is."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        if max_size < 1:
+            raise ValueError(f'max_size must be positive, got {max_size}')
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._entry_paths = _PathIndex()
+        # path -> number of its last write not processed by the backend yet
+        self._pending: Dict[Tuple[str, ...], int] = {}
+        self._pending_paths = _PathIndex()
+        self._last_write = 0
+        # writes and clears so far, a fetch started before one of them is not kept
+        self._changes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, getter: str, fetch, container_id: str, container_type, path: List[str]):
+        key = (getter, container_id, tuple(path))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            changes = self._changes
+
+        value = fetch(container_id, container_type, path)
+
+        with self._lock:
+            # a write or a sync while the value was on its way may or may not be reflected in it
+            if changes == self._changes and not self._pending_paths.overlapping(key[2]):
+                self._entries[key] = value
+                self._entry_paths.add(key[2], key)
+                while len(self._entries) > self.max_size:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._entry_paths.remove(evicted[2], evicted)
+        return value
+
+    def invalidate(self, path: List[str]):
+        """Drops the entries of `path` and of every attribute under or over it."""
+        with self._lock:
+            self._invalidate(tuple(path))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._entry_paths.clear()
+            self._changes += 1
+
+    def _invalidate(self, path: Tuple[str, ...]):
+        for key in self._entry_paths.overlapping(path):
+            del self._entries[key]
+            self._entry_paths.remove(key[2], key)
+
+    def _written(self, path: List[str]):
+        path = tuple(path)
+        with self._lock:
+            self._invalidate(path)
+            self._last_write += 1
+            if path not in self._pending:
+                self._pending_paths.add(path, path)
+            self._pending[path] = self._last_write
+            self._changes += 1
+
+    def _processed(self, last_write: int):
+        """Backend has processed every write up to `last_write`."""
+        with self._lock:
+            for path in [path for path, write in self._pending.items() if write <= last_write]:
+                del self._pending[path]
+                self._pending_paths.remove(path, path)
+
+
+def _call(backend, method: str, *args):
+    return getattr(backend, method)(*args)
+
+
+class _CachingBackend:
+    """The container's backend, with atom getters answered from the cache."""
+
+    def __init__(self, backend, cache: AtomFetchCache):
+        self._backend = backend
+        for getter in CACHED_GETTERS:
+            # looked up on every miss, not to bypass whatever wraps the backend's methods later
+            fetch = functools.partial(_call, backend, getter)
+            setattr(self, getter, functools.partial(cache.get, getter, fetch))
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+
+@contextmanager
+def cache_atom_fetches(container: AttributeContainer, max_size: int = DEFAULT_MAX_SIZE):
+    """Serves repeated `fetch()`es of the container's atoms (bool, datetime, float, int and string attributes)
+    from an `AtomFetchCache` of at most `max_size` values, yielded for its hit and miss counts.
+
+    Every operation the container enqueues invalidates its path: assignments, including ones of a whole
+    namespace, `del container[...]`, `pop()` and copies alike."""
+    cache = AtomFetchCache(max_size)
+    processor = container._op_processor
+    enqueue_operation, wait_for_processor, sync_container = processor.enqueue_operation, processor.wait, container.sync
+
+    def cached_enqueue_operation(operation: Operation, wait: bool):
+        cache._written(operation.path)
+        enqueue_operation(operation, wait)
+
+    def cached_wait():
+        last_write = cache._last_write
+        wait_for_processor()
+        cache._processed(last_write)
+
+    def cached_sync(wait: bool = True):
+        sync_container(wait)
+        cache.clear()
+
+    backend = container._backend
+    container._backend = _CachingBackend(backend, cache)
+    processor.enqueue_operation, processor.wait, container.sync = cached_enqueue_operation, cached_wait, cached_sync
+    try:
+        yield cache
+    finally:
+        container._backend = backend
+        del processor.enqueue_operation, processor.wait, container.sync
@@ -0,0 +1,62 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'fetch_artifacts',
+    'fetch_attributes',
+]
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+from neptune.new.attribute_container import AttributeContainer
+from neptune.new.internal.artifacts.types import ArtifactFileData
+from neptune.new.internal.backends.api_model import AttributeType
+from neptune.new.internal.utils.generic_attribute_mapper import NoValue
+from neptune.new.internal.utils.paths import parse_path
+
+# pylint: disable=protected-access
+
+
+def fetch_attributes(container: AttributeContainer, paths: Iterable[str]) -> Dict[str, Any]:
+    """Values of many attributes in a single request, keyed by path.
+
+    Each of `paths` is an attribute or a namespace, which stands for every attribute under it.
+    Series give their last value and string sets a set, as their `fetch()` does; attributes without a value
+    of their own (files, file sets, artifacts, image series) are left out."""
+    requested = set(paths)
+    attributes = container._backend.fetch_atom_attribute_values(container._id, container.container_type, [])
+
+    values = {}
+    for path, attribute_type, value in attributes:
+        parts = parse_path(path)
+        if value is NoValue or not any('/'.join(parts[:depth]) in requested for depth in range(1, len(parts) + 1)):
+            continue
+        values[path] = set(value) if attribute_type == AttributeType.STRING_SET.value else value
+    return values
+
+
+def fetch_artifacts(container: AttributeContainer,
+                    paths: Iterable[str]) -> Dict[str, Tuple[str, List[ArtifactFileData]]]:
+    """Hash and files of many artifact attributes. Every file list is fetched once per distinct hash,
+    `fetch_files_list()` would fetch the hash again and the list for each attribute."""
+    hashes = {
+        path: container._backend.get_artifact_attribute(container._id, container.container_type, parse_path(path)).hash
+        for path in paths
+    }
+    files = {
+        artifact_hash: container._backend.list_artifact_files(container._project_id, artifact_hash)
+        for artifact_hash in set(hashes.values())
+    }
+    return {path: (artifact_hash, files[artifact_hash]) for path, artifact_hash in hashes.items()}
@@ -0,0 +1,180 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'LatencyPlugin',
+    'LatencyRecorder',
+]
+
+import csv
+import functools
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from neptune.new.attribute_container import AttributeContainer
+from neptune.new.handler import Handler
+
+# client calls whose latency is recorded, per class defining them
+TRACKED = {
+    AttributeContainer: ('sync', 'wait', 'fetch'),
+    Handler: ('fetch', 'fetch_values', 'log', 'upload', 'download', 'track_files'),
+}
+PERCENTILES = (50, 90, 99)
+# key of the statistics over the whole session
+SUITE = '*'
+# regressions are only reported for percentiles that took at least this long in the baseline,
+# faster calls are dominated by noise
+MIN_GATED_SECONDS = 0.001
+
+
+class LatencyRecorder:
+    """Durations of client calls, grouped by the test they were made in and by operation (`Class.method`)."""
+
+    def __init__(self):
+        self.test: Optional[str] = None
+        self._samples: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+
+    def add(self, operation: str, seconds: float):
+        self._samples[(self.test or SUITE, operation)].append(seconds)
+
+    def wrap(self, function, operation: str):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add(operation, time.perf_counter() - start)
+
+        return timed
+
+    def wrap_getattr(self, getattr_function, prefix: str, names):
+        """Times the methods in `names` that `__getattr__` (`getattr_function`) hands out."""
+        @functools.wraps(getattr_function)
+        def timed_getattr(instance, name):
+            value = getattr_function(instance, name)
+            if name in names and callable(value):
+                return self.wrap(value, f'{prefix}.{name}')
+            return value
+
+        return timed_getattr
+
+    @staticmethod
+    def _stats(samples: List[float]) -> dict:
+        values = numpy.array(samples)
+        stats = {'count': len(samples), 'max': float(values.max())}
+        for percentile, value in zip(PERCENTILES, numpy.percentile(values, PERCENTILES)):
+            stats[f'p{percentile}'] = float(value)
+        return stats
+
+    def summary(self) -> Dict[str, Dict[str, dict]]:
+        """Statistics keyed by test id and operation; `SUITE` holds every test's calls together."""
+        by_operation = defaultdict(list)
+        summary = defaultdict(dict)
+        for (test, operation), samples in sorted(self._samples.items()):
+            by_operation[operation].extend(samples)
+            summary[test][operation] = self._stats(samples)
+        summary[SUITE] = {operation: self._stats(samples) for operation, samples in sorted(by_operation.items())}
+        return dict(summary)
+
+    def dump_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as results_file:
+            json.dump({'latency': self.summary()}, results_file, indent=2, sort_keys=True)
+
+    def dump_csv(self, path: str):
+        columns = ['count'] + [f'p{percentile}' for percentile in PERCENTILES] + ['max']
+        with open(path, 'w', encoding='utf-8', newline='') as results_file:
+            writer = csv.writer(results_file)
+            writer.writerow(['test', 'operation'] + [f'{column}_s' if column != 'count' else column
+                                                     for column in columns])
+            for test, operations in sorted(self.summary().items()):
+                for operation, stats in operations.items():
+                    writer.writerow([test, operation] + [stats[column] for column in columns])
+
+    def regressions(self, baseline_path: str, threshold: float) -> List[str]:
+        """Describes every percentile slower than in the JSON at `baseline_path` by more than `threshold`."""
+        with open(baseline_path, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['latency']
+
+        found = []
+        for test, operations in sorted(self.summary().items()):
+            for operation, stats in operations.items():
+                previous_stats = baseline.get(test, {}).get(operation, {})
+                for percentile in PERCENTILES:
+                    key = f'p{percentile}'
+                    previous = previous_stats.get(key)
+                    if not previous or previous < MIN_GATED_SECONDS:
+                        continue
+                    change = (stats[key] - previous) / previous
+                    if change > threshold:
+                        found.append(
+                            f'{test}: {operation} {key} {previous * 1000:.1f}ms -> {stats[key] * 1000:.1f}ms '
+                            f'({change:.0%} slower)'
+                        )
+        return found
+
+
+class LatencyPlugin:
+    """Times the `TRACKED` client calls made by every test, including its fixtures,
+    and exports the percentiles when the session ends."""
+
+    def __init__(self, config):
+        self._config = config
+        self._recorder = LatencyRecorder()
+        self._patch = MonkeyPatch()
+
+    def pytest_sessionstart(self):
+        for cls, methods in TRACKED.items():
+            # methods only documented on the class are looked up on the attribute by `__getattr__`
+            delegated = set(getattr(cls, 'DOCSTRING_ATTRIBUTES', ())).intersection(methods)
+            for method in set(methods) - delegated:
+                operation = f'{cls.__name__}.{method}'
+                self._patch.setattr(cls, method, self._recorder.wrap(getattr(cls, method), operation))
+            if delegated:
+                self._patch.setattr(
+                    cls, '__getattr__', self._recorder.wrap_getattr(cls.__getattr__, cls.__name__, delegated)
+                )
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item):
+        self._recorder.test = item.nodeid
+        yield
+        self._recorder.test = None
+
+    def pytest_sessionfinish(self, session):
+        self._patch.undo()
+        config = self._config
+        if config.getoption('--latency-json'):
+            self._recorder.dump_json(config.getoption('--latency-json'))
+        if config.getoption('--latency-csv'):
+            self._recorder.dump_csv(config.getoption('--latency-csv'))
+
+        baseline = config.getoption('--latency-baseline')
+        if baseline is None:
+            return
+        regressions = self._recorder.regressions(baseline, config.getoption('--latency-threshold'))
+        if regressions:
+            reporter = config.pluginmanager.get_plugin('terminalreporter')
+            reporter.ensure_newline()
+            reporter.section('latency regressions', red=True)
+            for regression in regressions:
+                reporter.line(regression)
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
@@ -0,0 +1,145 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'MemoryPlugin',
+    'parse_size',
+]
+
+import json
+import os
+import re
+import sys
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Optional, Union
+
+import neptune
+import pytest
+
+from tests.benchmarks.measure import PeakRss
+
+TOP_SITES = 10
+# frames kept per allocation, enough to reach the client code calling json, numpy etc.
+TRACED_FRAMES = 16
+# allocations made by the client library itself, not by tests or other dependencies
+NEPTUNE_DIR = os.path.dirname(neptune.__file__) + os.sep
+NEPTUNE_ROOT = os.path.dirname(os.path.dirname(neptune.__file__))
+# the stand-ins of --backend=local run in the process, under neptune frames; what they store isn't the client's
+_STAND_IN = tracemalloc.Filter(False, os.path.join(os.path.dirname(__file__), 'backend', '*'), all_frames=True)
+_UNITS = {'': 1, 'B': 1, 'KB': 2 ** 10, 'MB': 2 ** 20, 'GB': 2 ** 30}
+
+
+def parse_size(size: Union[int, str]) -> int:
+    """Bytes in `size`, given as a number of bytes or like '512MB' (binary units: KB, MB, GB)."""
+    if isinstance(size, int):
+        return size
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*', size.upper())
+    if match is None:
+        raise ValueError(f'Invalid size: {size}')
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def _neptune_sites(snapshot: tracemalloc.Snapshot) -> List[dict]:
+    """Traced blocks grouped by the innermost neptune frame (`neptune/...py:line`) on their stack,
+    so that memory json, numpy etc. allocate on behalf of the client is attributed to the client code."""
+    sites = defaultdict(lambda: [0, 0])
+    for trace in snapshot.filter_traces([_STAND_IN]).traces:
+        # ordered from the oldest frame since Python 3.7
+        frames = reversed(trace.traceback) if sys.version_info >= (3, 7) else trace.traceback
+        frame = next((frame for frame in frames if frame.filename.startswith(NEPTUNE_DIR)), None)
+        if frame is not None:
+            site = sites[f'{os.path.relpath(frame.filename, NEPTUNE_ROOT)}:{frame.lineno}']
+            site[0] += trace.size
+            site[1] += 1
+    top = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)[:TOP_SITES]
+    return [{'site': site, 'size_bytes': size, 'count': count} for site, (size, count) in top]
+
+
+class _TestMemory:
+    """Tracing runs only while a test does, so the peak and the traces left are those of the test alone."""
+
+    def __init__(self):
+        self.rss = PeakRss()
+        tracemalloc.start(TRACED_FRAMES)
+        self.rss.__enter__()
+
+    def finish(self) -> dict:
+        self.rss.__exit__(None, None, None)
+        _, traced_peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        return {
+            'rss_peak_bytes': self.rss.peak_bytes,
+            'traced_peak_bytes': traced_peak,
+            # allocated during the test and still held at its end
+            'neptune_sites': _neptune_sites(snapshot),
+        }
+
+
+class MemoryPlugin:
+    """Samples RSS and traces Python allocations while each test sets up and runs. That covers
+    `neptune.init*()` through `stop()` of the containers the test creates itself; containers of the
+    session-scoped `container` fixture are created before most tests and stopped after all of them,
+    so only their use by the test is measured.
+
+    A test fails when the larger of its RSS growth and traced peak is over its budget:
+    `@pytest.mark.memory_budget('64MB')` or `--memory-budget`. Budgets aren't checked with
+    `--backend=local`: the stand-in keeps what the client sends in the same process, and that
+    counts toward both peaks."""
+
+    def __init__(self, config):
+        self._config = config
+        budget = config.getoption('--memory-budget')
+        self._budget = parse_size(budget) if budget else None
+        self._check_budgets = config.getoption('--backend') != 'local'
+        self._results: Dict[str, dict] = {}
+        self._current: Optional[_TestMemory] = None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self):
+        self._current = _TestMemory()
+
+    def _budget_of(self, item) -> Optional[int]:
+        marker = item.get_closest_marker('memory_budget')
+        return parse_size(marker.args[0]) if marker else self._budget
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if self._current is None or not (call.when == 'call' or (call.when == 'setup' and not report.passed)):
+            return
+        result = self._current.finish()
+        self._current = None
+        budget = self._budget_of(item) if self._check_budgets else None
+        result['budget_bytes'] = budget
+        self._results[item.nodeid] = result
+
+        peak = max(result['rss_peak_bytes'], result['traced_peak_bytes'])
+        if budget is not None and report.passed and peak > budget:
+            sites = '\n'.join(f"  {site['size_bytes']:>12} B  {site['site']}" for site in result['neptune_sites'])
+            report.outcome = 'failed'
+            report.longrepr = (
+                f'memory budget exceeded: peak {peak} B > budget {budget} B '
+                f"(RSS growth {result['rss_peak_bytes']} B, traced {result['traced_peak_bytes']} B)\n"
+                f'neptune allocations still held at the end of the test:\n{sites}'
+            )
+
+    def pytest_sessionfinish(self):
+        path = self._config.getoption('--memory-json')
+        if path:
+            with open(path, 'w', encoding='utf-8') as results_file:
+                json.dump({'memory': self._results}, results_file, indent=2, sort_keys=True)
@@ -15,7 +15,6 @@
 #
 import os
 import tempfile
-import time
 from pathlib import Path
 
 import pytest
@@ -23,8 +22,10 @@ from faker import Faker
 
 from neptune.new.attribute_container import AttributeContainer
 
+from tests.backend import count_backend_calls
 from tests.base import BaseE2ETest
-from tests.utils import tmp_context, with_check_if_file_appears
+from tests.fetch_utils import fetch_artifacts
+from tests.utils import create_large_file, file_hashing_stats, tmp_context, with_check_if_file_appears
 
 
 fake = Faker()
@@ -32,6 +33,8 @@ fake = Faker()
 
 class TestArtifacts(BaseE2ETest):
     @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    @pytest.mark.request_budget(execute_operations=2, get_attribute=6, create_new_artifact=2,
+                                upload_artifact_files_metadata=1, list_artifact_files=2)
     def test_local_creation(self, container: AttributeContainer):
         self.cleanup(container)
 
@@ -50,6 +53,27 @@ class TestArtifacts(BaseE2ETest):
         assert container[first].fetch_hash() == container[second].fetch_hash()
         assert container[first].fetch_files_list() == container[second].fetch_files_list()
 
+    @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    def test_fetch_in_bulk(self, container: AttributeContainer):
+        self.cleanup(container)
+
+        first, second = self.gen_key(), self.gen_key()
+        with tmp_context():
+            with open(fake.file_name(), 'w', encoding='utf-8') as handler:
+                handler.write(fake.paragraph(nb_sentences=5))
+
+            container[first].track_files('.')
+            container[second].track_files('.')
+            container.sync()
+
+        with count_backend_calls() as calls:
+            artifacts = fetch_artifacts(container, [first, second])
+
+        # a hash per attribute and a single list for the two, instead of 3 requests per attribute
+        assert calls.total == 3
+        for path in (first, second):
+            assert artifacts[path] == (container[path].fetch_hash(), container[path].fetch_files_list())
+
     @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
     def test_assignment(self, container: AttributeContainer):
         self.cleanup(container)
@@ -222,36 +246,31 @@ class TestArtifacts(BaseE2ETest):
         assert container[first].fetch_files_list() == container[second].fetch_files_list()
 
     @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    # hashing streams the 2GiB file
+    @pytest.mark.memory_budget('128MB')
     def test_hash_cache(self, container: AttributeContainer):
         self.cleanup(container)
 
         key = self.gen_key()
         filename = fake.file_name()
 
-        with tmp_context():
+        with tmp_context(), file_hashing_stats() as stats:
             # create 2GB file
-            with open(filename, 'wb') as handler:
-                handler.write(b'\0' * 2 * 2 ** 30)
+            large_file = create_large_file(filename, 2 * 2 ** 30, sparse=True)
 
             # track it
-            start = time.time()
             container[key].track_files('.', wait=True)
-            initial_duration = time.time() - start
+            assert stats.hashed_files == 1
 
             # and track it again
-            start = time.time()
+            stats.reset()
             container[key].track_files('.', wait=True)
-            retry_duration = time.time() - start
-
-            assert retry_duration * 2 < initial_duration, "Tracking again should be significantly faster"
+            assert (stats.cache_hits, stats.hashed_files) == (1, 0), "Tracking again should use the hash cache"
 
             # append additional byte to file
-            with open(filename, 'ab') as handler:
-                handler.write(b'\0')
+            large_file.append(1)
 
             # and track updated file
-            start = time.time()
+            stats.reset()
             container[key].track_files('.', wait=True)
-            updated_duration = time.time() - start
-
-            assert retry_duration * 2 < updated_duration, "Tracking updated file should take more time - no cache"
+            assert stats.hashed_files == 1, "Tracking updated file should hash it again - no cache"
@@ -13,12 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-import os
 import random
-import time
 import uuid
 from datetime import datetime, timezone
-from zipfile import ZipFile
 
 import pytest
 from faker import Faker
@@ -26,8 +23,11 @@ from faker import Faker
 import neptune.new as neptune
 from neptune.new.attribute_container import AttributeContainer
 
+from tests.backend import count_backend_calls
 from tests.base import BaseE2ETest
-from tests.utils import tmp_context
+from tests.fetch_cache import cache_atom_fetches
+from tests.fetch_utils import fetch_attributes
+from tests.utils import assert_file_matches, assert_zip_matches, create_large_file, tmp_context, wait_for
 
 fake = Faker()
 
@@ -148,6 +148,72 @@ class TestNamespace(BaseE2ETest):
         with pytest.raises(AttributeError):
             container[namespace][key2].fetch()
 
+    @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    def test_fetch_in_one_request(self, container: AttributeContainer):
+        namespace = self.gen_key()
+        # the number of fields a report pulls per run
+        values = {f'{fake.unique.word()}/field_{i}': fake.name() if i % 2 else random.random() for i in range(200)}
+        container[namespace] = values
+        container[f'{namespace}/losses'].log([random.random() for _ in range(10)])
+        container.sync()
+        picked = list(values)[::10]
+
+        with count_backend_calls() as calls:
+            subtree = fetch_attributes(container, [namespace])
+            fields = fetch_attributes(container, [f'{namespace}/{key}' for key in picked])
+
+        assert calls.total == 2
+        last_loss = container[f'{namespace}/losses'].fetch_last()
+        assert subtree == dict({f'{namespace}/{key}': value for key, value in values.items()},
+                               **{f'{namespace}/losses': last_loss})
+        assert fields == {f'{namespace}/{key}': values[key] for key in picked}
+
+    @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    def test_cached_fetches(self, container: AttributeContainer):
+        namespace = self.gen_key()
+        key, other_key = fake.unique.word(), fake.unique.word()
+        container[namespace] = {key: fake.name(), other_key: random.random()}
+        container.sync()
+
+        with cache_atom_fetches(container) as cache, count_backend_calls() as calls:
+            for _ in range(3):
+                container[f'{namespace}/{other_key}'].fetch()
+            assert calls.total == 1 and cache.hits == 2
+
+            # write, namespace reassignment and deletion each invalidate the fetched value
+            value = fake.name()
+            container[namespace][key].fetch()
+            container[f'{namespace}/{key}'] = value
+            # may or may not see the write yet, so it isn't kept
+            container[f'{namespace}/{key}'].fetch()
+            container.wait()
+            assert container[f'{namespace}/{key}'].fetch() == value
+
+            value = fake.name()
+            container[namespace] = {key: value}
+            container.wait()
+            assert container[f'{namespace}/{key}'].fetch() == value
+
+            del container[namespace]
+            container.sync()
+            with pytest.raises(AttributeError):
+                container[f'{namespace}/{key}'].fetch()
+
+    @pytest.mark.parametrize('container', ['run'], indirect=True)
+    def test_cached_fetches_evicted(self, container: AttributeContainer):
+        namespace = self.gen_key()
+        values = {f'field_{i}': i for i in range(5)}
+        container[namespace] = values
+        container.sync()
+
+        with cache_atom_fetches(container, max_size=3) as cache, count_backend_calls() as calls:
+            for key in values:
+                container[namespace][key].fetch()
+            assert len(cache) == 3
+            # the last three are cached, the two evicted first are fetched again
+            assert {key: container[namespace][key].fetch() for key in reversed(list(values))} == values
+            assert calls.total == len(values) + 2
+
 
 class TestStringSet:
     neptune_tags_path = 'sys/tags'
@@ -183,6 +249,7 @@ class TestStringSet:
 
 class TestFiles(BaseE2ETest):
     @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    @pytest.mark.memory_budget('128MB')
     def test_file(self, container: AttributeContainer):
         key = self.gen_key()
         filename = fake.file_name()
@@ -190,20 +257,18 @@ class TestFiles(BaseE2ETest):
 
         with tmp_context():
             # create 10MB file
-            with open(filename, "wb") as file:
-                file.write(b"\0" * 10 * 2 ** 20)
+            expected = create_large_file(filename, 10 * 2 ** 20)
             container[key].upload(filename)
 
             container.sync()
             container[key].download(downloaded_filename)
 
-            assert os.path.getsize(downloaded_filename) == 10 * 2 ** 20
-            with open(downloaded_filename, "rb") as file:
-                content = file.read()
-                assert len(content) == 10 * 2 ** 20
-                assert content == b"\0" * 10 * 2 ** 20
+            assert_file_matches(downloaded_filename, expected)
 
     @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    @pytest.mark.memory_budget('128MB')
+    @pytest.mark.request_budget(execute_operations=3, upload_file_set_attribute=2, download_file_set_attribute_zip=3,
+                                sent_bytes={'upload_file_set_attribute': '21MB'})
     def test_fileset(self, container: AttributeContainer):
         key = self.gen_key()
         filename1 = fake.file_name()
@@ -211,9 +276,8 @@ class TestFiles(BaseE2ETest):
 
         with tmp_context():
             # create two 10MB files
-            with open(filename1, "wb") as file1, open(filename2, "wb") as file2:
-                file1.write(b"\0" * 10 * 2 ** 20)
-                file2.write(b"\0" * 10 * 2 ** 20)
+            expected1 = create_large_file(filename1, 10 * 2 ** 20, seed=1)
+            expected2 = create_large_file(filename2, 10 * 2 ** 20, seed=2)
 
             # when one file as fileset uploaded
             container[key].upload_files([filename1])
@@ -222,12 +286,7 @@ class TestFiles(BaseE2ETest):
             container.sync()
             container[key].download("downloaded1.zip")
 
-            with ZipFile("downloaded1.zip") as zipped:
-                assert set(zipped.namelist()) == {filename1, "/"}
-                with zipped.open(filename1, "r") as file1:
-                    content1 = file1.read()
-                    assert len(content1) == 10 * 2 ** 20
-                    assert content1 == b"\0" * 10 * 2 ** 20
+            assert_zip_matches("downloaded1.zip", {filename1: expected1}, other_names={"/"})
 
             # when second file as fileset uploaded
             container[key].upload_files([filename2])
@@ -236,14 +295,7 @@ class TestFiles(BaseE2ETest):
             container.sync()
             container[key].download("downloaded2.zip")
 
-            with ZipFile("downloaded2.zip") as zipped:
-                assert set(zipped.namelist()) == {filename1, filename2, "/"}
-                with zipped.open(filename1, "r") as file1,\
-                        zipped.open(filename2, "r") as file2:
-                    content1 = file1.read()
-                    content2 = file2.read()
-                    assert len(content1) == len(content2) == 10 * 2 ** 20
-                    assert content1 == content2 == b"\0" * 10 * 2 ** 20
+            assert_zip_matches("downloaded2.zip", {filename1: expected1, filename2: expected2}, other_names={"/"})
 
             # when first file is removed
             container[key].delete_files([filename1])
@@ -252,16 +304,11 @@ class TestFiles(BaseE2ETest):
             container.sync()
             container[key].download("downloaded3.zip")
 
-            with ZipFile("downloaded3.zip") as zipped:
-                assert set(zipped.namelist()) == {filename2, "/"}
-                with zipped.open(filename2, "r") as file2:
-                    content2 = file2.read()
-                    assert len(content2) == 10 * 2 ** 20
-                    assert content2 == b"\0" * 10 * 2 ** 20
+            assert_zip_matches("downloaded3.zip", {filename2: expected2}, other_names={"/"})
 
 
 class TestFetchRunsTable(BaseE2ETest):
-    def test_fetch_table(self):
+    def test_fetch_table(self, record_property):
         tag = str(uuid.uuid4())
         with neptune.init() as run:
             run["sys/tags"].add(tag)
@@ -271,12 +318,13 @@ class TestFetchRunsTable(BaseE2ETest):
             run["sys/tags"].add(tag)
             run["another/value"] = "testing"
 
-        # wait for the elasticsearch cache to fill
-        time.sleep(1)
-
         project = neptune.init_project()
 
-        runs_table = sorted(project.fetch_runs_table(tag=tag).to_runs(), key=lambda r: r.get_attribute_value("sys/id"))
+        # the runs table is served by an index (elasticsearch) which catches up asynchronously
+        polled = wait_for(lambda: project.fetch_runs_table(tag=tag).to_runs(), lambda runs: len(runs) == 2)
+        record_property('index_catch_up_s', polled.seconds)
+
+        runs_table = sorted(polled.value, key=lambda r: r.get_attribute_value("sys/id"))
         assert len(runs_table) == 2
         assert runs_table[0].get_attribute_value("value") == 12
         assert runs_table[1].get_attribute_value("another/value") == "testing"
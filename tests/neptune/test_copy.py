@@ -22,6 +22,7 @@ from neptune.new.run import Run
 from neptune.new.project import Project
 
 from tests.base import BaseE2ETest
+from tests.fetch_cache import cache_atom_fetches
 
 fake = Faker()
 
@@ -50,6 +51,7 @@ class TestCopying(BaseE2ETest):
 
     @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
     @pytest.mark.parametrize("value", [random.randint(0, 100), random.random(), fake.boolean(), fake.word()])
+    @pytest.mark.request_budget(create_experiment=1, execute_operations=5, get_attribute=5)
     def test_copy_run_to_container(self, container: Project, value):
         run = neptune.init_run()
         src, destination, destination2 = self.gen_key(), self.gen_key(), self.gen_key()
@@ -67,3 +69,18 @@ class TestCopying(BaseE2ETest):
         assert container[src].fetch() == value
         assert run[destination].fetch() == value
         assert run[destination2].fetch() == value
+
+    @pytest.mark.parametrize('container', ['run', 'project'], indirect=True)
+    def test_copy_over_cached_value(self, container: Run):
+        src, destination = self.gen_key(), self.gen_key()
+        container[src] = fake.word()
+        container[destination] = fake.word()
+        container.sync()
+
+        with cache_atom_fetches(container) as cache:
+            container[destination].fetch()
+            container[destination] = container[src]
+            container.wait()
+
+            assert container[destination].fetch() == container[src].fetch()
+            assert cache.hits == 0
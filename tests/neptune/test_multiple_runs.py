@@ -13,24 +13,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import multiprocessing
 import random
-import concurrent.futures
+from contextlib import ExitStack
 
 import pytest
 from faker import Faker
 import neptune.new as neptune
 
 from tests.base import BaseE2ETest
+from tests.fetch_cache import cache_atom_fetches
+from tests.stress_utils import count_lost_writes, write_from_processes, write_from_threads
+from tests.utils import DISABLE_SYSLOG_KWARGS
 
 fake = Faker()
 
 
-def store_in_run(run_short_id: str, destination: str):
-    reinitialized_run = neptune.init(run=run_short_id)
-    reinitialized_run[destination] = fake.color()
-    reinitialized_run.sync()
-
-
 class TestMultipleRuns(BaseE2ETest):
     @pytest.mark.parametrize('container', ['run'], indirect=True)
     def test_multiple_runs_single(self, container: neptune.Run):
@@ -56,45 +54,65 @@ class TestMultipleRuns(BaseE2ETest):
 
         assert len(container[namespace].fetch()) == number_of_reinitialized + 1
 
-    @pytest.mark.skip(reason="no way of currently testing this")
     @pytest.mark.parametrize('container', ['run'], indirect=True)
-    def test_multiple_runs_processes(self, container: neptune.Run):
+    def test_multiple_runs_cached(self, container: neptune.Run):
         # pylint: disable=protected-access
 
-        number_of_reinitialized = 10
-        namespace = fake.unique.word()
-
-        container[f'{namespace}/{fake.unique.word()}'] = fake.color()
+        number_of_reinitialized = 3
+        key = f'{fake.unique.word()}/{fake.unique.word()}'
+        container[key] = fake.color()
+        container.sync()
 
-        with concurrent.futures.ProcessPoolExecutor(max_workers=3) as executor:
-            futures = [
-                executor.submit(store_in_run, container._short_id, f'{namespace}/{fake.unique.word()}')
+        with ExitStack() as stack:
+            reinitialized_runs = [
+                stack.enter_context(neptune.init(run=container._short_id, **DISABLE_SYSLOG_KWARGS))
                 for _ in range(number_of_reinitialized)
             ]
-            for future in concurrent.futures.as_completed(futures):
-                _ = future.result()
+            cache = stack.enter_context(cache_atom_fetches(container))
+            cached = container[key].fetch()
+
+            for run in reinitialized_runs:
+                with cache_atom_fetches(run):
+                    run[key].fetch()
+                    value = fake.color()
+                    run[key] = value
+                    run.wait()
+                    # each handle sees its own write at once
+                    assert run[key].fetch() == value
+
+            # the others' writes are seen once this handle syncs, as its structure is
+            assert container[key].fetch() == cached and cache.hits == 1
+            container.sync()
+            assert container[key].fetch() == value
+
+    @pytest.mark.parametrize('start_method', ['fork', 'spawn', 'forkserver'])
+    def test_multiple_runs_processes(self, shared_backend, start_method: str):
+        if start_method not in multiprocessing.get_all_start_methods():
+            pytest.skip(f'{start_method} is not available on this platform')
+        processes, handles, ops_per_handle = 3, 2, 12
+        namespace = fake.unique.word()
+        with neptune.init(**DISABLE_SYSLOG_KWARGS) as run:
+            sys_id = run['sys/id'].fetch()
 
-        container.sync()
+        result = write_from_processes(
+            sys_id, namespace, processes, handles, ops_per_handle,
+            server=shared_backend and shared_backend.server, start_method=start_method,
+        )
 
-        assert len(container[namespace].fetch()) == number_of_reinitialized + 1
+        assert result.queue_dir_collisions == 0
+        with neptune.init(run=sys_id, **DISABLE_SYSLOG_KWARGS) as written:
+            assert count_lost_writes(written, namespace, processes, handles, ops_per_handle) == 0
 
+    @pytest.mark.parametrize('threads', [1, 3])
     @pytest.mark.parametrize('container', ['run'], indirect=True)
-    def test_multiple_runs_thread(self, container: neptune.Run):
-        # pylint: disable=protected-access
-
-        number_of_reinitialized = 10
+    def test_multiple_runs_thread(self, container: neptune.Run, threads: int):
+        handles, ops_per_handle = 3, 12
         namespace = fake.unique.word()
+        sys_id = container['sys/id'].fetch()
 
-        container[f'{namespace}/{fake.unique.word()}'] = fake.color()
+        result = write_from_threads(sys_id, namespace, threads, handles, ops_per_handle)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            futures = [
-                executor.submit(store_in_run, container._short_id, f'{namespace}/{fake.unique.word()}')
-                for _ in range(number_of_reinitialized)
-            ]
-            for future in concurrent.futures.as_completed(futures):
-                _ = future.result()
-
-        container.sync()
-
-        assert len(container[namespace].fetch()) == number_of_reinitialized + 1
+        assert len(result.sync_latencies) == threads * handles
+        assert result.queue_dir_collisions == 0
+        with neptune.init(run=sys_id, **DISABLE_SYSLOG_KWARGS) as written:
+            assert count_lost_writes(written, namespace, threads, handles, ops_per_handle) == 0
@@ -15,6 +15,8 @@
 #
 import random
 
+import numpy
+import pandas
 import pytest
 from PIL import Image
 from faker import Faker
@@ -22,6 +24,7 @@ from faker import Faker
 from neptune.new.attribute_container import AttributeContainer
 
 from tests.base import BaseE2ETest
+from tests.series_utils import iter_series_values
 from tests.utils import generate_image, image_to_png, tmp_context
 
 fake = Faker()
@@ -29,6 +32,8 @@ fake = Faker()
 
 class TestSeries(BaseE2ETest):
     @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    @pytest.mark.request_budget(execute_operations=2, get_attribute=1, get_float_series_values=1,
+                                sent_bytes={'execute_operations': '8KB'})
     def test_log_numbers(self, container: AttributeContainer):
         key = self.gen_key()
         values = [random.random() for _ in range(50)]
@@ -57,6 +62,41 @@ class TestSeries(BaseE2ETest):
         assert list(fetched_values['value']) == values
 
     @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    def test_fetch_values_in_pages(self, container: AttributeContainer):
+        key = self.gen_key()
+        values = [random.random() for _ in range(250)]
+
+        container[key].log(values)
+        container.sync()
+
+        pages = list(iter_series_values(container, key, page_size=100))
+        assert [len(page.values) for page in pages] == [100, 100, 50]
+        assert numpy.concatenate([page.values for page in pages]).tolist() == values
+
+        frame = pandas.concat(iter_series_values(container, key, page_size=100, as_frame=True), ignore_index=True)
+        fetched_values = container[key].fetch_values()
+        assert frame['step'].tolist() == fetched_values['step'].tolist()
+        assert frame['value'].tolist() == fetched_values['value'].tolist()
+
+        # steps are 0..249 and pages hold 0..99, 100..199, 200..249
+        decimated = list(iter_series_values(container, key, page_size=100, step_range=(150, 229), every=7))
+        expected_steps = list(range(150, 230, 7))
+        assert numpy.concatenate([page.steps for page in decimated]).tolist() == expected_steps
+        assert numpy.concatenate([page.values for page in decimated]).tolist() == [values[i] for i in expected_steps]
+
+    @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    def test_fetch_strings_in_pages(self, container: AttributeContainer):
+        key = self.gen_key()
+        values = [fake.word() for _ in range(50)]
+
+        container[key].log(values)
+        container.sync()
+
+        pages = list(iter_series_values(container, key, page_size=20, step_range=(None, 29)))
+        assert numpy.concatenate([page.values for page in pages]).tolist() == values[:30]
+
+    @pytest.mark.parametrize('container', ['project', 'run'], indirect=True)
+    @pytest.mark.memory_budget('256MB')
     def test_log_images(self, container: AttributeContainer):
         key = self.gen_key()
         # images with size between 200KB - 12MB
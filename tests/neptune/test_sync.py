@@ -15,14 +15,32 @@
 #
 import json
 import re
+from collections import Counter
 from pathlib import Path
+from types import SimpleNamespace
 
 import neptune.new as neptune
+import pytest
 from click.testing import CliRunner
 from faker import Faker
+from neptune.new.constants import ASYNC_DIRECTORY, NEPTUNE_DATA_DIRECTORY
+from neptune.new.internal.container_type import ContainerType
+from neptune.new.internal.containers.disk_queue import DiskQueue
 from neptune.new.sync import sync
 
 from tests.base import BaseE2ETest
+from tests.sync_utils import (
+    QueueReader,
+    count_duplicate_points,
+    expected_series_lengths,
+    generate_offline_runs,
+    kill_sync,
+    parallel_sync,
+    sync_backend,
+    sync_queue,
+    synthetic_operations,
+    write_queue,
+)
 from tests.utils import DISABLE_SYSLOG_KWARGS, tmp_context
 
 fake = Faker()
@@ -32,6 +50,8 @@ runner = CliRunner()
 class TestSync(BaseE2ETest):
     SYNCHRONIZED_SYSID_RE = r"\w+/[\w-]+/([\w-]+)"
 
+    @pytest.mark.request_budget(create_experiment=3, execute_operations=6, get_experiment_attributes=4,
+                                upload_file_set_attribute=3)
     def test_sync_run(self):
         custom_run_id = "-".join((fake.word() for _ in range(3)))
 
@@ -163,3 +183,121 @@ class TestSync(BaseE2ETest):
 
             run2 = neptune.init(run=sys_id)
             assert run2[key].fetch() == val
+
+    def test_parallel_sync(self, shared_backend):
+        runs, ops_per_run = 4, 50
+
+        with tmp_context() as tmp:
+            # leave a few offline runs behind
+            generate_offline_runs(tmp, runs=runs, ops_per_run=ops_per_run)
+
+            # and sync them with two workers
+            results = parallel_sync(tmp, workers=2, server=shared_backend and shared_backend.server)
+            assert [result.exit_code for result in results] == [0, 0]
+
+            sys_ids = {
+                sys_id for result in results for sys_id in re.findall(self.SYNCHRONIZED_SYSID_RE, result.output)
+            }
+            assert len(sys_ids) == runs
+
+            for sys_id in sys_ids:
+                with neptune.init(run=sys_id, **DISABLE_SYSLOG_KWARGS) as run:
+                    for path, length in expected_series_lengths(ops_per_run).items():
+                        assert len(run[path].fetch_values()) == length
+
+    def test_queue_reader_sync(self):
+        ops = 2500
+
+        with tmp_context() as tmp, neptune.init(**DISABLE_SYSLOG_KWARGS) as run:
+            run_id = run._id  # pylint: disable=protected-access
+            copy_from = (run_id, ContainerType.RUN)
+            # small files, so that the queue spans several of them
+            queue_dir = Path(tmp) / 'queue'
+            last_version = write_queue(queue_dir, synthetic_operations(ops, copy_from), max_file_size=32 * 1024)
+            assert last_version == ops
+            assert len(list(queue_dir.glob('data-*.log'))) > 1
+
+            # seeking past a version skips everything up to it
+            reader = QueueReader(queue_dir)
+            assert [version for _, version in reader.read(after_version=1234)] == list(range(1235, ops + 1))
+            assert len(list(reader.read())) == ops
+
+            assert sync_queue(queue_dir, run_id, ContainerType.RUN, sync_backend()) == ops
+            assert reader.last_ack_version == ops
+            # nothing left to send
+            assert sync_queue(queue_dir, run_id, ContainerType.RUN, sync_backend()) == 0
+            run.sync()
+
+            for path, length in expected_series_lengths(ops, copy_from).items():
+                assert len(run[path].fetch_values()) == length
+            # copied at op 999, before op 1000 reassigned the param
+            assert run['copies/param_0'].fetch() == 'value-0'
+
+    def test_queue_reader_sync_stalled(self):
+        stalled = SimpleNamespace(execute_operations=lambda container_id, container_type, operations: (0, []))
+
+        with tmp_context() as tmp:
+            queue_dir = Path(tmp) / 'queue'
+            write_queue(queue_dir, synthetic_operations(10))
+            with pytest.raises(RuntimeError, match='accepted none of 10 ops'):
+                sync_queue(queue_dir, 'stalled', ContainerType.RUN, stalled)
+            # nothing was sent, so nothing is acknowledged
+            assert QueueReader(queue_dir).last_ack_version == 0
+
+    @staticmethod
+    def _kill_during_sync(tmp: str, ops: int, server):
+        """Queues `ops` ops of a new run and kills `neptune sync` of them once most are acknowledged.
+        Returns the run's id, its sys/id, the queue directory and the version acknowledged."""
+        with neptune.init(**DISABLE_SYSLOG_KWARGS) as run:
+            run_id = run._id  # pylint: disable=protected-access
+            sys_id = run['sys/id'].fetch()
+        queue_dir = Path(tmp) / NEPTUNE_DATA_DIRECTORY / ASYNC_DIRECTORY / run_id / 'exec-killed'
+        write_queue(queue_dir, synthetic_operations(ops))
+
+        # killed late, so that most of the queue is already acknowledged
+        acked = kill_sync(tmp, queue_dir, ack_version=fake.random_int(int(ops * 0.75), int(ops * 0.9)), server=server)
+        assert acked < ops
+        return run_id, sys_id, queue_dir, acked
+
+    def test_resume_after_kill(self, shared_backend):
+        ops, batch = 20000, 1000
+        server = shared_backend and shared_backend.server
+
+        with tmp_context() as tmp:
+            run_id, sys_id, queue_dir, acked = self._kill_during_sync(tmp, ops, server)
+            received = server.received_operations(run_id) if server else None
+
+            result = runner.invoke(sync, ["--path", tmp])
+            assert result.exit_code == 0
+            assert QueueReader(queue_dir).last_ack_version == ops
+
+        if server:
+            # the batch in flight when sync died may be applied and then sent again;
+            # everything acknowledged before is not
+            assert server.received_operations(run_id) - received <= ops - acked + 2 * batch
+
+        with neptune.init(run=sys_id, **DISABLE_SYSLOG_KWARGS) as resumed:
+            for path, length in expected_series_lengths(ops).items():
+                values = resumed[path].fetch_values()
+                duplicates = count_duplicate_points(values)
+                assert duplicates <= 2 * batch
+                assert len(values) - duplicates == length
+
+    @pytest.mark.xfail(strict=True, reason='the client parses the acknowledged prefix of a queue to skip it '
+                                            '(DiskQueue._skip_and_get), resume time grows with it')
+    def test_resume_reads_unsent_part(self, shared_backend, monkeypatch):
+        ops, batch = 20000, 1000
+        parsed = Counter()
+        deserialize = DiskQueue._deserialize  # pylint: disable=protected-access
+
+        def counted_deserialize(queue, data):
+            parsed['ops'] += 1
+            return deserialize(queue, data)
+
+        with tmp_context() as tmp:
+            _, _, _, acked = self._kill_during_sync(tmp, ops, shared_backend and shared_backend.server)
+            monkeypatch.setattr(DiskQueue, '_deserialize', counted_deserialize)
+            result = runner.invoke(sync, ["--path", tmp])
+            assert result.exit_code == 0
+
+        assert parsed['ops'] <= ops - acked + 2 * batch
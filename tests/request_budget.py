@@ -0,0 +1,107 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'RequestBudgetPlugin',
+    'exceeded_budget',
+]
+
+from typing import Dict, List, Optional, Union
+
+import pytest
+
+from neptune.new.attribute_container import AttributeContainer
+
+from tests.backend.traffic import ENDPOINTS, EndpointTraffic, record_traffic
+from tests.memory import parse_size
+
+
+def exceeded_budget(traffic: EndpointTraffic, sent_bytes: Optional[Dict[str, Union[int, str]]] = None,
+                    received_bytes: Optional[Dict[str, Union[int, str]]] = None,
+                    **requests: int) -> List[str]:
+    """Describes every endpoint with more requests than `requests` (by endpoint) allows,
+    or more bytes than `sent_bytes` or `received_bytes` do (by endpoint, sizes as for `parse_size`)."""
+    unknown = set(requests).union(sent_bytes or {}, received_bytes or {}).difference(ENDPOINTS)
+    if unknown:
+        raise ValueError(f"Unknown endpoints in request budget: {', '.join(sorted(unknown))}")
+
+    found = []
+    for endpoint, budget in sorted(requests.items()):
+        if traffic.requests[endpoint] > budget:
+            found.append(f'{endpoint}: {traffic.requests[endpoint]} requests > budget {budget}')
+    for direction, budgets, counted in (('sent', sent_bytes, traffic.sent_bytes),
+                                        ('received', received_bytes, traffic.received_bytes)):
+        for endpoint, budget in sorted((budgets or {}).items()):
+            if counted[endpoint] > parse_size(budget):
+                found.append(f'{endpoint}: {counted[endpoint]} B {direction} > budget {parse_size(budget)} B')
+    return found
+
+
+class RequestBudgetPlugin:
+    """Records the requests the local stand-in serves while each test with a budget, or the `request_traffic`
+    fixture, runs; the setup and teardown of its fixtures, like the creation of a session container, are left out.
+    So are requests about containers the test neither got from a fixture nor created or resumed itself.
+
+    A test fails when it sends more requests or bytes to an endpoint than
+    `@pytest.mark.request_budget(execute_operations=2, sent_bytes={'upload_attribute': '1MB'})` allows.
+    Budgets are for a healthy link, retries of failed requests don't fit them: `check_budgets=False`
+    only records the requests."""
+
+    def __init__(self, check_budgets: bool = True):
+        self._check_budgets = check_budgets
+        self._traffic: Dict[str, EndpointTraffic] = {}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        server = item.funcargs.get('neptune_backend')
+        traffic = item.funcargs.get('request_traffic')
+        if server is None or (traffic is None and item.get_closest_marker('request_budget') is None):
+            yield
+            return
+        if traffic is None:
+            traffic = EndpointTraffic()
+        traffic.limit_to(
+            value._id for value in item.funcargs.values()  # pylint: disable=protected-access
+            if isinstance(value, AttributeContainer)
+        )
+        self._traffic[item.nodeid] = traffic
+        with record_traffic(server, traffic):
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if call.when != 'call':
+            return
+        traffic = self._traffic.pop(item.nodeid, None)
+        marker = item.get_closest_marker('request_budget')
+        if traffic is None or marker is None or not report.passed or not self._check_budgets:
+            return
+        try:
+            exceeded = exceeded_budget(traffic, **marker.kwargs)
+        except ValueError as error:
+            report.outcome = 'failed'
+            report.longrepr = str(error)
+            return
+        if exceeded:
+            requests = '\n'.join(
+                f"  {endpoint}: {counts['requests']} requests, {counts['sent_bytes']} B sent, "
+                f"{counts['received_bytes']} B received"
+                for endpoint, counts in traffic.summary().items()
+            )
+            report.outcome = 'failed'
+            report.longrepr = 'request budget exceeded:\n' + '\n'.join(f'  {line}' for line in exceeded) + \
+                              f'\nrequests made by the test:\n{requests}'
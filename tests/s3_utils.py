@@ -0,0 +1,49 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'object_content',
+    'seed_objects',
+]
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import boto3
+from botocore.config import Config
+
+
+def object_content(key: str, size: int) -> bytes:
+    """`size` bytes of content of its own for the object at `key`."""
+    line = f'{key}\n'.encode()
+    return (line * (size // len(line) + 1))[:size]
+
+
+def seed_objects(bucket_name: str, count: int, prefix: str = '', size: int = 1024, workers: int = 16) -> Dict[str, str]:
+    """Puts `count` objects of `size` bytes under `prefix` of the bucket, from `workers` threads at once;
+    works with the live service and the local stand-in alike. Returns the MD5 (the ETag of an object put
+    in one piece) of every key."""
+    # boto3 clients can be shared by threads, resources can't
+    client = boto3.client('s3', config=Config(max_pool_connections=workers))
+    keys = [f'{prefix}object_{i}.bin' for i in range(count)]
+
+    def put(key: str) -> str:
+        content = object_content(key, size)
+        client.put_object(Bucket=bucket_name, Key=key, Body=content)
+        return hashlib.md5(content).hexdigest()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(keys, executor.map(put, keys)))
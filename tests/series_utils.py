@@ -0,0 +1,107 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'SeriesPage',
+    'iter_series_values',
+]
+
+from collections import namedtuple
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy
+import pandas
+
+from neptune.new.attribute_container import AttributeContainer
+from neptune.new.attributes.series.float_series import FloatSeries
+
+# steps, values and UTC timestamps (datetime64[ms]) of consecutive points, as numpy arrays
+SeriesPage = namedtuple('SeriesPage', ['steps', 'values', 'timestamps'])
+
+DEFAULT_PAGE_SIZE = 10000
+
+
+def _to_page(points, float_values: bool) -> SeriesPage:
+    count = len(points)
+    if float_values:
+        values = numpy.fromiter((point.value for point in points), dtype=float, count=count)
+    else:
+        values = numpy.array([point.value for point in points], dtype=object)
+    timestamps = numpy.fromiter((point.timestampMillis for point in points), dtype='int64', count=count)
+    return SeriesPage(
+        numpy.fromiter((point.step for point in points), dtype=float, count=count),
+        values,
+        timestamps.astype('datetime64[ms]'),
+    )
+
+
+def _first_offset(attribute, total: int, first_step: float) -> int:
+    """Offset of the first point at `first_step` or later; steps only grow, so it's bisected
+    with single point requests instead of reading everything before it."""
+    # pylint: disable=protected-access
+    low, high = 0, total
+    while low < high:
+        middle = (low + high) // 2
+        if attribute._fetch_values_from_backend(middle, 1).values[0].step < first_step:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def iter_series_values(container: AttributeContainer, path: str, *, page_size: int = DEFAULT_PAGE_SIZE,
+                       step_range: Tuple[Optional[float], Optional[float]] = (None, None), every: int = 1,
+                       as_frame: bool = False) -> Iterator[Union[SeriesPage, pandas.DataFrame]]:
+    """Points of the float or string series at `path`, one page of at most `page_size` at a time,
+    so only a page is held in memory instead of the whole series `fetch_values()` builds.
+
+    `step_range` bounds the steps (inclusive, `None` for open ends); `every=n` keeps every n-th point
+    of that range. Pages are `SeriesPage`s of numpy arrays, or DataFrames with the columns of
+    `fetch_values()` (step, value, timestamp) when `as_frame` is set."""
+    attribute = container.get_attribute(path)
+    float_values = isinstance(attribute, FloatSeries)
+    first_step, last_step = step_range
+    # pylint: disable=protected-access
+    page = attribute._fetch_values_from_backend(0, page_size)
+    total = page.totalItemCount
+    offset = 0
+    if first_step is not None and page.values and page.values[-1].step < first_step:
+        offset = _first_offset(attribute, total, first_step)
+        page = attribute._fetch_values_from_backend(offset, page_size)
+
+    # points of the step range seen in earlier pages, decimation counts from the first one
+    seen = 0
+    while page.values:
+        chunk = _to_page(page.values, float_values)
+        mask = numpy.ones(len(chunk.steps), dtype=bool)
+        if first_step is not None:
+            mask &= chunk.steps >= first_step
+        if last_step is not None:
+            mask &= chunk.steps <= last_step
+        if every > 1:
+            in_range = numpy.flatnonzero(mask)
+            mask[in_range[(seen + numpy.arange(len(in_range))) % every != 0]] = False
+            seen += len(in_range)
+        if mask.any():
+            chunk = SeriesPage(*(column[mask] for column in chunk))
+            if as_frame:
+                yield pandas.DataFrame({'step': chunk.steps, 'value': chunk.values, 'timestamp': chunk.timestamps})
+            else:
+                yield chunk
+
+        offset += len(page.values)
+        if offset >= total or (last_step is not None and page.values[-1].step > last_step):
+            return
+        page = attribute._fetch_values_from_backend(offset, page_size)
@@ -0,0 +1,140 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'StressResult',
+    'count_lost_writes',
+    'write_from_processes',
+    'write_from_threads',
+]
+
+import concurrent.futures
+import multiprocessing
+import time
+from contextlib import ExitStack
+from typing import List, Optional, Tuple
+
+import neptune.new as neptune
+
+from tests.backend import local_backend
+from tests.utils import DISABLE_SYSLOG_KWARGS
+
+# every handle cycles through an atom, a series point and a namespace (dict) assignment
+OPS_KINDS = 3
+
+
+class StressResult:
+    """What concurrent writers did: ops written, wall-clock time, and the `sync()` latency
+    and disk queue directory of every handle."""
+
+    def __init__(self, ops: int, seconds: float, handles: List[Tuple[float, str]]):
+        self.ops = ops
+        self.seconds = seconds
+        self.sync_latencies = [latency for latency, _ in handles]
+        self.queue_dirs = [queue_dir for _, queue_dir in handles]
+
+    @property
+    def ops_per_s(self) -> float:
+        return self.ops / self.seconds
+
+    @property
+    def queue_dir_collisions(self) -> int:
+        """Handles which queued their ops in a directory already used by another one."""
+        return len(self.queue_dirs) - len(set(self.queue_dirs))
+
+
+def _handle_path(namespace: str, writer: int, handle: int) -> str:
+    return f'{namespace}/writer_{writer}/handle_{handle}'
+
+
+def _write_handle(sys_id: str, path: str, ops_per_handle: int) -> Tuple[float, str]:
+    """Writes through a freshly reinitialized run; returns how long its `sync()` took and its queue directory."""
+    run = neptune.init(run=sys_id, **DISABLE_SYSLOG_KWARGS)
+    # pylint: disable=protected-access
+    queue_dir = str(run._op_processor._queue._dir_path)
+    try:
+        for i in range(ops_per_handle):
+            kind = i % OPS_KINDS
+            if kind == 0:
+                run[f'{path}/atom_{i}'] = i
+            elif kind == 1:
+                run[f'{path}/series'].log(i)
+            else:
+                run[f'{path}/dict_{i}'] = {'value': i, 'name': f'name-{i}'}
+        start = time.perf_counter()
+        run.sync()
+        return time.perf_counter() - start, queue_dir
+    finally:
+        run.stop()
+
+
+def _write_handles(sys_id: str, namespace: str, writer: int, handles: int, ops_per_handle: int,
+                   server=None) -> List[Tuple[float, str]]:
+    with ExitStack() as stack:
+        if server is not None:
+            # spawned and forkserver workers don't inherit the parent's patches
+            stack.enter_context(local_backend(server))
+        return [
+            _write_handle(sys_id, _handle_path(namespace, writer, handle), ops_per_handle)
+            for handle in range(handles)
+        ]
+
+
+def write_from_threads(sys_id: str, namespace: str, threads: int, handles: int, ops_per_handle: int) -> StressResult:
+    """Reinitializes the run `handles` times on each of `threads` threads at once, every handle writing
+    `ops_per_handle` ops to a path of its own under `namespace`."""
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [
+            executor.submit(_write_handles, sys_id, namespace, writer, handles, ops_per_handle)
+            for writer in range(threads)
+        ]
+        written = [handle for future in futures for handle in future.result()]
+    return StressResult(threads * handles * ops_per_handle, time.perf_counter() - start, written)
+
+
+def write_from_processes(sys_id: str, namespace: str, processes: int, handles: int, ops_per_handle: int,
+                         server=None, start_method: Optional[str] = None) -> StressResult:
+    """Like `write_from_threads`, with a pool of `processes` workers started with `start_method`.
+
+    Pass the proxy of a `SharedLocalServer` as `server` to write to the stand-in; workers talk to the live
+    service otherwise. The time includes starting the workers, as it does for a training job."""
+    start = time.perf_counter()
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(processes) as pool:
+        results = pool.starmap(
+            _write_handles,
+            [(sys_id, namespace, writer, handles, ops_per_handle, server) for writer in range(processes)],
+        )
+    written = [handle for handles_written in results for handle in handles_written]
+    return StressResult(processes * handles * ops_per_handle, time.perf_counter() - start, written)
+
+
+def count_lost_writes(run: neptune.Run, namespace: str, writers: int, handles: int, ops_per_handle: int) -> int:
+    """Ops written by `write_from_threads` or `write_from_processes` that are missing from the run
+    or hold another value."""
+    written = run[namespace].fetch() if run.exists(namespace) else {}
+    lost = 0
+    for writer in range(writers):
+        for handle in range(handles):
+            values = written.get(f'writer_{writer}', {}).get(f'handle_{handle}', {})
+            path = _handle_path(namespace, writer, handle)
+            points = set(run[f'{path}/series'].fetch_values()['value']) if run.exists(f'{path}/series') else set()
+            lost += len(set(range(1, ops_per_handle, OPS_KINDS)) - points)
+            for i in range(0, ops_per_handle, OPS_KINDS):
+                lost += values.get(f'atom_{i}') != i
+            for i in range(2, ops_per_handle, OPS_KINDS):
+                lost += values.get(f'dict_{i}') != {'value': i, 'name': f'name-{i}'}
+    return lost
@@ -0,0 +1,308 @@
+#
+# Copyright (c) 2021, Neptune Labs Sp. z o.o.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+__all__ = [
+    'QueueReader',
+    'SyncResult',
+    'count_duplicate_points',
+    'expected_series_lengths',
+    'generate_offline_runs',
+    'kill_sync',
+    'parallel_sync',
+    'sync_backend',
+    'sync_queue',
+    'synthetic_operations',
+    'write_queue',
+]
+
+import json
+import mmap
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import uuid
+from collections import Counter, namedtuple
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas
+
+from click.testing import CliRunner
+
+from neptune.new.attributes.atoms.string import String
+from neptune.new import sync as sync_module
+from neptune.new.constants import ASYNC_DIRECTORY, NEPTUNE_DATA_DIRECTORY, OFFLINE_DIRECTORY, OFFLINE_NAME_PREFIX
+from neptune.new.internal.backends.neptune_backend import NeptuneBackend
+from neptune.new.internal.container_type import ContainerType
+from neptune.new.internal.containers.disk_queue import DiskQueue
+from neptune.new.internal.operation import AssignString, CopyAttribute, LogFloats, Operation
+from neptune.new.internal.utils.paths import path_to_str
+from neptune.new.internal.utils.sync_offset_file import SyncOffsetFile
+from neptune.new.sync import sync
+
+from tests.backend import local_backend
+
+SERIES_COUNT = 7
+PARAMS_COUNT = 100
+# CopyAttribute splits a batch, so it is kept as rare as in real queues
+COPY_EVERY = 1000
+
+SyncResult = namedtuple('SyncResult', ['exit_code', 'output'])
+
+
+def synthetic_operations(count: int, copy_from: Optional[Tuple[str, ContainerType]] = None) -> Iterator[Operation]:
+    """Deterministic mix of LogFloats (~90%) and AssignString (~10%) ops.
+
+    With `copy_from=(container_id, container_type)` every COPY_EVERY-th op is a CopyAttribute of a param
+    assigned earlier; offline runs can't have those, their id is unknown before registration."""
+    timestamp = time.time()
+    for i in range(count):
+        if copy_from is not None and i % COPY_EVERY == COPY_EVERY - 1:
+            param = f'param_{(i // COPY_EVERY) % PARAMS_COUNT}'
+            yield CopyAttribute(['copies', param], copy_from[0], copy_from[1], ['params', param], String)
+        elif i % 10 == 0:
+            yield AssignString(['params', f'param_{(i // 10) % PARAMS_COUNT}'], f'value-{i}')
+        else:
+            yield LogFloats(['metrics', f'series_{i % SERIES_COUNT}'], [LogFloats.ValueType(float(i), None, timestamp)])
+
+
+def expected_series_lengths(count: int, copy_from: Optional[Tuple[str, ContainerType]] = None) -> Dict[str, int]:
+    return Counter(
+        path_to_str(operation.path)
+        for operation in synthetic_operations(count, copy_from)
+        if isinstance(operation, LogFloats)
+    )
+
+
+def write_queue(queue_dir: Path, operations: Iterable[Operation],
+                container_type: ContainerType = ContainerType.RUN, max_file_size: int = 64 * 1024 ** 2) -> int:
+    """Writes ops with the client's own `DiskQueue`, so the files are exactly what `neptune sync` reads.
+
+    Returns the last put version."""
+    queue = DiskQueue(
+        queue_dir, lambda x: x.to_dict(), Operation.from_dict, threading.RLock(), container_type, max_file_size
+    )
+    version = 0
+    try:
+        for operation in operations:
+            version = queue.put(operation)
+        queue.flush()
+    finally:
+        queue.close()
+    return version
+
+
+def generate_offline_runs(path: str, runs: int, ops_per_run: int) -> List[str]:
+    """Creates `runs` directories in `<path>/.neptune/offline` as left by `mode="offline"` runs;
+    returns the offline ids."""
+    offline_dir = Path(path) / NEPTUNE_DATA_DIRECTORY / OFFLINE_DIRECTORY
+    run_ids = [str(uuid.uuid4()) for _ in range(runs)]
+    for run_id in run_ids:
+        write_queue(offline_dir / run_id, synthetic_operations(ops_per_run))
+    return run_ids
+
+
+def _sync_runs(path: str, run_names: List[str], project: Optional[str], server) -> SyncResult:
+    args = ['--path', path] + [arg for name in run_names for arg in ('--run', name)]
+    if project:
+        args += ['--project', project]
+    if server is None:
+        result = CliRunner().invoke(sync, args)
+    else:
+        with local_backend(server):
+            result = CliRunner().invoke(sync, args)
+    return SyncResult(result.exit_code, result.output)
+
+
+def kill_sync(path: str, queue_dir: Path, ack_version: int, server=None, start_method: Optional[str] = None,
+              delay: float = 0, timeout: float = 300) -> int:
+    """Runs `neptune sync --path <path>` in a subprocess and SIGKILLs it `delay` seconds after `queue_dir`
+    acks `ack_version`, like a preempted node would. Acks move a batch at a time, the delay picks a point within one.
+
+    Returns the version acknowledged when it died; that's the whole queue if sync finished first."""
+    reader = QueueReader(queue_dir)
+    context = multiprocessing.get_context(start_method)
+    process = context.Process(target=_sync_runs, args=(path, [], None, server), daemon=True)
+    process.start()
+    deadline = time.monotonic() + timeout
+    while process.is_alive() and reader.last_ack_version < ack_version:
+        if time.monotonic() > deadline:
+            os.kill(process.pid, signal.SIGKILL)
+            raise TimeoutError(f'sync of {queue_dir} did not reach version {ack_version} in {timeout}s')
+        time.sleep(0.001)
+    process.join(delay)
+    # `Process.kill()` comes with Python 3.7
+    if process.is_alive():
+        os.kill(process.pid, signal.SIGKILL)
+    process.join()
+    return reader.last_ack_version
+
+
+def count_duplicate_points(values: pandas.DataFrame) -> int:
+    """Points of a `fetch_values()` frame logged more than once; a repeated op gets new steps, so it's
+    recognized by its timestamp and value."""
+    return int(values.duplicated(['timestamp', 'value']).sum())
+
+
+def parallel_sync(path: str, workers: int, project: Optional[str] = None, server=None,
+                  start_method: Optional[str] = None) -> List[SyncResult]:
+    """`neptune sync --path <path>` with the runs split among `workers` processes.
+
+    Each worker syncs its share with one `sync --run ...` invocation. Pass the proxy of a
+    `SharedLocalServer` as `server` to sync to the stand-in; workers talk to the live service otherwise."""
+    data_dir = Path(path) / NEPTUNE_DATA_DIRECTORY
+    run_names = [
+        f'{OFFLINE_NAME_PREFIX}{run_dir.name}' for run_dir in sorted((data_dir / OFFLINE_DIRECTORY).glob('*'))
+    ] + [run_dir.name for run_dir in sorted((data_dir / ASYNC_DIRECTORY).glob('*'))]
+    shares = [run_names[i::workers] for i in range(workers) if run_names[i::workers]]
+    if not shares:
+        return []
+
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(len(shares)) as pool:
+        return pool.starmap(_sync_runs, [(path, share, project, server) for share in shares])
+
+
+class QueueReader:
+    """Streams the ops of a disk queue directory (`data-N.log` files) in version order.
+
+    Files are memory-mapped and parsed one line at a time, and pages already consumed are released,
+    so memory doesn't grow with the queue. Reading after a version (the acknowledged one by default)
+    bisects to it instead of parsing everything before it, like `DiskQueue` does."""
+    # below this many bytes a linear scan is cheaper than another bisection step
+    SCAN_THRESHOLD = 64 * 1024
+    RELEASE_EVERY = 4 * 1024 ** 2
+
+    def __init__(self, queue_dir: Path):
+        self._dir = Path(queue_dir)
+        self._decoder = json.JSONDecoder(strict=False)
+
+    def _version_file(self, name: str) -> int:
+        path = self._dir / name
+        content = path.read_text() if path.exists() else ''
+        return int(content) if content else 0
+
+    @property
+    def last_put_version(self) -> int:
+        return self._version_file('last_put_version')
+
+    @property
+    def last_ack_version(self) -> int:
+        return self._version_file('last_ack_version')
+
+    def ack(self, version: int):
+        ack_file = SyncOffsetFile(self._dir / 'last_ack_version', default=0)
+        try:
+            ack_file.write(version)
+        finally:
+            ack_file.close()
+
+    def _log_files(self) -> List[Tuple[int, Path]]:
+        # `data-N.log` starts with version N
+        return sorted((int(path.stem[len('data-'):]), path) for path in self._dir.glob('data-*.log'))
+
+    def _objects(self, mapped: mmap.mmap, start: int) -> Iterator[dict]:
+        released = 0
+        while start < len(mapped):
+            end = mapped.find(b'\n', start)
+            end = len(mapped) if end == -1 else end
+            line = mapped[start:end].decode('utf-8')
+            # one op per line, unless appended by hand without newlines (as in test_sync)
+            index = 0
+            while True:
+                while index < len(line) and line[index].isspace():
+                    index += 1
+                if index == len(line):
+                    break
+                try:
+                    obj, index = self._decoder.raw_decode(line, index)
+                except json.JSONDecodeError:
+                    # a partially written tail, e.g. after a crash
+                    return
+                yield obj
+            start = end + 1
+            if hasattr(mapped, 'madvise') and start - released > self.RELEASE_EVERY:
+                consumed = start - start % mmap.PAGESIZE
+                mapped.madvise(mmap.MADV_DONTNEED, released, consumed - released)
+                released = consumed
+
+    def _first_version(self, mapped: mmap.mmap, start: int) -> Optional[int]:
+        return next((obj['version'] for obj in self._objects(mapped, start)), None)
+
+    def _seek(self, mapped: mmap.mmap, after_version: int) -> int:
+        """Offset of a line from which scanning reaches every op newer than `after_version`."""
+        low, high = 0, len(mapped)
+        while high - low > self.SCAN_THRESHOLD:
+            line_start = mapped.find(b'\n', (low + high) // 2) + 1
+            if line_start == 0 or line_start >= high:
+                break
+            version = self._first_version(mapped, line_start)
+            if version is not None and version <= after_version:
+                low = line_start
+            else:
+                high = line_start
+        return low
+
+    def read(self, after_version: Optional[int] = None, raw: bool = False) -> Iterator[Tuple[object, int]]:
+        """Yields `(operation, version)` for versions in `(after_version, last_put_version]`;
+        `after_version` defaults to the last acknowledged one. With `raw`, ops are the stored dicts."""
+        if after_version is None:
+            after_version = self.last_ack_version
+        until_version = self.last_put_version
+
+        files = self._log_files()
+        # skip whole files that end before `after_version`
+        first = max([i for i, (version, _) in enumerate(files) if version <= after_version + 1] or [0])
+        for _, path in files[first:]:
+            with open(path, 'rb') as handler:
+                if not handler.seek(0, 2):
+                    continue
+                with mmap.mmap(handler.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for obj in self._objects(mapped, self._seek(mapped, after_version)):
+                        version = obj['version']
+                        if version > until_version:
+                            return
+                        if version > after_version:
+                            yield (obj['obj'] if raw else Operation.from_dict(obj['obj'])), version
+
+
+def sync_backend() -> NeptuneBackend:
+    """The backend `neptune sync` would use: the stand-in one while `local_backend` is active."""
+    # looked up on the module, that's what `local_backend` patches
+    return sync_module.HostedNeptuneBackend(sync_module.Credentials.from_token())
+
+
+def sync_queue(queue_dir: Path, container_id: str, container_type: ContainerType, backend: NeptuneBackend,
+               batch_size: int = 1000) -> int:
+    """Sends the unacknowledged part of a queue like `neptune sync` does, reading it with `QueueReader`.
+
+    Acknowledges after every request, so an interrupted sync resumes where it stopped; raises RuntimeError
+    when a request is accepted without processing any op. Returns ops sent."""
+    reader = QueueReader(queue_dir)
+    pending = reader.read()
+    sent = 0
+    batch = list(islice(pending, batch_size))
+    while batch:
+        processed, _ = backend.execute_operations(container_id, container_type, [op for op, _ in batch])
+        if processed == 0:
+            # nothing to acknowledge, and sending the same batch again wouldn't get further
+            raise RuntimeError(f'{container_id} accepted none of {len(batch)} ops from version {batch[0][1]}')
+        sent += processed
+        reader.ack(batch[processed - 1][1])
+        batch = batch[processed:] + list(islice(pending, processed))
+    return sent
@@ -14,18 +14,39 @@
 # limitations under the License.
 #
 __all__ = [
+    'FileHashingStats',
+    'LargeFile',
+    'Polled',
+    'assert_file_matches',
+    'assert_zip_matches',
+    'create_file_tree',
+    'create_large_file',
+    'create_source_tree',
+    'file_digest',
+    'file_hashing_stats',
+    'wait_for',
     'with_check_if_file_appears',
     'tmp_context'
 ]
 
+import hashlib
+import inspect
 import io
 import os
 import tempfile
+import time
+from collections import namedtuple
 from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Union
+from zipfile import ZipFile
 
 import numpy
 from PIL import Image
 from PIL.PngImagePlugin import PngImageFile
+from _pytest.monkeypatch import MonkeyPatch
+
+from neptune.new.internal.artifacts import file_hasher
+from neptune.new.internal.artifacts.local_file_hash_storage import LocalFileHashStorage
 
 
 def _remove_file_if_exists(filepath):
@@ -83,3 +104,210 @@ def image_to_png(*, image: Image) -> PngImageFile:
     image.save(png_buf, format="png")
     png_buf.seek(0)
     return PngImageFile(png_buf)
+
+
+LARGE_FILE_CHUNK_SIZE = 2 ** 20
+_ZERO_CHUNK = bytes(LARGE_FILE_CHUNK_SIZE)
+
+
+class LargeFile:
+    """File written by `create_large_file`, together with the digest its content should have.
+
+    Content is produced one chunk at a time, so memory use doesn't depend on the file size."""
+
+    def __init__(self, path: str, sparse: bool, seed: int, algorithm: str):
+        self.path = path
+        self.size = 0
+        self.sparse = sparse
+        self._hash = hashlib.new(algorithm)
+        self._rng = numpy.random.default_rng(seed)
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def algorithm(self) -> str:
+        return self._hash.name
+
+    def _chunks(self, size: int):
+        while size > 0:
+            chunk_size = min(size, LARGE_FILE_CHUNK_SIZE)
+            yield _ZERO_CHUNK[:chunk_size] if self.sparse else self._rng.bytes(chunk_size)
+            size -= chunk_size
+
+    def append(self, size: int) -> 'LargeFile':
+        """Appends `size` bytes of the same kind of content (zeros for sparse files) and updates the digest."""
+        if self.sparse:
+            # extending with truncate leaves a hole, nothing is actually written
+            with open(self.path, 'ab') as handler:
+                handler.truncate(self.size + size)
+            for chunk in self._chunks(size):
+                self._hash.update(chunk)
+        else:
+            with open(self.path, 'ab') as handler:
+                for chunk in self._chunks(size):
+                    self._hash.update(chunk)
+                    handler.write(chunk)
+        self.size += size
+        return self
+
+
+def create_large_file(path: str, size: int, *, sparse: bool = False, seed: int = 0,
+                      algorithm: str = 'sha1') -> LargeFile:
+    """Creates a file of `size` bytes without building its content in memory.
+
+    Sparse files are zeros made with `truncate` (no disk blocks allocated where the filesystem supports
+    holes); otherwise the content is pseudo-random, deterministic for a given `seed`. The default digest
+    algorithm is sha1, the one neptune uses for artifact file hashes."""
+    with open(path, 'wb'):
+        pass
+    return LargeFile(path, sparse=sparse, seed=seed, algorithm=algorithm).append(size)
+
+
+def create_source_tree(path: str, files: int, files_per_dir: int = 100) -> List[str]:
+    """Creates `files` small Python modules under `path`, `files_per_dir` in a package, packages nested
+    two levels deep like in a monorepo. Returns the module paths relative to `path`."""
+    modules = []
+    for i in range(files):
+        package = os.path.join(f'package_{i // files_per_dir ** 2}', f'subpackage_{i // files_per_dir % files_per_dir}')
+        if i % files_per_dir == 0:
+            os.makedirs(os.path.join(path, package), exist_ok=True)
+        module = os.path.join(package, f'module_{i}.py')
+        with open(os.path.join(path, module), 'w', encoding='utf-8') as handler:
+            handler.write(f'def function_{i}(value):\n    return value * {i}\n')
+        modules.append(module)
+    return modules
+
+
+def create_file_tree(path: str, files: int, depth: int = 2, fan_out: int = 10, size: int = 256) -> List[str]:
+    """Creates `files` small files of `size` bytes, each with content of its own, under `path`: a tree of directories
+    `depth` levels deep with `fan_out` subdirectories each, the files spread evenly over the deepest ones.
+    Returns the file paths relative to `path`."""
+    leaves = fan_out ** depth
+    created = []
+    for i in range(files):
+        leaf = i % leaves
+        directory = os.path.join('', *(f'dir_{leaf // fan_out ** level % fan_out}' for level in range(depth)))
+        if i < leaves:
+            os.makedirs(os.path.join(path, directory), exist_ok=True)
+        line = f'file {i}\n'.encode()
+        filename = os.path.join(directory, f'file_{i}.txt')
+        with open(os.path.join(path, filename), 'wb') as handler:
+            handler.write((line * (size // len(line) + 1))[:size])
+        created.append(filename)
+    return created
+
+
+def file_digest(source: Union[str, BinaryIO], algorithm: str = 'sha1') -> str:
+    """Hex digest of a file (path or binary file object) read in fixed-size chunks."""
+    if isinstance(source, str):
+        with open(source, 'rb') as handler:
+            return file_digest(handler, algorithm)
+
+    digest = hashlib.new(algorithm)
+    for chunk in iter(lambda: source.read(LARGE_FILE_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def assert_file_matches(path: str, expected: LargeFile):
+    assert os.path.getsize(path) == expected.size
+    assert file_digest(path, expected.algorithm) == expected.digest
+
+
+def assert_zip_matches(path: str, expected: Dict[str, LargeFile], other_names: Iterable[str] = ()):
+    """Checks the member names of a zip and streams every expected member through its digest,
+    so nothing is extracted to disk or memory."""
+    with ZipFile(path) as zipped:
+        assert set(zipped.namelist()) == set(expected).union(other_names)
+        for name, expected_file in expected.items():
+            assert zipped.getinfo(name).file_size == expected_file.size
+            with zipped.open(name) as member:
+                assert file_digest(member, expected_file.algorithm) == expected_file.digest
+
+
+class FileHashingStats:
+    """What artifact tracking did with local files: cache lookups, and files/bytes actually hashed;
+    and how many file entries went into artifact hashes computed by the client. The local stand-in
+    hashes artifacts as well, the entries it hashed and the time it took are counted apart."""
+
+    def __init__(self):
+        self.lookups = self.hashed_files = self.hashed_bytes = self.artifact_entries = 0
+        self.stand_in_artifact_entries = 0
+        self.stand_in_hash_s = 0.0
+
+    @property
+    def cache_hits(self) -> int:
+        return self.lookups - self.hashed_files
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        return self.cache_hits / self.lookups if self.lookups else 0.0
+
+    def reset(self):
+        self.lookups = self.hashed_files = self.hashed_bytes = self.artifact_entries = 0
+        self.stand_in_artifact_entries = 0
+        self.stand_in_hash_s = 0.0
+
+
+@contextmanager
+def file_hashing_stats():
+    """Counts hash cache lookups and sha1 computations done by `track_files` on local files,
+    and the entries of the artifact hashes computed."""
+    stats = FileHashingStats()
+    original_sha1 = file_hasher.sha1
+    original_fetch_one = LocalFileHashStorage.fetch_one
+    original_get_artifact_hash = file_hasher.FileHasher.get_artifact_hash
+
+    def sha1(fname, *args, **kwargs):
+        stats.hashed_files += 1
+        stats.hashed_bytes += os.path.getsize(fname)
+        return original_sha1(fname, *args, **kwargs)
+
+    def fetch_one(storage, path):
+        stats.lookups += 1
+        return original_fetch_one(storage, path)
+
+    def get_artifact_hash(_, artifact_files):
+        artifact_files = list(artifact_files)
+        # the class is patched for the whole process, the stand-in's calls come through here too
+        if inspect.currentframe().f_back.f_globals.get('__name__', '').startswith('tests.backend'):
+            start = time.perf_counter()
+            try:
+                return original_get_artifact_hash(artifact_files)
+            finally:
+                stats.stand_in_artifact_entries += len(artifact_files)
+                stats.stand_in_hash_s += time.perf_counter() - start
+        stats.artifact_entries += len(artifact_files)
+        return original_get_artifact_hash(artifact_files)
+
+    with MonkeyPatch.context() as patch:
+        patch.setattr(file_hasher, 'sha1', sha1)
+        patch.setattr(LocalFileHashStorage, 'fetch_one', fetch_one)
+        patch.setattr(file_hasher.FileHasher, 'get_artifact_hash', classmethod(get_artifact_hash))
+        yield stats
+
+
+Polled = namedtuple('Polled', ['value', 'seconds', 'attempts'])
+
+
+def wait_for(fetch: Callable[[], Any], ready: Callable[[Any], bool], *, timeout: float = 60,
+             first_delay: float = 0.05, max_delay: float = 2) -> Polled:
+    """Calls `fetch` until `ready` accepts its result, sleeping exponentially longer in between,
+    e.g. until a runs table query sees freshly created runs.
+
+    Returns the accepted value with the time it took; fails the test if it's not there by `timeout`."""
+    start = time.monotonic()
+    delay = first_delay
+    attempts = 0
+    while True:
+        value = fetch()
+        attempts += 1
+        elapsed = time.monotonic() - start
+        if ready(value):
+            return Polled(value, elapsed, attempts)
+        if elapsed + delay > timeout:
+            raise AssertionError(f'not ready after {attempts} attempts in {elapsed:.1f}s, last value: {value!r}')
+        time.sleep(delay)
+        delay = min(2 * delay, max_delay)